@@ -0,0 +1,129 @@
+import time
+
+import numpy as np
+
+from src.algorithms.tours import tour_lengths, tour_length, nearest_neighbours, nearest_neighbour_tour
+
+
+def _candidate_slots(candidates, cities, neighbours):
+    """
+    Finds where each neighbour is stored in the candidate list of its city
+
+    Args:
+        candidates: The n x k candidate list
+        cities: An array of cities
+        neighbours: An array of the same length as cities holding one neighbour for each
+
+    Returns:
+        (rows, slots) arrays so that candidates[cities[rows], slots] == neighbours[rows]. Pairs that are not in the
+        candidate list are left out
+    """
+    matches = candidates[cities] == neighbours[:, np.newaxis]
+    rows = np.flatnonzero(matches.any(axis=1))
+    return rows, matches[rows].argmax(axis=1)
+
+
+def _construct_tours(rng, distances, candidates, pheromone, heuristic, num_ants, exploit, local_decay, initial):
+    """
+    Moves every ant one city at a time until all ants have built a complete tour. Each step is a single vectorized
+    roulette selection over the candidate lists of all ants. Ants whose candidates are all visited fall back to the
+    closest unvisited city
+
+    Returns:
+        A num_ants x n int32 array of tours
+    """
+    num_cities = len(candidates)
+    ants = np.arange(num_ants)
+    tours = np.empty((num_ants, num_cities), dtype=np.int32)
+    visited = np.zeros((num_ants, num_cities), dtype=bool)
+    tours[:, 0] = rng.integers(0, num_cities, num_ants)
+    visited[ants, tours[:, 0]] = True
+
+    for step in range(1, num_cities):
+        current = tours[:, step-1]
+        options = candidates[current]
+        attraction = pheromone[current] * heuristic[current] * ~visited[ants[:, np.newaxis], options]
+        totals = np.cumsum(attraction, axis=1)
+        roulette = (totals < (rng.random(num_ants) * totals[:, -1])[:, np.newaxis]).sum(axis=1)
+        slots = np.where(rng.random(num_ants) < exploit, attraction.argmax(axis=1), roulette)
+        slots = np.minimum(slots, candidates.shape[1] - 1)
+        chosen = options[ants, slots]
+
+        stuck = totals[:, -1] <= 0
+        if stuck.any():
+            rows = np.asarray(distances[current[stuck]], dtype=float)
+            chosen[stuck] = np.where(visited[stuck], np.inf, rows).argmin(axis=1)
+        moved = ~stuck
+        pheromone[current[moved], slots[moved]] *= 1 - local_decay
+        pheromone[current[moved], slots[moved]] += local_decay * initial
+
+        tours[:, step] = chosen
+        visited[ants, chosen] = True
+    return tours
+
+
+def ant_colony(distances, iterations, *, num_ants=10, num_candidates=15, alpha=0.1, beta=2, exploit=0.9,
+               local_decay=0.1, time_budget=None, progress=None, cancel=None, seed=None):
+    """
+    Solves the travelling salesman problem with an Ant Colony System. Pheromone and heuristic values are only kept for
+    the k nearest neighbours of each city so memory stays O(nk). All ants of an iteration build their tours together
+
+    Args:
+        distances: An n x n array of distances between every pair of cities
+        iterations: The maximum number of iterations to run
+        num_ants: The number of ants that build a tour each iteration
+        num_candidates: The number of nearest neighbours each city keeps pheromone for
+        alpha: The evaporation rate of the global pheromone update
+        beta: The weight of the distance heuristic relative to the pheromone
+        exploit: The probability that an ant picks its most attractive candidate instead of using roulette selection
+        local_decay: The rate that pheromone decays back to its initial value when an ant walks an edge
+        time_budget: Optional number of seconds after which no new iteration is started
+        progress: Optional callable that is called as progress(iteration, best_length) after every iteration
+        cancel: Optional threading.Event. No new iteration is started once it is set
+        seed: Optional seed for the random number generator
+
+    Returns:
+        (best_tour, best_lengths) where best_tour is an array of city indices and best_lengths holds the best length
+        found after each iteration that was run. With fewer than three cities every order is the same tour, so it is
+        returned with its length and no iterations are run
+    """
+    if len(distances) < 3:
+        tour = np.arange(len(distances), dtype=np.int32)
+        return tour, np.array([tour_length(distances, tour)])
+    rng = np.random.default_rng(seed)
+    start_time = time.perf_counter()
+    candidates = nearest_neighbours(distances, num_candidates)
+    neighbour_distances = np.asarray(distances[np.arange(len(candidates))[:, np.newaxis], candidates], dtype=float)
+    heuristic = np.maximum(neighbour_distances, 1e-10) ** -beta
+
+    best_tour = nearest_neighbour_tour(distances)
+    best_length = tour_length(distances, best_tour)
+    initial = 1 / (len(candidates) * best_length)
+    pheromone = np.full(candidates.shape, initial)
+    best_lengths = []
+
+    for iteration in range(iterations):
+        if time_budget is not None and time.perf_counter() - start_time > time_budget:
+            break
+        if cancel is not None and cancel.is_set():
+            break
+        tours = _construct_tours(rng, distances, candidates, pheromone, heuristic, num_ants, exploit, local_decay,
+                                 initial)
+        lengths = tour_lengths(distances, tours)
+        if lengths.min() < best_length:
+            best_length = lengths.min()
+            best_tour = tours[lengths.argmin()]
+
+        # Global update along both directions of every edge of the best tour
+        cities = np.concatenate((best_tour, np.roll(best_tour, -1)))
+        neighbours = np.concatenate((np.roll(best_tour, -1), best_tour))
+        rows, slots = _candidate_slots(candidates, cities, neighbours)
+        pheromone[cities[rows], slots] *= 1 - alpha
+        pheromone[cities[rows], slots] += alpha / best_length
+
+        best_lengths.append(best_length)
+        if progress:
+            progress(iteration, best_length)
+
+    print('Final value: {}'.format(best_length))
+    return best_tour, np.array(best_lengths)
@@ -0,0 +1,157 @@
+import concurrent.futures
+import math
+import os
+import time
+
+import numpy as np
+
+from src.algorithms.tabuSearch import tabu_search
+from src.algorithms.tours import pairwise_distances, nearest_neighbour_tour, local_two_opt
+from src.grid import Grid
+
+CELL_SHARE = .5  # Share of a total time budget that is spent solving the cells
+
+
+def kmeans_partition(coordinates, num_cells, iterations=20, seed=None):
+    """
+    Splits the cities into spatial cells with k-means clustering
+
+    Args:
+        coordinates: An n x 2 array of city coordinates
+        num_cells: The number of cells to split into
+        iterations: The number of Lloyd iterations to run
+        seed: Optional seed for choosing the starting centres
+
+    Returns:
+        An array holding the cell label of every city. Labels are numbered from 0 with no gaps
+    """
+    rng = np.random.default_rng(seed)
+    num_cells = min(num_cells, len(coordinates))
+    centres = coordinates[rng.choice(len(coordinates), num_cells, replace=False)]
+    for _ in range(iterations):
+        labels = pairwise_distances(coordinates, centres).argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centres))
+        sums = np.stack([np.bincount(labels, coordinates[:, axis], minlength=len(centres)) for axis in (0, 1)], axis=1)
+        centres = sums[counts > 0] / counts[counts > 0, np.newaxis]
+    labels = pairwise_distances(coordinates, centres).argmin(axis=1)
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def grid_partition(coordinates, scale):
+    """
+    Splits the cities into square cells by laying a Grid over them. Each grid square becomes one cell
+
+    Args:
+        coordinates: An n x 2 array of city coordinates
+        scale: The side length of each grid square
+
+    Returns:
+        An array holding the cell label of every city. Labels are numbered from 0 with no gaps
+    """
+    grid_x, grid_y = Grid(scale).to_grid_coordinates(coordinates[:, 0], coordinates[:, 1])
+    squares = np.stack((np.floor(grid_x), np.floor(grid_y)), axis=1)
+    return np.unique(squares, axis=0, return_inverse=True)[1].ravel()
+
+
+def _solve_cell(coordinates, time_budget):
+    """
+    Solves the sub-tour of a single cell. Runs in a worker process so it only takes plain arrays
+
+    Returns:
+        The order of the cell's cities as indices into coordinates
+    """
+    if len(coordinates) < 5:
+        return np.arange(len(coordinates))
+    tour, _, _ = tabu_search(pairwise_distances(coordinates, coordinates), time_budget)
+    return tour
+
+
+def _stitch(coordinates, cells, sub_tours):
+    """
+    Joins the cycles of each cell into one tour. The cells are visited in nearest neighbour order of their centres. Each
+    cycle is entered at the city closest to where the previous cell was left and is walked in whichever direction ends
+    closer to the centre of the next cell
+
+    Returns:
+        (tour, joints) where joints holds the cities on either side of every connection between two cells
+    """
+    centres = np.array([coordinates[cell].mean(axis=0) for cell in cells])
+    order = nearest_neighbour_tour(pairwise_distances(centres, centres))
+    pieces, joints = [], []
+    previous = None
+    for position, cell_index in enumerate(order):
+        cycle = cells[cell_index][sub_tours[cell_index]]
+        entry = 0 if previous is None else \
+            pairwise_distances(coordinates[[previous]], coordinates[cycle])[0].argmin()
+        forward = np.roll(cycle, -entry)
+        backward = np.roll(cycle[::-1], entry + 1)
+        next_centre = centres[order[(position + 1) % len(order)]][np.newaxis]
+        ends = coordinates[[forward[-1], backward[-1]]]
+        piece = forward if pairwise_distances(ends, next_centre).argmin() == 0 else backward
+        pieces.append(piece)
+        joints.extend((piece[0], piece[-1]))
+        previous = piece[-1]
+    return np.concatenate(pieces), np.array(joints)
+
+
+def _boundary_cities(coordinates, labels, joints, margin):
+    """
+    Finds the cities that lie close to the border between two cells, along with the cities where cells were joined
+
+    Returns:
+        A sorted array of city indices
+    """
+    cells = np.unique(labels)
+    centres = np.array([coordinates[labels == cell].mean(axis=0) for cell in cells])
+    if len(centres) < 2:
+        return np.unique(joints)
+    to_centres = pairwise_distances(coordinates, centres)
+    own = to_centres[np.arange(len(coordinates)), labels]
+    to_centres[np.arange(len(coordinates)), labels] = np.inf
+    near_border = np.flatnonzero(to_centres.min(axis=1) - own < margin)
+    return np.union1d(near_border, joints)
+
+
+def decomposition_solve(coordinates, *, num_cells=None, scale=None, cell_time=1, polish_time=5, time_budget=None,
+                        max_workers=None, seed=None):
+    """
+    Solves large instances by splitting the cities into spatial cells, solving each cell's sub-tour in parallel worker
+    processes, stitching the sub-tours together and finishing with a 2-opt search focused on the cell borders
+
+    Args:
+        coordinates: An n x 2 array of city coordinates
+        num_cells: The number of k-means cells. Defaults to one cell for roughly every 500 cities
+        scale: If given, cells are the squares of a Grid with this scale instead of k-means clusters
+        cell_time: The CPU seconds of tabu search spent on each cell
+        polish_time: The seconds spent on the final boundary search
+        time_budget: Optional total number of seconds for the whole solve. Replaces cell_time and polish_time: once
+            the cities are split, CELL_SHARE of what is left is spread over the rounds of cells the workers solve, and
+            the boundary search gets whatever remains after stitching
+        max_workers: The number of worker processes. Defaults to the number of processors
+        seed: Optional seed for the k-means starting centres
+
+    Returns:
+        An array of city indices in the order they are visited
+    """
+    start_time = time.perf_counter()
+    coordinates = np.asarray(coordinates, dtype=float)
+    if scale is not None:
+        labels = grid_partition(coordinates, scale)
+    else:
+        labels = kmeans_partition(coordinates, num_cells or max(1, len(coordinates) // 500), seed=seed)
+    cells = [np.flatnonzero(labels == cell) for cell in range(labels.max() + 1)]
+    if time_budget is not None:
+        rounds = math.ceil(len(cells) / (max_workers or os.cpu_count() or 1))
+        cell_time = max(time_budget - (time.perf_counter() - start_time), 0) * CELL_SHARE / rounds
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+        sub_tours = list(executor.map(_solve_cell, [coordinates[cell] for cell in cells],
+                                      [cell_time] * len(cells)))
+
+    tour, joints = _stitch(coordinates, cells, sub_tours)
+    width, height = coordinates.max(axis=0) - coordinates.min(axis=0)
+    spacing = math.sqrt(max(width * height, 1) / len(coordinates))
+    active = _boundary_cities(coordinates, labels, joints, 4 * spacing)
+    if time_budget is not None:
+        polish_time = max(time_budget - (time.perf_counter() - start_time), 0)
+    return local_two_opt(coordinates, tour, active, polish_time)
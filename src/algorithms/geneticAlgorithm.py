@@ -0,0 +1,136 @@
+import numpy as np
+
+from src.algorithms.tours import tour_lengths
+
+
+def tournament_select(rng, lengths, num_selected, tournament_size):
+    """
+    Selects individuals by running num_selected tournaments at once. The shortest tour of each tournament wins
+
+    Args:
+        rng: The numpy random Generator to use
+        lengths: The tour length of every individual in the population
+        num_selected: The number of individuals to select
+        tournament_size: The number of individuals competing in each tournament
+
+    Returns:
+        An array of the indices of the selected individuals
+    """
+    contestants = rng.integers(0, len(lengths), (num_selected, tournament_size))
+    return contestants[np.arange(num_selected), np.argmin(lengths[contestants], axis=1)]
+
+
+def order_crossover(rng, parents1, parents2):
+    """
+    Performs order crossover (OX) on every pair of parents at once. Each child keeps a random slice of the first parent
+    in place and fills the rest of its positions, starting after the slice, with the missing cities in the order they
+    appear in the second parent
+
+    Args:
+        rng: The numpy random Generator to use
+        parents1: A C x n array of the parents that donate a slice
+        parents2: A C x n array of the parents that donate the order of the remaining cities
+
+    Returns:
+        A C x n array of children
+    """
+    num_children, num_cities = parents1.shape
+    rows = np.arange(num_children)[:, np.newaxis]
+    positions = np.arange(num_cities)
+    cuts = np.sort(rng.integers(0, num_cities + 1, (num_children, 2)), axis=1)
+    start, end = cuts[:, :1], cuts[:, 1:]
+    in_slice = (positions >= start) & (positions < end)
+
+    # Mark which cities each child already inherited from the first parent
+    inherited = np.zeros(parents1.shape, dtype=bool)
+    np.put_along_axis(inherited, parents1, in_slice, axis=1)
+
+    # Walk both the second parent and the child's positions starting from the end of the slice
+    rotation = (positions + end) % num_cities
+    donor = np.take_along_axis(parents2, rotation, axis=1)
+    missing = ~np.take_along_axis(inherited, donor, axis=1)
+    open_position = ~np.take_along_axis(in_slice, rotation, axis=1)
+
+    # Stable sorts move the missing cities and the open positions to the front while keeping their order
+    donor_order = np.argsort(~missing, axis=1, kind='stable')
+    position_order = np.argsort(~open_position, axis=1, kind='stable')
+    fill = positions < (num_cities - (end - start))
+
+    children = parents1.copy()
+    target_rows = np.broadcast_to(rows, fill.shape)[fill]
+    target_positions = np.take_along_axis(rotation, position_order, axis=1)[fill]
+    children[target_rows, target_positions] = np.take_along_axis(donor, donor_order, axis=1)[fill]
+    return children
+
+
+def two_opt_mutate(rng, population, mutation_rate):
+    """
+    Reverses a random sub-path of each individual with probability mutation_rate. All reversals are done with a single
+    gather
+
+    Args:
+        rng: The numpy random Generator to use
+        population: A P x n array of tours. It is modified in place
+        mutation_rate: The probability that any single individual is mutated
+    """
+    num_individuals, num_cities = population.shape
+    mutated = np.flatnonzero(rng.random(num_individuals) < mutation_rate)
+    if not len(mutated):
+        return
+    cuts = np.sort(rng.integers(0, num_cities, (len(mutated), 2)), axis=1)
+    start, end = cuts[:, :1], cuts[:, 1:]
+    positions = np.arange(num_cities)
+    in_range = (positions >= start) & (positions <= end)
+    source = np.where(in_range, start + end - positions, positions)
+    population[mutated] = np.take_along_axis(population[mutated], source, axis=1)
+
+
+def genetic_algorithm(distances, generations, *, population_size=100, mutation_rate=0.2, tournament_size=3,
+                      elite_size=2, progress=None, cancel=None, seed=None):
+    """
+    Solves the travelling salesman problem with a genetic algorithm. The population is kept as a P x n int32 array and
+    every generation is evaluated, selected, crossed over and mutated in batched numpy operations
+
+    Args:
+        distances: An n x n array of distances between every pair of cities
+        generations: The number of generations to run
+        population_size: The number of individuals in the population
+        mutation_rate: The probability that a child has a random sub-path reversed
+        tournament_size: The number of individuals competing for each parent slot
+        elite_size: The number of best individuals copied unchanged into the next generation
+        progress: Optional callable that is called as progress(generation, best_length) after every generation
+        cancel: Optional threading.Event. The run stops early once it is set
+        seed: Optional seed for the random number generator
+
+    Returns:
+        (best_tour, best_lengths, mean_lengths) where best_tour is an array of city indices and best_lengths and
+        mean_lengths hold the best and mean tour length of each generation that was run
+    """
+    rng = np.random.default_rng(seed)
+    num_cities = len(distances)
+    population = np.argsort(rng.random((population_size, num_cities)), axis=1).astype(np.int32)
+    best_lengths = np.zeros(generations)
+    mean_lengths = np.zeros(generations)
+    num_children = population_size - elite_size
+
+    for generation in range(generations):
+        if cancel is not None and cancel.is_set():
+            best_lengths, mean_lengths = best_lengths[:generation], mean_lengths[:generation]
+            break
+        lengths = tour_lengths(distances, population)
+        best_lengths[generation] = lengths.min()
+        mean_lengths[generation] = lengths.mean()
+        if progress:
+            progress(generation, best_lengths[generation])
+
+        elite = population[np.argsort(lengths)[:elite_size]]
+        parents1 = population[tournament_select(rng, lengths, num_children, tournament_size)]
+        parents2 = population[tournament_select(rng, lengths, num_children, tournament_size)]
+        children = order_crossover(rng, parents1, parents2)
+        two_opt_mutate(rng, children, mutation_rate)
+        population = np.concatenate((elite, children))
+
+    lengths = tour_lengths(distances, population)
+    best_tour = population[np.argmin(lengths)]
+    print('Final value: {}'.format(lengths.min()))
+    return best_tour, best_lengths, mean_lengths
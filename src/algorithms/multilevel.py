@@ -0,0 +1,123 @@
+import numpy as np
+
+from src.algorithms.simulatedAnnealing import simulated_annealing
+from src.algorithms.temperatureAlgorithms import linear_temperature, decrease_ratio
+from src.algorithms.tours import spatial_nearest_neighbours, coordinate_tour_length
+from src.runtime_models.simulatedAnnealingModel import PathState, CoordinateWeights, SuccessorChooseType
+
+
+def coarsen(coordinates, sizes, num_candidates=5):
+    """
+    Merges pairs of nearest neighbours into super-nodes. Cities are matched greedily starting with the ones whose
+    nearest neighbour is closest. A city with no unmatched candidate is carried over on its own
+
+    Args:
+        coordinates: An n x 2 array of node coordinates
+        sizes: The number of original cities inside each node. Used to weight the super-node positions
+
+    Returns:
+        (coordinates, sizes, parents) for the coarse level, where parents maps every node to its super-node
+    """
+    num_nodes = len(coordinates)
+    candidates = spatial_nearest_neighbours(coordinates, num_candidates).tolist()
+    nearest = np.hypot(*(coordinates - coordinates[[row[0] for row in candidates]]).T)
+    parents = np.full(num_nodes, -1, dtype=np.int64)
+    num_super = 0
+    for node in np.argsort(nearest).tolist():
+        if parents[node] >= 0:
+            continue
+        parents[node] = num_super
+        for other in candidates[node]:
+            if parents[other] < 0:
+                parents[other] = num_super
+                break
+        num_super += 1
+    coarse_sizes = np.bincount(parents, sizes, minlength=num_super)
+    coarse = np.stack([np.bincount(parents, coordinates[:, axis] * sizes, minlength=num_super) for axis in (0, 1)],
+                      axis=1) / coarse_sizes[:, np.newaxis]
+    return coarse, coarse_sizes, parents
+
+
+def uncoarsen(tour, coordinates, parents):
+    """
+    Expands a tour of super-nodes into a tour of the nodes they were made from. The two nodes of a pair are ordered so
+    that the first one is the closer one to the node visited before them
+
+    Args:
+        tour: The order of the super-nodes
+        coordinates: The coordinates of the finer level
+        parents: Maps every node of the finer level to its super-node
+
+    Returns:
+        The order of the finer level nodes
+    """
+    children = [[] for _ in range(len(tour))]
+    for node, parent in enumerate(parents.tolist()):
+        children[parent].append(node)
+    expanded = []
+    for parent in tour:
+        pair = children[parent]
+        if len(pair) == 2 and expanded:
+            previous = coordinates[expanded[-1]]
+            if np.hypot(*(coordinates[pair[1]] - previous)) < np.hypot(*(coordinates[pair[0]] - previous)):
+                pair = pair[::-1]
+        expanded.extend(pair)
+    return expanded
+
+
+def _anneal(coordinates, order, temperatures, successor_choose_type):
+    """
+    Runs simulated annealing on a PathState over the given nodes starting from order
+
+    Returns:
+        The order of the nodes after annealing
+    """
+    state = PathState(CoordinateWeights(coordinates), successor_choose_type, False)
+    state.nodes = list(order) + [order[0]]
+    state.generate_next_indices()
+    simulated_annealing(state, False, temperatures)
+    return state.nodes[:-1]
+
+
+def multilevel_anneal(coordinates, *, coarse_size=200, coarse_steps=100000, refine_steps=20, refine_temperature=.1,
+                      successor_choose_type=SuccessorChooseType.RANDOM_WINDOW):
+    """
+    Solves large instances by coarsening them until they are small, annealing the coarse instance and then refining
+    the tour with short low temperature anneals while expanding it back one level at a time
+
+    Args:
+        coordinates: An n x 2 array of city coordinates
+        coarse_size: Coarsening stops once there are at most this many super-nodes
+        coarse_steps: The number of annealing steps on the coarsest level
+        refine_steps: The number of refinement steps per node on every finer level
+        refine_temperature: The starting refinement temperature as a fraction of the average edge length
+        successor_choose_type: How the refinement anneals pick the sub-paths to flip
+
+    Returns:
+        (tour, level_lengths) where tour is an array of city indices and level_lengths holds the tour length on each
+        level from the coarsest to the original
+    """
+    levels = [(np.asarray(coordinates, dtype=float), np.ones(len(coordinates)))]
+    parents = []
+    while len(levels[-1][0]) > coarse_size:
+        coarse, sizes, parent = coarsen(*levels[-1])
+        if len(coarse) == len(levels[-1][0]):
+            break
+        levels.append((coarse, sizes))
+        parents.append(parent)
+
+    coarsest = levels[-1][0]
+    width, height = coarsest.max(axis=0) - coarsest.min(axis=0)
+    tour = list(range(len(coarsest)))
+    if len(tour) > 3:
+        tour = _anneal(coarsest, tour, linear_temperature(np.hypot(width, height), coarse_steps),
+                       SuccessorChooseType.BOTH_RANDOM)
+    level_lengths = [coordinate_tour_length(coarsest, tour)]
+
+    for (fine, _), parent in zip(reversed(levels[:-1]), reversed(parents)):
+        tour = uncoarsen(tour, fine, parent)
+        steps = refine_steps * len(fine)
+        start = refine_temperature * coordinate_tour_length(fine, tour) / len(fine)
+        tour = _anneal(fine, tour, decrease_ratio(start, .001 ** (1 / steps), steps), successor_choose_type)
+        level_lengths.append(coordinate_tour_length(fine, tour))
+    return np.array(tour), level_lengths
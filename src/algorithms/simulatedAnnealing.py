@@ -5,23 +5,57 @@ import numpy as np
 import warnings
 
 
-def simulated_annealing(start_configuration, store_temperatures, temperatures):
+def simulated_annealing(start_configuration, store_temperatures, temperatures, *, progress=None,
+                        progress_interval=1000, cancel=None, rng=random):
+    """
+    Anneals a configuration through a list of temperatures. If the configuration notifies observers of its changes they
+    are batched between progress checks, so edges that are removed and added back in between are never reported
+
+    Args:
+        start_configuration: The PathState to anneal. It is changed in place
+        store_temperatures: If true the value of the configuration at every step is returned
+        temperatures: The temperature of each step
+        progress: Optional callable that is called as progress(step, configuration) every progress_interval steps
+        progress_interval: The number of steps between calls to progress and checks of cancel
+        cancel: Optional threading.Event. The run stops early once it is set
+        rng: The random number generator moves are accepted with. Runs that share a thread pool should each pass their
+            own random.Random, so a seeded run does not depend on what else is running
+
+    Returns:
+        The value at every step that was run if store_temperatures is true
+    """
     warnings.filterwarnings('error')
     lengths = np.zeros(len(temperatures))
     current = start_configuration
-    for ind, temperature in enumerate(temperatures):
-        if store_temperatures:
-            lengths[ind] = current.value()
-        change = current.get_successor_change()
-        if change <= 0:
-            current.next_successor()
-        else:
-            try:
-                probability = math.e**(-change/temperature)
-            except RuntimeWarning:
-                probability = 0
-            if random.random() <= probability:
+    batched = getattr(current, 'notify_canvas', False)
+    if batched:
+        current.begin_batch()
+    try:
+        for ind, temperature in enumerate(temperatures):
+            if ind % progress_interval == 0:
+                if batched:
+                    current.end_batch()
+                    current.begin_batch()
+                if cancel is not None and cancel.is_set():
+                    lengths = lengths[:ind]
+                    break
+                if progress:
+                    progress(ind, current)
+            if store_temperatures:
+                lengths[ind] = current.value()
+            change = current.get_successor_change()
+            if change <= 0:
                 current.next_successor()
+            else:
+                try:
+                    probability = math.e**(-change/temperature)
+                except RuntimeWarning:
+                    probability = 0
+                if rng.random() <= probability:
+                    current.next_successor()
+    finally:
+        if batched:
+            current.end_batch()
     print('Final value: {}'.format(start_configuration.value()))
     if store_temperatures:
         return lengths
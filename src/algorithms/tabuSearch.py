@@ -0,0 +1,211 @@
+import time
+
+import numpy as np
+
+from src.algorithms.tours import tour_length, nearest_neighbours, nearest_neighbour_tour
+
+
+class TabuTable:
+    """
+    Tabu tenure table indexed by a city and the slot of one of its candidate neighbours, so it takes O(nk) memory
+    instead of O(n^2). An edge that was removed from the tour may not be added back until its tenure runs out. Only
+    edges between a city and one of its candidates are tracked. Every move is scanned as adding the edge from a city to
+    one of its candidates, and is tabu if that edge is, so checking a move is a single array lookup
+
+    Attributes:
+        candidates: An n x k array of the candidate neighbours of each city
+        until: An n x k array holding the first iteration that the edge from each city to each of its candidates may be
+            added again
+        tenure: The number of iterations that a removed edge stays tabu
+    """
+    def __init__(self, candidates, tenure):
+        self.candidates = candidates
+        self.until = np.zeros(candidates.shape, dtype=np.int32)
+        self.tenure = tenure
+
+    def is_tabu(self, iteration, cities):
+        """
+        Returns whether the edges from cities to each of their candidates are tabu as an array with one more axis of
+        length k. Works on a scalar or an array of cities
+        """
+        return self.until[cities] > iteration
+
+    def forbid(self, iteration, city, other):
+        """
+        Makes the edge between city and other tabu in both directions. Does nothing if neither is a candidate of the
+        other
+        """
+        for first, second in ((city, other), (other, city)):
+            self.until[first, self.candidates[first] == second] = iteration + self.tenure
+
+
+def _best_admissible(deltas, tabu, current, best):
+    """
+    Gets the index of the best move that is either not tabu or would improve on the best length found so far
+
+    Returns:
+        The flat index of the move, or None if no move is admissible
+    """
+    admissible = ~tabu | (current + deltas < best - 1e-9)
+    if not admissible.any():
+        return None
+    masked = np.where(admissible, deltas, np.inf)
+    ind = np.argmin(masked)
+    return ind if np.isfinite(masked.flat[ind]) else None
+
+
+def _two_opt_moves(distances, tour, positions, candidates):
+    """
+    Evaluates every 2-opt move that adds an edge between a city and one of its candidates. The move removes the edges
+    leaving both cities and reconnects them to each other and to each other's successors
+
+    Returns:
+        An n x k array of length changes indexed by tour position and candidate
+    """
+    num_cities = len(tour)
+    cities = tour[:, np.newaxis]
+    successors = tour[(np.arange(num_cities) + 1) % num_cities][:, np.newaxis]
+    others = candidates[tour]
+    other_successors = tour[(positions[others] + 1) % num_cities]
+    deltas = (distances[cities, others] + distances[successors, other_successors] -
+              distances[cities, successors] - distances[others, other_successors])
+    deltas = np.where((others == successors) | (other_successors == cities), np.inf, deltas)
+    return deltas
+
+
+def _apply_two_opt(tour, positions, city, other):
+    """
+    Reverses the path between the successor of city and other so that city and other become neighbours
+    """
+    start, end = positions[city], positions[other]
+    if start > end:
+        start, end = end, start
+    tour[start+1:end+1] = tour[start+1:end+1][::-1].copy()
+    positions[tour[start+1:end+1]] = np.arange(start+1, end+1)
+
+
+def _or_opt_moves(distances, tour, positions, candidates, length):
+    """
+    Evaluates moving every segment of the given length so that its first city becomes the neighbour of one of its
+    candidates. The segment is either placed after the candidate keeping its direction or before it reversed
+
+    Returns:
+        An n x k x 2 array of length changes for the segments starting at each tour position. The last axis holds the
+        move that places the segment after the candidate followed by the move that places it before
+    """
+    num_cities = len(tour)
+    indices = np.arange(num_cities)[:, np.newaxis]
+    first = tour[indices]
+    last = tour[(indices + length - 1) % num_cities]
+    previous = tour[indices - 1]
+    following = tour[(indices + length) % num_cities]
+    others = candidates[tour]
+    other_positions = positions[others]
+    other_next = tour[(other_positions + 1) % num_cities]
+    other_previous = tour[other_positions - 1]
+
+    base = distances[previous, following] - distances[previous, first] - distances[last, following]
+    after = base + distances[others, first] + distances[last, other_next] - distances[others, other_next]
+    before = base + distances[other_previous, last] + distances[first, others] - distances[other_previous, others]
+    inside = (other_positions - indices) % num_cities < length
+    after = np.where(inside | (others == previous), np.inf, after)
+    before = np.where(inside | (others == following), np.inf, before)
+    return np.stack((after, before), axis=-1)
+
+
+def _apply_or_opt(tour, index, length, other, after):
+    """
+    Moves the segment of the given length starting at tour position index next to the city other
+
+    Returns:
+        The new tour
+    """
+    rolled = np.roll(tour, -index)
+    segment, rest = rolled[:length], rolled[length:]
+    position = np.flatnonzero(rest == other)[0]
+    if after:
+        return np.concatenate((rest[:position+1], segment, rest[position+1:]))
+    return np.concatenate((rest[:position], segment[::-1], rest[position:]))
+
+
+def tabu_search(distances, time_budget, *, iterations=None, num_candidates=10, tenure=None, max_segment=3,
+                start_tour=None, progress=None, cancel=None):
+    """
+    Solves the travelling salesman problem with tabu search over the 2-opt and Or-opt neighbourhoods. Only moves that
+    connect a city to one of its k nearest neighbours are scanned, so each iteration costs O(nk). Every iteration takes
+    the best move whose added candidate edge is not tabu, unless the move improves on the best tour found so far
+
+    Args:
+        distances: An n x n array of distances between every pair of cities
+        time_budget: The number of CPU seconds after which no new iteration is started
+        iterations: Optional maximum number of iterations
+        num_candidates: The number of nearest neighbours each city considers connecting to
+        tenure: The number of iterations a removed edge stays tabu. Defaults to a value based on n
+        max_segment: The longest segment that Or-opt moves
+        start_tour: Optional tour to start from. Defaults to the nearest neighbour tour
+        progress: Optional callable that is called as progress(iteration, best_length) after every iteration
+        cancel: Optional threading.Event. No new iteration is started once it is set
+
+    Returns:
+        (best_tour, best_lengths, cpu_times) where best_lengths holds the best length after each iteration and
+        cpu_times holds the CPU seconds used when it was recorded
+    """
+    start_time = time.process_time()
+    num_cities = len(distances)
+    candidates = nearest_neighbours(distances, num_candidates)
+    tour = np.array(start_tour if start_tour is not None else nearest_neighbour_tour(distances), dtype=np.int32)
+    positions = np.empty(num_cities, dtype=np.int64)
+    positions[tour] = np.arange(num_cities)
+    table = TabuTable(candidates, tenure if tenure is not None else max(7, min(30, num_cities // 10)))
+    current = best = tour_length(distances, tour)
+    best_tour = tour.copy()
+    best_lengths, cpu_times = [], []
+    segments = range(1, min(max_segment, num_cities - 3) + 1)
+
+    iteration = 0
+    while time.process_time() - start_time < time_budget and (iterations is None or iteration < iterations):
+        if cancel is not None and cancel.is_set():
+            break
+        deltas = _two_opt_moves(distances, tour, positions, candidates)
+        move = _best_admissible(deltas, table.is_tabu(iteration, tour), current, best)
+        best_move = ('2-opt', move, deltas.flat[move]) if move is not None else (None, None, np.inf)
+
+        for length in segments:
+            or_deltas = _or_opt_moves(distances, tour, positions, candidates, length)
+            tabu = table.is_tabu(iteration, tour)[..., np.newaxis]
+            move = _best_admissible(or_deltas, tabu, current, best)
+            if move is not None and or_deltas.flat[move] < best_move[2]:
+                best_move = (length, move, or_deltas.flat[move])
+
+        kind, move, delta = best_move
+        if kind is None and not np.isfinite(deltas).any():
+            break
+        if kind == '2-opt':
+            city_index, slot = np.unravel_index(move, deltas.shape)
+            city, other = tour[city_index], candidates[tour[city_index], slot]
+            table.forbid(iteration, city, tour[(city_index + 1) % num_cities])
+            table.forbid(iteration, other, tour[(positions[other] + 1) % num_cities])
+            _apply_two_opt(tour, positions, city, other)
+        elif kind is not None:
+            index, slot, side = np.unravel_index(move, (num_cities, candidates.shape[1], 2))
+            other = candidates[tour[index], slot]
+            table.forbid(iteration, tour[index - 1], tour[index])
+            table.forbid(iteration, tour[(index + kind - 1) % num_cities], tour[(index + kind) % num_cities])
+            neighbour = tour[(positions[other] + 1) % num_cities] if side == 0 else tour[positions[other] - 1]
+            table.forbid(iteration, other, neighbour)
+            tour = _apply_or_opt(tour, index, kind, other, side == 0)
+            positions[tour] = np.arange(num_cities)
+        if kind is not None:
+            current += delta
+            if current < best - 1e-9:
+                best = current
+                best_tour = tour.copy()
+
+        best_lengths.append(best)
+        cpu_times.append(time.process_time() - start_time)
+        if progress:
+            progress(iteration, best)
+        iteration += 1
+
+    print('Final value: {}'.format(best))
+    return best_tour, np.array(best_lengths), np.array(cpu_times)
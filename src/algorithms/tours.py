@@ -0,0 +1,254 @@
+import math
+import time
+
+import numpy as np
+
+
+def pairwise_distances(coordinates1, coordinates2):
+    """
+    Calculates the Euclidean distance between every point of one set and every point of another
+
+    Args:
+        coordinates1: An n x 2 array of points
+        coordinates2: An m x 2 array of points
+
+    Returns:
+        An n x m array of distances
+    """
+    deltas = coordinates1[:, np.newaxis, :] - coordinates2[np.newaxis, :, :]
+    return np.sqrt((deltas**2).sum(axis=-1))
+
+
+def coordinate_tour_length(coordinates, tour):
+    """
+    Calculates the closed length of a tour directly from the coordinates of its cities
+
+    Args:
+        coordinates: An n x 2 array of city coordinates
+        tour: An array of city indices in the order they are visited
+
+    Returns:
+        The total length
+    """
+    points = coordinates[tour]
+    return np.sqrt(((points - np.roll(points, -1, axis=0))**2).sum(axis=1)).sum()
+
+
+def tour_lengths(distances, population):
+    """
+    Calculates the closed tour length of every tour in a population with a single gathered sum
+
+    Args:
+        distances: An n x n array of distances between every pair of cities
+        population: A P x n integer array where each row is a permutation of the city indices
+
+    Returns:
+        An array of P tour lengths
+    """
+    return distances[population, np.roll(population, -1, axis=1)].sum(axis=1)
+
+
+def tour_length(distances, tour):
+    """
+    Calculates the closed length of a single tour
+
+    Args:
+        distances: An n x n array of distances between every pair of cities
+        tour: An array of city indices in the order they are visited
+
+    Returns:
+        The total length
+    """
+    return tour_lengths(distances, np.asarray(tour)[np.newaxis])[0]
+
+
+def nearest_neighbours(distances, k, chunk_size=1024):
+    """
+    Builds a candidate list of the k nearest other cities for every city. Rows of the distance matrix are processed in
+    chunks so only chunk_size rows need to be held at once. Distances that are computed on demand from coordinates use
+    spatial_nearest_neighbours instead of scanning every row
+
+    Args:
+        distances: An n x n array of distances between every pair of cities, or an object indexed the same way
+        k: The number of neighbours to keep for each city. Clipped to n - 1
+        chunk_size: The number of rows to process at once
+
+    Returns:
+        An n x k int32 array where row i holds the neighbours of city i ordered from nearest to furthest
+    """
+    if getattr(distances, 'coordinates', None) is not None:
+        return spatial_nearest_neighbours(distances.coordinates, k)
+    num_cities = len(distances)
+    k = min(k, num_cities - 1)
+    candidates = np.empty((num_cities, k), dtype=np.int32)
+    for start in range(0, num_cities, chunk_size):
+        stop = min(start + chunk_size, num_cities)
+        rows = np.array(distances[start:stop], dtype=float)
+        rows[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        nearest = np.argpartition(rows, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(rows, nearest, axis=1), axis=1)
+        candidates[start:stop] = np.take_along_axis(nearest, order, axis=1)
+    return candidates
+
+
+def nearest_neighbour_tour(distances, start=0):
+    """
+    Builds a tour by always travelling to the closest city that has not been visited yet
+
+    Args:
+        distances: An n x n array of distances between every pair of cities
+        start: The index of the first city
+
+    Returns:
+        An int32 array of city indices in the order they are visited
+    """
+    num_cities = len(distances)
+    visited = np.zeros(num_cities, dtype=bool)
+    tour = np.empty(num_cities, dtype=np.int32)
+    current = start
+    for ind in range(num_cities):
+        tour[ind] = current
+        visited[current] = True
+        if ind < num_cities - 1:
+            current = np.argmin(np.where(visited, np.inf, distances[current]))
+    return tour
+
+
+def spatial_nearest_neighbours(coordinates, k):
+    """
+    Builds a candidate list of nearby cities without a distance matrix. Cities are bucketed into grid squares holding
+    about two cities each and every city only compares itself with the cities in the surrounding squares. The search
+    ring grows until at least k other cities are found, so the result is approximate when a closer city lies just
+    outside the ring
+
+    Args:
+        coordinates: An n x 2 array of city coordinates
+        k: The number of neighbours to keep for each city. Clipped to n - 1
+
+    Returns:
+        An n x k int32 array where row i holds the neighbours of city i ordered from nearest to furthest
+    """
+    num_cities = len(coordinates)
+    k = min(k, num_cities - 1)
+    low = coordinates.min(axis=0)
+    width, height = coordinates.max(axis=0) - low
+    area = width * height if width and height else max(width, height, 1) ** 2
+    cell_size = np.sqrt(2 * area / num_cities)
+    buckets = {}
+    for ind, key in enumerate(map(tuple, np.floor((coordinates - low) / cell_size).astype(np.int64).tolist())):
+        buckets.setdefault(key, []).append(ind)
+
+    candidates = np.empty((num_cities, k), dtype=np.int32)
+    for (cell_x, cell_y), members in buckets.items():
+        radius = 1
+        while True:
+            nearby = [ind for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)
+                      for ind in buckets.get((cell_x + dx, cell_y + dy), ())]
+            if len(nearby) > k:
+                break
+            radius += 1
+        members, nearby = np.array(members), np.array(nearby)
+        block = pairwise_distances(coordinates[members], coordinates[nearby])
+        block[members[:, np.newaxis] == nearby[np.newaxis, :]] = np.inf
+        nearest = np.argpartition(block, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(block, nearest, axis=1), axis=1)
+        candidates[members] = nearby[np.take_along_axis(nearest, order, axis=1)]
+    return candidates
+
+
+def cheapest_insertion(distances, tour, cities):
+    """
+    Adds cities to a tour one at a time, each between the two neighbouring cities where it adds the least length
+
+    Args:
+        distances: An n x n array of distances between every pair of cities
+        tour: The tour to add to as a sequence of city indices
+        cities: The cities to insert
+
+    Returns:
+        A list of city indices in the order they are visited
+    """
+    tour = list(tour)
+    for city in cities:
+        if len(tour) < 2:
+            tour.append(city)
+            continue
+        current = np.array(tour)
+        following = np.roll(current, -1)
+        added = distances[current, city] + distances[following, city] - distances[current, following]
+        tour.insert(int(np.argmin(added)) + 1, city)
+    return tour
+
+
+def _reverse(tour, positions, start, end):
+    """
+    Reverses the tour between two positions inclusive, wrapping around the end of the array. The shorter of the two
+    sides of the cycle is reversed
+    """
+    num_cities = len(tour)
+    length = (end - start) % num_cities + 1
+    if 2 * length > num_cities:
+        start, end = (end + 1) % num_cities, (start - 1) % num_cities
+        length = num_cities - length
+    indices = (start + np.arange(length)) % num_cities
+    tour[indices] = tour[indices[::-1]]
+    positions[tour[indices]] = indices
+
+
+def local_two_opt(coordinates, tour, active, time_budget, num_candidates=8):
+    """
+    Runs 2-opt local search that only starts moves from the given active cities. Each city looks for improving moves
+    that connect it to one of its nearest active neighbours, and cities touched by a move are checked again
+
+    Args:
+        coordinates: An n x 2 array of city coordinates
+        tour: The tour to improve. It is modified in place
+        active: The cities to focus the search on
+        time_budget: The number of seconds after which the search stops
+        num_candidates: The number of neighbours each active city considers
+
+    Returns:
+        The improved tour
+    """
+    start_time = time.perf_counter()
+    num_cities = len(tour)
+    if len(active) < 3 or num_cities < 5:
+        return tour
+    xs, ys = coordinates[:, 0].tolist(), coordinates[:, 1].tolist()
+    distance = lambda a, b: math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+    local = spatial_nearest_neighbours(coordinates[active], num_candidates)
+    candidates = dict(zip(active.tolist(), active[local].tolist()))
+    positions = np.empty(num_cities, dtype=np.int64)
+    positions[tour] = np.arange(num_cities)
+    queue = list(active.tolist())
+    queued = set(queue)
+
+    while queue and time.perf_counter() - start_time < time_budget:
+        city = queue.pop()
+        queued.discard(city)
+        position = positions[city]
+        successor = tour[(position + 1) % num_cities]
+        predecessor = tour[position - 1]
+        for other in candidates[city]:
+            other_position = positions[other]
+            other_successor = tour[(other_position + 1) % num_cities]
+            other_predecessor = tour[other_position - 1]
+            gain = distance(city, successor) + distance(other, other_successor) - \
+                distance(city, other) - distance(successor, other_successor)
+            if gain > 1e-9 and other != successor:
+                _reverse(tour, positions, (position + 1) % num_cities, other_position)
+                touched = (city, successor, other, other_successor)
+                break
+            gain = distance(predecessor, city) + distance(other_predecessor, other) - \
+                distance(city, other) - distance(predecessor, other_predecessor)
+            if gain > 1e-9 and other != predecessor:
+                _reverse(tour, positions, position, (other_position - 1) % num_cities)
+                touched = (city, predecessor, other, other_predecessor)
+                break
+        else:
+            continue
+        for touched_city in touched:
+            if touched_city in candidates and touched_city not in queued:
+                queue.append(touched_city)
+                queued.add(touched_city)
+    return tour
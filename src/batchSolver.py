@@ -0,0 +1,201 @@
+"""
+Headless batch solver. Solves .tscfg files or plain coordinate files without a display and writes the tours and their
+metrics to stdout or to files. Nothing here imports tkinter or matplotlib so it can run on servers and from cron
+
+Ex.
+    python -m src.batchSolver maps/*.tscfg points.txt --solver tabu --time 10 --workers 4 --output results
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+from src.algorithms.temperatureAlgorithms import linear_temperature, decrease_ratio
+from src.algorithms.tours import coordinate_tour_length
+from src.instanceImporter import load_instance
+from src.runtime_models.distanceProvider import DEFAULT_MEMORY_BUDGET, distance_provider
+from src.runtime_models.distanceSidecar import open_sidecar
+
+SOLVERS = ('anneal', 'genetic', 'ant', 'tabu', 'multilevel', 'decomposition')
+SCHEDULES = ('linear', 'ratio')
+
+
+def load_coordinates(path):
+    """
+    Loads the cities of a file. .tscfg files are loaded as a SalesmanConfig and .tsp files as TSPLIB. Any other file is
+    read as text where the last two fields of each line are the x and y coordinate of a city, split by whitespace or
+    commas. Lines that do not end in two numbers, like headers, are skipped
+
+    Args:
+        path: The file to load
+
+    Returns:
+        An n x 2 array of city coordinates
+    """
+    if path.endswith('.tscfg'):
+        from src.saveable.salesmanConfig import SalesmanConfig
+        config = SalesmanConfig()
+        with open(path, 'rb') as file:
+            config.load_from(file)
+        return config.nodes.coordinates()
+    return load_instance(path)[1]
+
+
+def temperatures(coordinates, schedule, steps, ratio):
+    """
+    Builds the temperatures of an annealing run. Both schedules start at the diagonal of the bounding box of the cities
+    """
+    width, height = coordinates.max(axis=0) - coordinates.min(axis=0)
+    if schedule == 'linear':
+        return linear_temperature(math.hypot(width, height), steps)
+    return decrease_ratio(math.hypot(width, height), ratio, steps)
+
+
+def anneal(coordinates, temperature_list, cancel):
+    """
+    Anneals the cities in the order they were loaded
+
+    Returns:
+        The order of the cities after annealing
+    """
+    from src.algorithms.simulatedAnnealing import simulated_annealing
+    from src.runtime_models.simulatedAnnealingModel import PathState, CoordinateWeights, SuccessorChooseType
+    state = PathState(CoordinateWeights(coordinates), SuccessorChooseType.BOTH_RANDOM, False)
+    state.nodes = list(range(len(coordinates))) + [0]
+    state.generate_next_indices()
+    simulated_annealing(state, False, temperature_list, cancel=cancel)
+    return state.nodes[:-1]
+
+
+def solve(path, options):
+    """
+    Solves a single file. Runs in a worker process of the pool
+
+    Args:
+        path: The file to solve
+        options: The parsed command line arguments
+
+    Returns:
+        A dictionary of the metrics of the run that includes the tour as indices in the order the cities were loaded
+    """
+    coordinates = load_coordinates(path)
+    random.seed(options.seed)
+    cancel = threading.Event()
+    timer = threading.Timer(options.time, cancel.set) if options.time else None
+    start = time.perf_counter()
+    if timer:
+        timer.start()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            tour = run_solver(path, coordinates, options, cancel)
+    finally:
+        if timer:
+            timer.cancel()
+    return {'file': path,
+            'solver': options.solver,
+            'cities': len(coordinates),
+            'length': coordinate_tour_length(coordinates, tour),
+            'seconds': time.perf_counter() - start,
+            'tour': [int(city) for city in tour]}
+
+
+def run_solver(path, coordinates, options, cancel):
+    """
+    Runs the chosen solver. The cancel event is set once the time budget has passed
+
+    Returns:
+        The tour as a sequence of city indices
+    """
+    if len(coordinates) < 4:
+        return list(range(len(coordinates)))
+    if options.solver == 'anneal':
+        return anneal(coordinates, temperatures(coordinates, options.schedule, options.steps, options.ratio), cancel)
+    if options.solver == 'multilevel':
+        from src.algorithms.multilevel import multilevel_anneal
+        return multilevel_anneal(coordinates, coarse_steps=options.steps)[0]
+    if options.solver == 'decomposition':
+        from src.algorithms.decomposition import decomposition_solve
+        return decomposition_solve(coordinates, time_budget=options.time, seed=options.seed)
+    if options.sidecar:
+        distances = open_sidecar(path + '.dist', coordinates, options.sidecar)
+    else:
+        distances = distance_provider(coordinates, options.memory_budget * 2**20)
+    if options.solver == 'genetic':
+        from src.algorithms.geneticAlgorithm import genetic_algorithm
+        return genetic_algorithm(distances, options.steps, cancel=cancel, seed=options.seed)[0]
+    if options.solver == 'ant':
+        from src.algorithms.antColony import ant_colony
+        return ant_colony(distances, options.steps, cancel=cancel, seed=options.seed)[0]
+    from src.algorithms.tabuSearch import tabu_search
+    return tabu_search(distances, options.time or 10, cancel=cancel)[0]
+
+
+def write_result(result, options):
+    """
+    Writes the metrics of a run to stdout. If an output directory was given the tour is also written to
+    <output>/<file name>.tour with one city index per line and the metrics to <output>/<file name>.json
+    """
+    metrics = {key: value for key, value in result.items() if key != 'tour'}
+    if options.output:
+        name = os.path.join(options.output, os.path.basename(result['file']))
+        with open(name + '.tour', 'w') as file:
+            file.write('\n'.join(str(city) for city in result['tour']) + '\n')
+        with open(name + '.json', 'w') as file:
+            json.dump(metrics, file)
+    if options.json:
+        print(json.dumps(metrics if options.output else result))
+    else:
+        print('{file}\t{solver}\t{cities}\t{length:.3f}\t{seconds:.2f}'.format(**result))
+    sys.stdout.flush()
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description='Solves travelling salesman problems without a display')
+    parser.add_argument('files', nargs='+', help='.tscfg files or text files with an x and y coordinate per line')
+    parser.add_argument('--solver', choices=SOLVERS, default='anneal')
+    parser.add_argument('--schedule', choices=SCHEDULES, default='linear', help='Cooling schedule of anneal')
+    parser.add_argument('--steps', type=int, default=100000,
+                        help='Annealing steps, generations or iterations depending on the solver')
+    parser.add_argument('--ratio', type=float, default=.99999, help='Cooling ratio of the ratio schedule')
+    parser.add_argument('--time', type=float, default=None, help='Time budget in seconds of each job')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=1, help='Number of jobs solved at once')
+    parser.add_argument('--output', default=None, help='Directory that tours and metrics are written to')
+    parser.add_argument('--sidecar', choices=('float32', 'float64'), default=None,
+                        help='Keep the distances in a memory mapped <file>.dist next to each file')
+    parser.add_argument('--memory-budget', type=int, default=DEFAULT_MEMORY_BUDGET // 2**20,
+                        help='MB a dense distance matrix may take before distances are computed on demand')
+    parser.add_argument('--json', action='store_true', help='Write metrics to stdout as JSON lines')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    """
+    Solves every file given on the command line across a pool of worker processes. Results are written in the order
+    the jobs finish. Returns a non-zero exit code if any job failed
+    """
+    options = parse_args(args)
+    if options.output:
+        os.makedirs(options.output, exist_ok=True)
+    failed = False
+    with concurrent.futures.ProcessPoolExecutor(options.workers) as executor:
+        jobs = {executor.submit(solve, path, options): path for path in options.files}
+        for job in concurrent.futures.as_completed(jobs):
+            try:
+                write_result(job.result(), options)
+            except Exception as error:
+                print('{}: {}'.format(jobs[job], error), file=sys.stderr)
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,7 +3,12 @@ import enum
 
 class ChangeType(enum.Enum):
     """
-    Constant used for Observables to notify observers that something has been changed or removed
+    Constant used for Observables to notify observers that something has been changed or removed. EXTEND and
+    REMOVE_MANY are sent once with a list of every value when many are added or removed at once. VALUE_CHANGE is sent
+    when a field of a value is set
     """
     ADD = 1
     REMOVE = 2
+    EXTEND = 3
+    REMOVE_MANY = 4
+    VALUE_CHANGE = 5
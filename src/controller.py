@@ -1,13 +1,18 @@
+import concurrent.futures
 import enum
-from PIL import Image
+import random
+import time
+import numpy as np
 from src.algorithms.simulatedAnnealing import simulated_annealing
-from src.graphing.graphing import draw
+from src.algorithms.temperatureAlgorithms import decrease_ratio
+from src.algorithms.tours import tour_length, coordinate_tour_length, local_two_opt
+from src.constants import ChangeType
 from src.graphing.graph import Graph
 from src.graphing.subplot import SubPlot
 from src.observable import Observable
 from src.saveable.salesmanConfig import SalesmanConfig
 from src.saveable.node import Node
-from src.runtime_models.simulatedAnnealingModel import SimulatedAnnealingModel
+from src.runtime_models.simulatedAnnealingModel import SimulatedAnnealingModel, SuccessorChooseType
 
 
 
@@ -23,22 +28,84 @@ def load_image(name):
     """
     Opens an image file from a path and returns it
     """
+    from PIL import Image
     with open(name, 'rb') as file:
         image = Image.open(file)
         image.load()
         return image
 
 
+def draw(subplots, title=''):
+    """
+    Draws graphs in a new window. matplotlib and tkinter are only imported the first time graphs are drawn, so the
+    controller can be used without a display
+    """
+    from src.graphing.graphing import draw as draw_graphs
+    draw_graphs(subplots, title)
+
+
+def tour_edges(tour):
+    """
+    Gets the edges of a closed tour
+
+    Args:
+        tour: A sequence of nodes in the order they are visited
+
+    Returns:
+        A set of frozensets of two nodes
+    """
+    if len(tour) < 2:
+        return set()
+    return {frozenset((tour[ind-1], tour[ind])) for ind in range(len(tour))}
+
+
 class Controller(Observable):
     """
     Controller used for the GUI to perform some non-trivial functions
     """
+    REPAIR_NEIGHBOURS = 15  # The number of nodes around an edited node that live repair searches
+
     def __init__(self):
         Observable.__init__(self)
         self.model = SalesmanConfig()               # The model that contains all of the save able configuration data
         self.annealing = SimulatedAnnealingModel()  # A model that contains all of the runtime information
+        self.annealing.track(self.model.nodes)
         self.max_dist_func = lambda: 1           # Function that is used to determine the maximum possible path distance
         self.get_successor_type = lambda: None
+        self.best_tour = []                         # The nodes of the last tour found in the order they are visited
+        self.live_repair = False                    # Whether edits to the nodes repair the last tour immediately
+        self.draw_graphs = draw                     # Function that is given the graphs generated by a run
+        self.executor = concurrent.futures.ThreadPoolExecutor()  # Default executor of runs made with submit_run
+        self.cache = None                           # Optional ResultCache of seeded runs
+        self.path = None                            # The path the model was last saved to or loaded from
+        self.sidecar_dtype = None                   # If set the solvers read distances from a sidecar of self.path
+        self.autosave = False                       # Whether node edits are journaled next to self.path
+        self.journal = None                         # The Journal of node edits while autosave is on
+
+    def set_autosave(self, autosave):
+        """
+        Turns journaling of node edits on or off. Edits are only journaled once the model has a path
+        """
+        self.autosave = autosave
+        self.close_journal()
+        self.open_journal()
+
+    def open_journal(self):
+        if self.autosave and self.path is not None:
+            from src.saveable.journal import Journal
+            self.journal = Journal(self.model, self.path, before_compact=self.store_tour)
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def store_tour(self):
+        """
+        Stores the indices of the nodes of the best tour in the model so it is saved with them
+        """
+        index = {node: ind for ind, node in enumerate(self.model.nodes)}
+        self.model.tour = [index[node] for node in self.best_tour if node in index]
 
     def save(self, path):
         """
@@ -47,21 +114,30 @@ class Controller(Observable):
         Args:
             path: The path to save to
         """
-        data = self.model.to_byte_array()
-        file = open(path, 'wb')
-        file.write(data)
-        file.close()
+        self.close_journal()
+        self.store_tour()
+        with open(path, 'wb') as file:
+            self.model.save_to(file)
+        self.path = path
+        self.open_journal()
 
     def load(self, path):
         """
-        Loads the model from a file path
+        Loads the model from a file path. Node edits journaled after the file was last saved are replayed
 
         Args:
             path: The path to load from
         """
-        file = open(path, 'rb')
-        array = bytearray(file.read())
-        self.model.load_in_place(array)
+        from src.saveable.journal import replay
+        self.close_journal()
+        with open(path, 'rb') as file:
+            self.model.load_from(file)
+        nodes = self.model.nodes
+        best_tour = [nodes[ind] for ind in self.model.tour if ind < len(nodes)]
+        replay(self.model, path)
+        self.best_tour = [node for node in best_tour if node in self.model.nodes]
+        self.path = path
+        self.open_journal()
 
     def new(self, name):
         """
@@ -71,8 +147,39 @@ class Controller(Observable):
             name: Name of the image file to load
         """
         img = load_image(name)
+        self.close_journal()
+        self.model.pixel_shift = 0
         self.model.background = img
         self.model.nodes.clear()
+        self.best_tour = []
+        self.path = None
+
+    def import_instance(self, path, chunk_size=None):
+        """
+        Replaces the nodes with the cities of a TSPLIB .tsp file or a CSV file of coordinates. The cities are scaled to
+        fit the background, or a blank background made for them if there is none. The old nodes are removed and the
+        cities added in one batch of notifications, so an open journal compacts once. The pixel shift of the model is
+        set so the grid of the nodes is fine enough to keep the cities apart
+
+        Args:
+            path: The file to import
+            chunk_size: The number of lines parsed at a time, defaults to CHUNK_SIZE of the importer
+
+        Returns:
+            The number of nodes imported
+        """
+        from src.instanceImporter import CHUNK_SIZE, blank_background, fit_to_image, load_instance, pixel_shift
+        names, coordinates = load_instance(path, chunk_size or CHUNK_SIZE)
+        if self.model.background is None:
+            self.model.background = blank_background(coordinates)
+        shift = pixel_shift(coordinates, *self.model.background.size)
+        grid = fit_to_image(coordinates, *self.model.background.size, shift=shift)
+        self.best_tour = []
+        with self.model.nodes.batch():
+            self.model.nodes.clear()
+            self.model.pixel_shift = shift
+            self.model.nodes.extend_columns(grid[:, 0], grid[:, 1], names)
+        return len(names)
 
     def create_node(self, x, y):
         """
@@ -82,11 +189,11 @@ class Controller(Observable):
             x: The x-coordinate
             y: The y-coordinate
         """
-        node = Node()
-        node.x = x
-        node.y = y
-        node.name = 'Node'
+        node = Node(x, y, 'Node')
         self.model.nodes.append(node)
+        if self.live_repair:
+            self.repair(node)
+        return node
 
     def delete_node(self, node):
         """
@@ -96,25 +203,314 @@ class Controller(Observable):
             node: The node to delete
         """
         self.model.nodes.remove(node)
+        if self.live_repair:
+            self.repair()
 
-    def run(self, temperatures, *, generate_graphs=False, track_lengths=False, graph_scale=None, notify_canvas=True):
+    def set_live_repair(self, enabled):
         """
-        Given a list of temperatures, runs the simulation
+        Turns live repair on or off. When it is turned on the last tour is made valid for the current nodes and shown
+
+        Args:
+            enabled: Whether edits should repair the tour
+        """
+        self.live_repair = enabled
+        if enabled and len(self.model.nodes):
+            self.repair()
+            with self.annealing.batch():
+                for edge in tour_edges(self.best_tour):
+                    self.annealing.notify_observers(ChangeType.ADD, *edge)
+
+    def repair(self, node=None, time_budget=.03):
+        """
+        Keeps the last tour good after a single edit without a full run. Removed nodes are spliced out and node, along
+        with any other node missing from the tour, is inserted where it adds the least length. A 2-opt search limited
+        to the nodes around node then runs until time_budget seconds have passed since the repair started. Observers of
+        the annealing model are only notified of the edges that changed
+
+        Args:
+            node: The node that was added or moved, if any
+            time_budget: The number of seconds the repair may take
+        """
+        start_time = time.perf_counter()
+        old_edges = tour_edges(self.best_tour)
+        self.annealing.nodes = self.model.nodes.values[:]
+        order = self.annealing.warm_start_order([other for other in self.best_tour if other is not node])
+        if node is not None and len(order) > 4:
+            index = {other: ind for ind, other in enumerate(self.annealing.nodes)}
+            tour = np.array([index[other] for other in order])
+            active = self.annealing.distances.neighbourhood(node, self.REPAIR_NEIGHBOURS)
+            tour = local_two_opt(self.model.nodes.coordinates(), tour, active,
+                                 max(time_budget - (time.perf_counter() - start_time), 0))
+            order = [self.annealing.nodes[ind] for ind in tour]
+        self.best_tour = order
+        new_edges = tour_edges(order)
+        with self.annealing.batch():
+            for edge in old_edges - new_edges:
+                self.annealing.notify_observers(ChangeType.REMOVE, *edge)
+            for edge in new_edges - old_edges:
+                self.annealing.notify_observers(ChangeType.ADD, *edge)
+
+    def keep_tour(self, order):
+        """
+        Remembers the tour found by a solver so it is saved and can be used to warm start the next run
+
+        Args:
+            order: A sequence of indices into the nodes of the run in the order they are visited
+        """
+        self.best_tour = [self.annealing.nodes[ind] for ind in order]
+
+    def run(self, temperatures, *, generate_graphs=False, track_lengths=False, graph_scale=None, notify_canvas=True,
+            warm_start=False, successor_type=None, progress=None, cancel=None, seed=None, bypass_cache=False):
+        """
+        Given a list of temperatures, runs the simulation. If warm_start is true the run starts from the last tour
+        found instead of the order the nodes were placed in. successor_type defaults to get_successor_type().
+        progress(step, state) is called periodically and the run stops early once the cancel event is set
+
+        A run with a seed is reproducible, so if self.cache is set it is looked up there first and stored there once it
+        finishes. bypass_cache skips the lookup and replaces the stored run
         """
         self.annealing.nodes = self.model.nodes.values[:]
         self.notify_observers(RunStatus.START)
-        start_state = self.annealing.start_state(self.get_successor_type(), notify_canvas)
-        lengths = simulated_annealing(start_state, track_lengths or generate_graphs, temperatures)
+        order = self.annealing.warm_start_order(self.best_tour) if warm_start and self.best_tour else None
+        if successor_type is None:
+            successor_type = self.get_successor_type()
+        track = track_lengths or generate_graphs
+        key, cached = None, None
+        if self.cache is not None and seed is not None:
+            from src.resultCache import run_key
+            index = {node: ind for ind, node in enumerate(self.annealing.nodes)}
+            start = [index[node] for node in order] if order else list(range(len(index)))
+            key = run_key(self.model.nodes.coordinates(), start, temperatures, successor_type, seed)
+            if not bypass_cache:
+                cached = self.cache.get(key, need_lengths=track)
+        if cached:
+            tour, value, lengths = cached
+            lengths = lengths if track else None
+            self.keep_tour(tour)
+            if notify_canvas:
+                self.annealing.show_tour(tour)
+        else:
+            rng = random if seed is None else random.Random(seed)
+            start_state = self.annealing.start_state(successor_type, notify_canvas, order, rng)
+            lengths = simulated_annealing(start_state, track, temperatures, progress=progress, cancel=cancel, rng=rng)
+            self.best_tour = start_state.nodes[:-1]
+            value = start_state.value()
+            if key and not (cancel is not None and cancel.is_set()):
+                self.cache.put(key, [index[node] for node in self.best_tour], value, lengths)
         if generate_graphs:
-            graphs = [[SubPlot(Graph(list(range(len(temperatures))), lengths, plot_type='-'),
+            steps = list(range(len(lengths)))
+            graphs = [[SubPlot(Graph(steps, lengths, plot_type='-'),
                                title='Path Length at each Step',
                                x_label='Step', y_label='Total Path Length'),
-                       SubPlot(Graph(list(range(len(temperatures))), temperatures, plot_type='-'),
+                       SubPlot(Graph(steps, temperatures[:len(lengths)], plot_type='-'),
                                title='Temperature at each Step',
                                x_label='Step', y_label='Temperature',
                                log=graph_scale)]]
-            draw(graphs)
+            self.draw_graphs(graphs)
+        self.notify_observers(RunStatus.END)
+        return value, lengths
+
+    def submit_run(self, temperatures, *, successor_type=None, warm_start=False, track_lengths=False, progress=None,
+                   progress_interval=1000, executor=None, seed=None):
+        """
+        Starts a simulation without waiting for it to finish. The run anneals its own copy of the current nodes, so it
+        does not notify any observers or change best_tour, and several runs with different temperatures and successor
+        types can be in flight at once
+
+        Args:
+            temperatures: The temperature of each step
+            successor_type: The SuccessorChooseType of the run, defaults to get_successor_type()
+            warm_start: Whether the run starts from the last tour found instead of the order the nodes were placed in
+            track_lengths: Whether the value of every step is part of the result
+            progress: Optional callable that is called as progress(step, length) on the thread running the simulation
+            progress_interval: The number of steps between progress updates and cancel checks
+            executor: The concurrent.futures.Executor to run on, defaults to self.executor
+            seed: Seeds the random number generator of the run, which is its own, so a seeded run gives the same tour
+                whatever else is in flight
+
+        Returns:
+            A RunHandle of the submitted run
+        """
+        self.annealing.nodes = self.model.nodes.values[:]
+        nodes = self.annealing.nodes
+        index = {node: ind for ind, node in enumerate(nodes)}
+        if warm_start and self.best_tour:
+            order = [index[node] for node in self.annealing.warm_start_order(self.best_tour)]
+        else:
+            order = list(range(len(nodes)))
+        if successor_type is None:
+            successor_type = self.get_successor_type()
+        from src.runHandle import RunHandle
+        handle = RunHandle(nodes, progress)
+        coordinates = self.model.nodes.coordinates()
+        (executor or self.executor).submit(handle.execute, coordinates, order, list(temperatures), successor_type,
+                                           track_lengths, progress_interval, seed)
+        return handle
+
+    def sweep(self, points, **kwargs):
+        """
+        Creates a parameter Sweep over the current nodes
+
+        Args:
+            points: The parameter grid, see sweep_grid
+            kwargs: Keyword arguments passed on to Sweep. The cache defaults to self.cache
+
+        Returns:
+            The Sweep, which has not been run yet
+        """
+        self.annealing.nodes = self.model.nodes.values[:]
+        kwargs.setdefault('cache', self.cache)
+        from src.parameterSweep import Sweep
+        return Sweep(self.model.nodes.coordinates(), points, **kwargs)
+
+    def refine(self, num_steps, *, temperature=.05, notify_canvas=True):
+        """
+        Runs a short low temperature anneal starting from the last tour found. Meant to replace a full run after small
+        edits to the nodes. With fewer than three nodes every order is the same tour, so it is kept without annealing
+
+        Args:
+            num_steps: The number of annealing steps
+            temperature: The starting temperature as a fraction of the average edge length of the warm started tour
+        """
+        self.annealing.nodes = self.model.nodes.values[:]
+        self.annealing.init()
+        self.best_tour = self.annealing.warm_start_order(self.best_tour)
+        weights = self.annealing.weights
+        order = self.best_tour
+        length = sum(weights[frozenset((order[ind-1], order[ind]))] for ind in range(len(order)))
+        if len(order) < 3:
+            return length, [length]
+        average = length / len(order)
+        return self.run(decrease_ratio(temperature * average, .001 ** (1 / num_steps), num_steps),
+                        notify_canvas=notify_canvas, warm_start=True)
+
+    def distance_matrix(self):
+        """
+        Gets the distances between the nodes of the run. If sidecar_dtype is set and the model has a path they are read
+        from a memory mapped sidecar file next to it, which is only rebuilt when the node coordinates change
+
+        Returns:
+            An n x n array, or CondensedDistances that are indexed the same way
+        """
+        if self.sidecar_dtype is None or self.path is None:
+            return self.annealing.distance_matrix()
+        from src.runtime_models.distanceSidecar import open_sidecar
+        return open_sidecar(self.path + '.dist', self.model.nodes.coordinates(), self.sidecar_dtype)
+
+    def run_genetic(self, generations, *, population_size=100, mutation_rate=0.2, progress=None, cancel=None,
+                    generate_graphs=False, notify_canvas=True):
+        """
+        Solves the current nodes with the genetic algorithm and optionally graphs the best and mean path length of each
+        generation
+        """
+        from src.algorithms.geneticAlgorithm import genetic_algorithm
+        self.annealing.nodes = self.model.nodes.values[:]
+        self.notify_observers(RunStatus.START)
+        distances = self.distance_matrix()
+        best_tour, best_lengths, mean_lengths = genetic_algorithm(distances, generations,
+                                                                  population_size=population_size,
+                                                                  mutation_rate=mutation_rate,
+                                                                  progress=progress, cancel=cancel)
+        self.keep_tour(best_tour)
+        if notify_canvas:
+            self.annealing.show_tour(best_tour)
+        if generate_graphs:
+            generation_numbers = list(range(len(best_lengths)))
+            graphs = [[SubPlot(Graph(generation_numbers, best_lengths, plot_type='-', legend_label='Best'),
+                               Graph(generation_numbers, mean_lengths, plot_type='-', legend_label='Mean'),
+                               title='Path Length at each Generation',
+                               x_label='Generation', y_label='Total Path Length')]]
+            self.draw_graphs(graphs)
         self.notify_observers(RunStatus.END)
-        return start_state.value(), lengths
+        return tour_length(distances, best_tour), best_lengths
 
+    def run_ant_colony(self, iterations, *, num_ants=10, time_budget=None, progress=None, cancel=None,
+                       generate_graphs=False, notify_canvas=True):
+        """
+        Solves the current nodes with an Ant Colony System. The run stops after the given number of iterations or once
+        time_budget seconds have passed. progress(iteration, best_length) is called after every iteration
+        """
+        from src.algorithms.antColony import ant_colony
+        self.annealing.nodes = self.model.nodes.values[:]
+        self.notify_observers(RunStatus.START)
+        distances = self.distance_matrix()
+        best_tour, best_lengths = ant_colony(distances, iterations, num_ants=num_ants, time_budget=time_budget,
+                                             progress=progress, cancel=cancel)
+        self.keep_tour(best_tour)
+        if notify_canvas:
+            self.annealing.show_tour(best_tour)
+        if generate_graphs:
+            graphs = [[SubPlot(Graph(list(range(len(best_lengths))), best_lengths, plot_type='-'),
+                               title='Best Path Length at each Iteration',
+                               x_label='Iteration', y_label='Total Path Length')]]
+            self.draw_graphs(graphs)
+        self.notify_observers(RunStatus.END)
+        return tour_length(distances, best_tour), best_lengths
+
+    def run_tabu(self, time_budget, *, iterations=None, progress=None, cancel=None, generate_graphs=False,
+                 notify_canvas=True):
+        """
+        Solves the current nodes with tabu search for time_budget CPU seconds. The graphs show the best path length
+        against the CPU time used so it can be compared with the cooling schedules
+        """
+        from src.algorithms.tabuSearch import tabu_search
+        self.annealing.nodes = self.model.nodes.values[:]
+        self.notify_observers(RunStatus.START)
+        distances = self.distance_matrix()
+        best_tour, best_lengths, cpu_times = tabu_search(distances, time_budget, iterations=iterations,
+                                                         progress=progress, cancel=cancel)
+        self.keep_tour(best_tour)
+        if notify_canvas:
+            self.annealing.show_tour(best_tour)
+        if generate_graphs:
+            graphs = [[SubPlot(Graph(list(range(len(best_lengths))), best_lengths, plot_type='-'),
+                               title='Best Path Length at each Iteration',
+                               x_label='Iteration', y_label='Total Path Length'),
+                       SubPlot(Graph(cpu_times, best_lengths, plot_type='-'),
+                               title='Best Path Length over CPU Time',
+                               x_label='CPU Time (s)', y_label='Total Path Length')]]
+            self.draw_graphs(graphs)
+        self.notify_observers(RunStatus.END)
+        return tour_length(distances, best_tour), best_lengths
 
+    def run_decomposition(self, *, num_cells=None, scale=None, cell_time=1, polish_time=5, max_workers=None,
+                          notify_canvas=True):
+        """
+        Solves the current nodes by splitting them into spatial cells that are solved in parallel worker processes and
+        stitched back together. Meant for instances that are too large for a single chain
+        """
+        from src.algorithms.decomposition import decomposition_solve
+        self.annealing.nodes = self.model.nodes.values[:]
+        self.notify_observers(RunStatus.START)
+        coordinates = self.model.nodes.coordinates()
+        tour = decomposition_solve(coordinates, num_cells=num_cells, scale=scale, cell_time=cell_time,
+                                   polish_time=polish_time, max_workers=max_workers)
+        self.keep_tour(tour)
+        if notify_canvas:
+            self.annealing.show_tour(tour)
+        self.notify_observers(RunStatus.END)
+        return coordinate_tour_length(coordinates, tour), tour
+
+    def run_multilevel(self, *, coarse_size=200, coarse_steps=100000, refine_steps=20, generate_graphs=False,
+                       notify_canvas=True):
+        """
+        Solves the current nodes by coarsening them into super-nodes, annealing the coarse instance and refining the
+        tour with short low temperature anneals on each finer level
+        """
+        from src.algorithms.multilevel import multilevel_anneal
+        self.annealing.nodes = self.model.nodes.values[:]
+        self.notify_observers(RunStatus.START)
+        tour, level_lengths = multilevel_anneal(self.model.nodes.coordinates(), coarse_size=coarse_size,
+                                                coarse_steps=coarse_steps, refine_steps=refine_steps,
+                                                successor_choose_type=self.get_successor_type() or
+                                                SuccessorChooseType.RANDOM_WINDOW)
+        self.keep_tour(tour)
+        if notify_canvas:
+            self.annealing.show_tour(tour)
+        if generate_graphs:
+            graphs = [[SubPlot(Graph(list(range(len(level_lengths))), level_lengths, plot_type='-o'),
+                               title='Path Length after each Level',
+                               x_label='Level (coarsest first)', y_label='Total Path Length')]]
+            self.draw_graphs(graphs)
+        self.notify_observers(RunStatus.END)
+        return level_lengths[-1], tour
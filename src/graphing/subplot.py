@@ -1,4 +1,4 @@
-import collections
+import collections.abc
 
 
 class SubPlot:
@@ -22,7 +22,7 @@ class SubPlot:
             y_label: The label for the y-axis of this subplot
             title: The title for this subplot
         """
-        if isinstance(args[0], collections.Sequence):
+        if isinstance(args[0], collections.abc.Sequence):
             self.graphs = args[0]
         else:
             self.graphs = args
@@ -1,11 +1,13 @@
+import functools
+import multiprocessing
+import threading
 from tkinter import ttk
 import tkinter as tk
 import numpy as np
 from src.integercheck import int_validate
 from src.algorithms.temperatureAlgorithms import linear_temperature, decrease_ratio
-from src.graphing.graphing import draw
-from src.graphing.subplot import SubPlot
-from src.graphing.graph import Graph
+from src.parameterSweep import sweep_grid
+from src.controller import draw
 
 
 class Linear(ttk.Frame):
@@ -75,25 +77,121 @@ class Ratio(ttk.Frame):
         return decrease_ratio(self.controller.max_dist_func(), self.ratio_var.get(), self.steps_var.get())
 
     def on_test(self):
-        steps = self.steps_var.get()
-        max_ = self.controller.max_dist_func()
-        graphs = []
-        ratios = list(np.arange(0, 1, .2))
-        ratios.extend((0.9, .95))
-        for ratio in ratios:
-            temps = decrease_ratio(max_, ratio, steps)
-            list_of_values = []
-            for _ in range(25):
-                final_value, values = self.controller.run(temps, track_lengths=True, notify_canvas=False)
-                list_of_values.append(values)
-            average_values = list(map(lambda val: sum(val)/len(val), zip(*list_of_values)))
-            graphs.append(Graph(list(range(len(temps))), average_values, plot_type='-',
-                                legend_label='Ratio={:.2f}'.format(ratio)))
-
-        plots = [[SubPlot(*graphs, x_label='Step', y_label='Total Path Length')]]
-
-        draw(plots, title='Average Path Length for Various Ratios Over 25 Runs')
+        """
+        Sweeps a range of ratios with 25 seeds each on a background thread and graphs the average path length of each
+        ratio once the sweep is done. The worker processes are spawned rather than forked from the threaded GUI
+        """
+        ratios = list(np.arange(0, 1, .2)) + [.9, .95]
+        points = sweep_grid(ratio=ratios, steps=[self.steps_var.get()],
+                            successor=[self.controller.get_successor_type()], seed=range(25))
+        sweep = self.controller.sweep(points, start_temperature=self.controller.max_dist_func())
+        worker = threading.Thread(target=functools.partial(sweep.run, mp_context=multiprocessing.get_context('spawn')),
+                                  daemon=True)
+        worker.start()
+        self.test_button.state(['disabled'])
+        self.after(100, self.on_test_done, worker, sweep)
+
+    def on_test_done(self, worker, sweep):
+        """
+        Waits for the sweep of on_test to finish and draws its graphs
+        """
+        if worker.is_alive():
+            self.after(100, self.on_test_done, worker, sweep)
+            return
+        self.test_button.state(['!disabled'])
+        draw(sweep.graphs(lambda params: 'Ratio={:.2f}'.format(params['ratio'])),
+             title='Average Path Length for Various Ratios Over 25 Runs')
 
     @staticmethod
     def graph_scale():
         return 'y'
+
+
+class Genetic(ttk.Frame):
+    def __init__(self, parent, controller):
+        ttk.Frame.__init__(self, parent)
+        self.controller = controller
+        self.generations_var = tk.IntVar()
+        self.generations_var.set(500)
+        self.population_var = tk.IntVar()
+        self.population_var.set(100)
+        self.mutation_var = tk.DoubleVar()
+        generations_label = ttk.Label(self, text='Number of Generations')
+        generations_entry = ttk.Entry(self, textvariable=self.generations_var, justify=tk.CENTER)
+        int_validate(generations_entry, (0, 100000))
+        population_label = ttk.Label(self, text='Population Size')
+        population_entry = ttk.Entry(self, textvariable=self.population_var, justify=tk.CENTER)
+        int_validate(population_entry, (0, 10000))
+        self.mutation_label = ttk.Label(self)
+        mutation_scale = ttk.Scale(self, orient=tk.HORIZONTAL, from_=0, to=1,
+                                   variable=self.mutation_var, command=self.on_mutation_change)
+
+        generations_label.pack()
+        generations_entry.pack(expand=tk.YES, fill=tk.X)
+        population_label.pack()
+        population_entry.pack(expand=tk.YES, fill=tk.X)
+        self.mutation_label.pack()
+        mutation_scale.pack(expand=tk.YES, fill=tk.X)
+
+        self.mutation_var.set(.2)
+        self.on_mutation_change(None)
+
+    def on_mutation_change(self, event):
+        self.mutation_label.config(text='Mutation Rate: {:.2f}'.format(self.mutation_var.get()))
+
+    def solver(self, generate_graphs):
+        return functools.partial(self.controller.run_genetic, self.generations_var.get(),
+                                 population_size=self.population_var.get(),
+                                 mutation_rate=self.mutation_var.get(),
+                                 generate_graphs=generate_graphs)
+
+
+class AntColony(ttk.Frame):
+    def __init__(self, parent, controller):
+        ttk.Frame.__init__(self, parent)
+        self.controller = controller
+        self.iterations_var = tk.IntVar()
+        self.iterations_var.set(200)
+        self.ants_var = tk.IntVar()
+        self.ants_var.set(10)
+        self.time_var = tk.IntVar()
+        self.time_var.set(60)
+        iterations_label = ttk.Label(self, text='Number of Iterations')
+        iterations_entry = ttk.Entry(self, textvariable=self.iterations_var, justify=tk.CENTER)
+        int_validate(iterations_entry, (0, 100000))
+        ants_label = ttk.Label(self, text='Number of Ants')
+        ants_entry = ttk.Entry(self, textvariable=self.ants_var, justify=tk.CENTER)
+        int_validate(ants_entry, (0, 1000))
+        time_label = ttk.Label(self, text='Time Budget (s)')
+        time_entry = ttk.Entry(self, textvariable=self.time_var, justify=tk.CENTER)
+        int_validate(time_entry, (0, 100000))
+
+        iterations_label.pack()
+        iterations_entry.pack(expand=tk.YES, fill=tk.X)
+        ants_label.pack()
+        ants_entry.pack(expand=tk.YES, fill=tk.X)
+        time_label.pack()
+        time_entry.pack(expand=tk.YES, fill=tk.X)
+
+    def solver(self, generate_graphs):
+        return functools.partial(self.controller.run_ant_colony, self.iterations_var.get(),
+                                 num_ants=self.ants_var.get(),
+                                 time_budget=self.time_var.get(),
+                                 generate_graphs=generate_graphs)
+
+
+class Tabu(ttk.Frame):
+    def __init__(self, parent, controller):
+        ttk.Frame.__init__(self, parent)
+        self.controller = controller
+        self.time_var = tk.IntVar()
+        self.time_var.set(10)
+        time_label = ttk.Label(self, text='CPU Time Budget (s)')
+        time_entry = ttk.Entry(self, textvariable=self.time_var, justify=tk.CENTER)
+        int_validate(time_entry, (0, 100000))
+
+        time_label.pack()
+        time_entry.pack(expand=tk.YES, fill=tk.X)
+
+    def solver(self, generate_graphs):
+        return functools.partial(self.controller.run_tabu, self.time_var.get(), generate_graphs=generate_graphs)
@@ -4,7 +4,7 @@ import operator
 import time
 
 from src.constants import ChangeType
-from src.controller import RunStatus
+from src.controller import RunStatus, tour_edges
 from src.gui.nodeEditor import NodeEditor
 
 from src.grid import Grid
@@ -22,6 +22,7 @@ class CanvasMap(tk.Canvas):
         min_scale: The minimum scale that the background should be set to
         max_scale: The maximum scale that the background should be set to
         grid: The grid that holds the scale and provides conversion functions between them
+        pixel_size: The number of node coordinate units along each side of a background pixel
         running: Should only be true while the simulation is running
         edges: A map of edges to the tk item drawn on the canvas. Each edge is stored as a frozenset of two nodes,
             eg. frozenset([node1, node2])
@@ -48,6 +49,7 @@ class CanvasMap(tk.Canvas):
         self.min_scale = 1
         self.max_scale = 1
         self.grid = None
+        self.pixel_size = 1
         self.running = False
         self.edges = {}
 
@@ -76,12 +78,26 @@ class CanvasMap(tk.Canvas):
         """
         if self.background_item:
             self.delete(self.background_item)
-        width, height = self.image.size
+        width, height = (size * self.pixel_size for size in self.image.size)
         self.config(width=width*self.grid.scale, height=height*self.grid.scale)
         scaled_img = self.image.resize((int(width * self.grid.scale), int(height * self.grid.scale)))
         self.image_tk = ImageTk.PhotoImage(scaled_img)
         self.background_item = self.create_image([size // 2 for size in scaled_img.size], image=self.image_tk)
 
+    def redraw(self):
+        """
+        Draws the background, the nodes and, while live repair is on, the edges again after the scale changed
+        """
+        self.delete('node')
+        self.delete('edge')
+        self.delete_editor()
+        self.draw_tk()
+        for node in self.controller.get_nodes():
+            self.on_node_change(ChangeType.ADD, node)
+        if self.controller.live_repair:
+            for edge in tour_edges(self.controller.best_tour):
+                self.on_edge_change(ChangeType.ADD, *edge)
+
     def get_recommended_scale(self, percentage, width, height):
         """
         Gets the scale that would cause the window to take up 'percentage' of the total available screen space
@@ -137,18 +153,26 @@ class CanvasMap(tk.Canvas):
         if run_status == RunStatus.START:
             self.running = True
             self.delete('edge')
+            self.edges = {}
         elif run_status == RunStatus.END:
             self.running = False
 
-    def on_node_change(self, change_type, node):
+    def on_node_change(self, change_type, node, *_):
         """
-        Run when a node is added or deleted to the model. Draws the node on the canvas and attaches bindings or deletes
+        Run when a node is added or deleted to the model. Draws the node on the canvas and attaches bindings or deletes.
+        VALUE_CHANGE is ignored since each drawn node is observed for its name
 
         Args:
-            change_type: Whether the node is being added or deleted
-            node: The node to be added or deleted
+            change_type: Whether the node is being added or deleted, or EXTEND or REMOVE_MANY for many nodes
+            node: The node to be added or deleted, the range of new rows for EXTEND or the list of nodes for REMOVE_MANY
         """
-        if change_type == ChangeType.ADD:
+        if change_type == ChangeType.EXTEND:
+            for row in node:
+                self.on_node_change(ChangeType.ADD, self.controller.model.nodes[row])
+        elif change_type == ChangeType.REMOVE_MANY:
+            for changed in node:
+                self.on_node_change(ChangeType.REMOVE, changed)
+        elif change_type == ChangeType.ADD:
             x_scaled, y_scaled = self.grid.from_grid_coordinates(node.x, node.y)
             pos = (x_scaled-self.CIRCLE_RADIUS, y_scaled-self.CIRCLE_RADIUS,
                    x_scaled+self.CIRCLE_RADIUS, y_scaled+self.CIRCLE_RADIUS)
@@ -174,27 +198,33 @@ class CanvasMap(tk.Canvas):
             node2: The second node of the edge
         """
         if change_type == ChangeType.ADD:
+            if frozenset((node1, node2)) in self.edges:
+                self.delete(self.edges[frozenset((node1, node2))])
             start = self.grid.from_grid_coordinates(node1.x, node1.y)
             end = self.grid.from_grid_coordinates(node2.x, node2.y)
             self.edges[frozenset((node1, node2))] = self.create_line((start[0], start[1], end[0], end[1]), width=3, tags='edge')
-            self.update()
-        if change_type == ChangeType.REMOVE:
-            self.delete(self.edges[frozenset([node1, node2])])
+        if change_type == ChangeType.REMOVE and frozenset([node1, node2]) in self.edges:
+            self.delete(self.edges.pop(frozenset([node1, node2])))
 
     def on_model_update(self, key):
         """
-        Run when the main CanvasMap model is changed. If the background was changed updates it on the canvas
+        Run when the main CanvasMap model is changed. If the background or the pixel shift was changed updates the
+        scale and redraws the canvas
 
         Args:
             key: The key that was changed in the model.
         """
-        if key == 'background':
+        if key in ('background', 'pixel_shift') and self.controller.model.background is not None:
             self.image = self.controller.model.background
-            x, y = self.image.size
+            self.pixel_size = 2 ** self.controller.model.pixel_shift
+            x, y = (size * self.pixel_size for size in self.image.size)
             self.grid = Grid(self.get_recommended_scale(.7, x, y))
             self.min_scale = self.get_recommended_scale(.2, x, y)
             self.max_scale = self.get_recommended_scale(.8, x, y)
-            self.draw_tk()
+            if key == 'background':
+                self.draw_tk()
+            else:
+                self.redraw()
 
     # ------------------------------------------------Canvas bindings---------------------------------------------------
     def on_scroll(self, event):
@@ -210,12 +240,7 @@ class CanvasMap(tk.Canvas):
             self.grid.scale -= change
         else:
             return
-        self.delete('node')
-        self.delete('edge')
-        self.delete_editor()
-        self.draw_tk()
-        for node in self.controller.get_nodes():
-            self.on_node_change(ChangeType.ADD, node)
+        self.redraw()
 
     def on_click(self, event):
         """
@@ -223,7 +248,8 @@ class CanvasMap(tk.Canvas):
         """
         if self.running:
             return False
-        self.delete('edge')
+        if not self.controller.live_repair:
+            self.delete('edge')
         if time.time() - self.click_time > .25 and self.editor:
             self.editor.destroy()
 
@@ -261,6 +287,8 @@ class CanvasMap(tk.Canvas):
             # Set model coordinates to coordinates of text
             node.x, node.y = [int(x) for x in self.grid.to_grid_coordinates(*self.coords(self.nodes[node][1]))]
             self.dragging = False
+            if self.controller.live_repair:
+                self.controller.repair(node)
         else:
             if time.time() - self.click_time < .5:
                 self.edit_node(node)
@@ -1,9 +1,11 @@
 from tkinter import ttk
+import functools
 import tkinter as tk
 
 from src.controller import RunStatus
-from src.gui.algorithmParameters import Linear, Ratio
+from src.gui.algorithmParameters import Linear, Ratio, Genetic, AntColony, Tabu
 from src.gui.canvasMap import CanvasMap
+from src.gui.solverThread import SolverThread
 from src.runtime_models.simulatedAnnealingModel import SuccessorChooseType
 
 
@@ -24,11 +26,13 @@ class Editor(ttk.Frame):
 class SimulationFrame(ttk.Frame):
     """
     Frame used to edit the information of the simulation. Provides a box that selects the algorithm to use and then
-    displays a widget used to edit information for the algorithm
+    displays a widget used to edit information for the algorithm. Runs happen on a SolverThread so they can be cancelled
     """
     COOLING_MAP = {'Linear': Linear, 'Constant Ratio': Ratio}
+    SOLVER_MAP = {'Genetic Algorithm': Genetic, 'Ant Colony': AntColony, 'Tabu Search': Tabu}
     SUCCESSOR_MAP = {'Two Random Cities': SuccessorChooseType.BOTH_RANDOM,
-                     'One Random Pair': SuccessorChooseType.RANDOM_NEIGHBORS}
+                     'One Random Pair': SuccessorChooseType.RANDOM_NEIGHBORS,
+                     'Nearby Random Cities': SuccessorChooseType.RANDOM_WINDOW}
 
     def __init__(self, parent, controller, *args, **kwargs):
         ttk.Frame.__init__(self, parent, *args, **kwargs)
@@ -39,18 +43,27 @@ class SimulationFrame(ttk.Frame):
         self.steps_var = tk.IntVar(self)
         self.steps_var.set(1000)
         self.generate_graphs_var = tk.BooleanVar(self)
+        self.warm_start_var = tk.BooleanVar(self)
+        self.live_repair_var = tk.BooleanVar(self)
+        self.solver_thread = SolverThread(self, controller)
 
         cooling_schedules = sorted(self.COOLING_MAP.keys())
+        solvers = sorted(self.SOLVER_MAP.keys())
         successor_algorithms = sorted(self.SUCCESSOR_MAP.keys())
 
         successor_label = ttk.Label(self, text='Choose Successors')
         self.successors_combo = ttk.Combobox(self, justify=tk.CENTER)
 
-        algorithm_label = ttk.Label(self, text='Cooling Schedule')
+        algorithm_label = ttk.Label(self, text='Algorithm')
         self.algorithm_combo = ttk.Combobox(self, justify=tk.CENTER)
         self.algorithm_widget = self.COOLING_MAP[cooling_schedules[0]](self, self.controller)
         self.run = ttk.Button(self, text='Run', command=self.run)
+        self.cancel = ttk.Button(self, text='Cancel', command=self.solver_thread.cancel)
+        self.progress_label = ttk.Label(self)
         generate_graphs = ttk.Checkbutton(self, text='Generate Graphs', variable=self.generate_graphs_var)
+        warm_start = ttk.Checkbutton(self, text='Start From Last Tour', variable=self.warm_start_var)
+        live_repair = ttk.Checkbutton(self, text='Live Repair', variable=self.live_repair_var,
+                                      command=lambda: self.controller.set_live_repair(self.live_repair_var.get()))
 
         successor_label.pack()
         self.successors_combo.pack()
@@ -58,11 +71,15 @@ class SimulationFrame(ttk.Frame):
         algorithm_label.pack()
         self.algorithm_combo.pack()
         self.algorithm_widget.pack(expand=tk.YES, fill=tk.BOTH)
+        self.cancel.pack(side=tk.BOTTOM)
         self.run.pack(side=tk.BOTTOM)
+        self.progress_label.pack(side=tk.BOTTOM)
+        live_repair.pack(side=tk.BOTTOM, pady=(5, 5))
+        warm_start.pack(side=tk.BOTTOM, pady=(5, 5))
         generate_graphs.pack(side=tk.BOTTOM, pady=(20, 5))
 
         self.nodes = {}
-        self.algorithm_combo['values'] = cooling_schedules
+        self.algorithm_combo['values'] = cooling_schedules + solvers
         self.algorithm_combo.set(cooling_schedules[0])
         self.algorithm_combo.bind("<<ComboboxSelected>>", self.on_algorithm_changed)
         self.algorithm_combo.state(['readonly'])
@@ -72,26 +89,44 @@ class SimulationFrame(ttk.Frame):
         self.successors_combo.state(['readonly'])
 
         self.run.state(['disabled'])
+        self.cancel.state(['disabled'])
 
     def on_algorithm_changed(self, event):
         """
         When the algorithm changes updates the widget used to edit the algorithm parameters
         """
         self.algorithm_widget.destroy()
-        self.algorithm_widget = self.COOLING_MAP[self.algorithm_combo.get()](self, self.controller)
+        algorithm_map = dict(self.COOLING_MAP, **self.SOLVER_MAP)
+        self.algorithm_widget = algorithm_map[self.algorithm_combo.get()](self, self.controller)
         self.algorithm_widget.pack(expand=tk.YES, fill=tk.BOTH)
 
     def run(self):
         """
-        Gets the list of temperatures from the algorithm widget and runs the simulation
+        Gets the list of temperatures from the algorithm widget and runs the simulation on the solver thread. Solvers
+        that are not cooling schedules provide their own run. The annealing run reports its tour through progress
+        instead of notifying every flipped edge
         """
-        self.controller.run(self.algorithm_widget.get_temperatures(),
-                            notify_canvas=True,
-                            generate_graphs=self.generate_graphs_var.get(),
-                            graph_scale=self.algorithm_widget.graph_scale())
+        if self.algorithm_combo.get() in self.SOLVER_MAP:
+            solve = self.algorithm_widget.solver(self.generate_graphs_var.get())
+        else:
+            solve = functools.partial(self.controller.run, self.algorithm_widget.get_temperatures(),
+                                      notify_canvas=False,
+                                      warm_start=self.warm_start_var.get(),
+                                      successor_type=self.controller.get_successor_type(),
+                                      generate_graphs=self.generate_graphs_var.get(),
+                                      graph_scale=self.algorithm_widget.graph_scale())
+        self.run.state(['disabled'])
+        self.solver_thread.start(solve, self.on_progress)
+
+    def on_progress(self, step, length):
+        """
+        Shows the progress of the active run
+        """
+        self.progress_label.config(text='Step {}: {:.1f}'.format(step, length))
 
     def on_run(self, status):
         """
-        Disables/Enables the run button while the simulation is running/stopped
+        Disables/Enables the run button while the simulation is running/stopped and the cancel button the other way
         """
         self.run.state(['disabled' if status == RunStatus.START else '!disabled'])
+        self.cancel.state(['!disabled' if status == RunStatus.START else 'disabled'])
@@ -18,6 +18,7 @@ class Menu(tk.Menu):
         file.add_command(label='New', command=self.new)
         file.add_command(label='Save', command=self.save)
         file.add_command(label='Load', command=self.load)
+        file.add_command(label='Import', command=self.import_instance)
         self.add_cascade(label='File', menu=file)
 
         self.controller = controller
@@ -47,6 +48,16 @@ class Menu(tk.Menu):
         if name:
             self.controller.load(name)
 
+    def import_instance(self):
+        """
+        Prompts the user for a TSPLIB or CSV file and replaces the nodes with its cities
+        """
+        name = askopenfilename(parent=self,
+                               title='Import Cities',
+                               filetypes=(('TSPLIB', '.tsp'), ('CSV', '.csv'), ('all files', '*')))
+        if name:
+            self.controller.import_instance(name)
+
     def new(self):
         """
         Prompts the user for a filename for an image and creates a new configuration
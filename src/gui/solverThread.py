@@ -0,0 +1,182 @@
+import queue
+import threading
+import time
+import traceback
+
+from src.constants import ChangeType
+from src.controller import RunStatus, tour_edges
+
+
+class SolverThread:
+    """
+    Runs a solver on a worker thread so the Tk main loop keeps handling events while it works. Everything the controller
+    and the annealing model notify during the run is put on a queue instead of reaching their observers directly. The
+    queue is drained on the Tk thread frame_rate times a second, so the canvas is only drawn to from the Tk thread and
+    never more often than that. Notifications are posted a batch at a time. Tours reported through progress are
+    coalesced so only the newest one is drawn. A solver that raises is reported in an error dialog
+
+    Attributes:
+        widget: Any Tk widget, used to schedule draining the queue
+        controller: The controller whose observers are redirected while a run is active
+        frame_rate: The number of times a second the queue is drained
+        queue: The channel from the worker thread to the Tk thread
+        thread: The worker thread of the active run, None when no run is active
+        cancel_event: Set to ask the active run to stop early
+        observers: The observers and batch observers that were replaced for the run, keyed by the observable they belong
+            to
+        draw_graphs: The graph drawing function of the controller that was replaced for the run
+        shown: The edges that the annealing observers have been told about during the run
+        on_progress: Optional callable run on the Tk thread as on_progress(step, value) when progress is reported
+        last_progress: The time progress was last posted by the worker thread
+    """
+    def __init__(self, widget, controller, frame_rate=30):
+        self.widget = widget
+        self.controller = controller
+        self.frame_rate = frame_rate
+        self.queue = queue.Queue()
+        self.thread = None
+        self.cancel_event = threading.Event()
+        self.observers = {}
+        self.shown = set()
+        self.on_progress = None
+        self.last_progress = 0
+        self.draw_graphs = None
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def start(self, solve, on_progress=None):
+        """
+        Starts a solver on the worker thread. Does nothing if a run is already active
+
+        Args:
+            solve: Callable that runs the solver. It is called as solve(progress=progress, cancel=cancel_event)
+            on_progress: Optional callable run on the Tk thread as on_progress(step, value) when progress is reported
+        """
+        if self.running:
+            return
+        self.on_progress = on_progress
+        self.cancel_event.clear()
+        self.shown = set()
+        self.last_progress = 0
+        for observable in self.controller, self.controller.annealing:
+            self.observers[observable] = set(observable.observers), set(observable.batch_observers)
+            observable.unregister_all()
+            observable.register_batch(lambda events, observable=observable:
+                                      self.queue.put(('notify', observable, events)))
+        self.draw_graphs = self.controller.draw_graphs
+        self.controller.draw_graphs = lambda graphs: self.queue.put(('graphs', graphs))
+        self.thread = threading.Thread(target=self.work, args=(solve,), daemon=True)
+        self.thread.start()
+        self.widget.after(1000 // self.frame_rate, self.drain)
+
+    def cancel(self):
+        """
+        Asks the active run to stop at its next check. The tour found so far is kept
+        """
+        self.cancel_event.set()
+
+    def work(self, solve):
+        """
+        Runs on the worker thread. Posts the outcome of the solver once it returns
+        """
+        try:
+            solve(progress=self.progress, cancel=self.cancel_event)
+            self.queue.put(('done', None))
+        except Exception:
+            self.queue.put(('done', traceback.format_exc()))
+
+    def progress(self, step, value):
+        """
+        Progress callback given to the solver. Runs on the worker thread and posts at most one update per frame. value
+        is either a length or a PathState, in which case a copy of its tour is posted with its length
+        """
+        now = time.perf_counter()
+        if now - self.last_progress < 1 / self.frame_rate:
+            return
+        self.last_progress = now
+        if hasattr(value, 'nodes'):
+            self.queue.put(('tour', step, value.value(), value.nodes[:-1]))
+        else:
+            self.queue.put(('progress', step, value))
+
+    def drain(self):
+        """
+        Runs on the Tk thread. Forwards everything posted since the last frame and schedules the next frame until the
+        run is done
+        """
+        latest_tour = None
+        done = False
+        error = None
+        while True:
+            try:
+                message = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'notify':
+                for args, kwargs in message[2]:
+                    self.forward(message[1], *args)
+            elif message[0] == 'graphs':
+                self.draw_graphs(message[1])
+            elif message[0] == 'tour':
+                latest_tour = message
+            elif message[0] == 'progress' and self.on_progress:
+                self.on_progress(message[1], message[2])
+            elif message[0] == 'done':
+                done, error = True, message[1]
+        if latest_tour:
+            _, step, value, nodes = latest_tour
+            self.show(nodes)
+            if self.on_progress:
+                self.on_progress(step, value)
+        if done:
+            self.finish(error)
+        else:
+            self.widget.after(1000 // self.frame_rate, self.drain)
+
+    def forward(self, observable, *args):
+        """
+        Calls the original observers of an observable with a notification posted by the worker thread
+        """
+        if observable is self.controller.annealing:
+            change_type, node1, node2 = args
+            if change_type == ChangeType.ADD:
+                self.shown.add(frozenset((node1, node2)))
+            elif change_type == ChangeType.REMOVE:
+                self.shown.discard(frozenset((node1, node2)))
+        observers, batch_observers = self.observers[observable]
+        for observer in observers:
+            observer(*args)
+        for observer in batch_observers:
+            observer([(args, {})])
+
+    def show(self, nodes):
+        """
+        Tells the annealing observers about the edges that differ between the shown tour and a new one
+        """
+        edges = tour_edges(nodes)
+        for edge in self.shown - edges:
+            self.forward(self.controller.annealing, ChangeType.REMOVE, *edge)
+        for edge in edges - self.shown:
+            self.forward(self.controller.annealing, ChangeType.ADD, *edge)
+
+    def finish(self, error):
+        """
+        Shows the final tour and gives the controller and annealing model their observers back. If the solver raised,
+        the run is ended for the observers and the traceback is shown in an error dialog. It is not raised, since this
+        runs in a Tk after callback where it would only be printed
+        """
+        if error is None:
+            self.show(self.controller.best_tour)
+        for observable, (observers, batch_observers) in self.observers.items():
+            observable.unregister_all()
+            observable.observers.update(observers)
+            observable.batch_observers.update(batch_observers)
+        self.observers = {}
+        self.controller.draw_graphs = self.draw_graphs
+        self.thread = None
+        if error is not None:
+            from tkinter import messagebox
+            self.controller.notify_observers(RunStatus.END)
+            messagebox.showerror('Solver failed', 'The solver failed\n{}'.format(error), parent=self.widget)
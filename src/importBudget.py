@@ -0,0 +1,123 @@
+"""
+Measures how long the headless modules take to import, each in a fresh interpreter, and checks that none of them pulls
+in the GUI, plotting or image libraries. Those are only imported the first time they are used, so the controller, the
+saveable framework and the algorithms can start quickly on servers and in CLI tools. Exits with a non-zero code when a
+module is over budget or imports a forbidden library, and can append every measurement to a history file to track it
+over time
+
+Ex.
+    python -m src.importBudget --budget 0.5 --history import_times.jsonl
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+CORE_MODULES = ('src.controller', 'src.batchSolver', 'src.saveable.salesmanConfig', 'src.saveable.journal',
+                'src.runtime_models.simulatedAnnealingModel', 'src.algorithms.simulatedAnnealing',
+                'src.parameterSweep', 'src.instanceImporter')
+FORBIDDEN = ('tkinter', 'matplotlib', 'scipy', 'PIL')
+DEFAULT_BUDGET = .5  # Seconds a core module may take to import
+
+CHILD = """
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'forbidden': [name for name in {forbidden!r} if name in sys.modules]}}))
+"""
+
+
+def slowest_imports(importtime, module, count):
+    """
+    Gets the modules with the largest cumulative import time from the output of python -X importtime
+
+    Args:
+        importtime: The text python wrote to stderr
+        module: The module that was measured, which is left out
+        count: The number of modules to return
+
+    Returns:
+        A list of (name, seconds) pairs, slowest first
+    """
+    times = []
+    for line in importtime.splitlines():
+        fields = line.split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        if name != module:
+            times.append((name, int(fields[1]) / 1e6))
+    return sorted(times, key=lambda pair: -pair[1])[:count]
+
+
+def measure(module, repeat=3, count=5):
+    """
+    Imports a module in a fresh interpreter repeat times
+
+    Args:
+        module: The name of the module
+        repeat: The number of imports. The fastest is kept to reduce noise
+        count: The number of slowest imports to report
+
+    Returns:
+        A dictionary of the module, its import time in seconds, the forbidden modules it imported and its slowest
+        imports
+
+    Raises:
+        RuntimeError: If the module cannot be imported
+    """
+    best = None
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                  CHILD.format(module=module, forbidden=FORBIDDEN)],
+                                 capture_output=True, text=True)
+        if process.returncode:
+            raise RuntimeError('Importing {} failed\n{}'.format(module, process.stderr[-2000:]))
+        result = json.loads(process.stdout.splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = dict(result, module=module, slowest=slowest_imports(process.stderr, module, count))
+    return best
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description='Checks the import time of the headless modules')
+    parser.add_argument('modules', nargs='*', default=CORE_MODULES, help='Modules to measure')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='Seconds each module may take')
+    parser.add_argument('--repeat', type=int, default=3, help='Imports of each module, the fastest is kept')
+    parser.add_argument('--history', default=None, help='JSON lines file every measurement is appended to')
+    parser.add_argument('--json', action='store_true', help='Write measurements to stdout as JSON lines')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    """
+    Measures every module and reports the ones that are over budget or import a forbidden library. Returns a non-zero
+    exit code if there were any
+    """
+    options = parse_args(args)
+    failed = False
+    for module in options.modules:
+        result = measure(module, options.repeat)
+        result['budget'] = options.budget
+        result['time'] = time.time()
+        over = result['seconds'] > options.budget or result['forbidden']
+        failed = failed or bool(over)
+        if options.json:
+            print(json.dumps(result))
+        else:
+            print('{:<50} {:7.3f}s {}'.format(module, result['seconds'], 'FAIL' if over else 'ok'))
+            if result['forbidden']:
+                print('    imports {}'.format(', '.join(result['forbidden'])))
+            if over:
+                for name, seconds in result['slowest']:
+                    print('    {:<46} {:7.3f}s'.format(name, seconds))
+        if options.history:
+            with open(options.history, 'a') as file:
+                file.write(json.dumps(result) + '\n')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import itertools
+import math
+
+import numpy as np
+
+CHUNK_SIZE = 65536          # Lines parsed into one coordinate array at a time
+GRID_MAX = 2**16 - 1        # The largest coordinate a Node can hold
+TSPLIB_TYPES = ('EUC_2D', 'CEIL_2D', 'MAN_2D', 'MAX_2D', 'ATT', 'GEO')
+
+
+def _chunks(lines, chunk_size):
+    """
+    Splits an iterable of lines into lists of at most chunk_size lines
+    """
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _geo_degrees(values):
+    """
+    Converts TSPLIB GEO values, written as DDD.MM degrees and minutes, to decimal degrees
+    """
+    degrees = np.trunc(values)
+    return degrees + 5 * (values - degrees) / 3
+
+
+def read_tsplib(stream, chunk_size=CHUNK_SIZE):
+    """
+    Reads the cities of a TSPLIB .tsp file with a NODE_COORD_SECTION one chunk of lines at a time. GEO cities are
+    projected to x = longitude and y = -latitude in decimal degrees so north is up on the map
+
+    Args:
+        stream: The text stream of the file
+        chunk_size: The number of lines parsed at a time
+
+    Yields:
+        (names, coordinates) pairs of a list of node names and an n x 2 array for each chunk
+
+    Raises:
+        ValueError: If the edge weight type does not have 2D coordinates
+    """
+    weight_type = 'EUC_2D'
+    for line in stream:
+        key, _, value = line.partition(':')
+        key = key.strip().upper()
+        if key == 'EDGE_WEIGHT_TYPE':
+            weight_type = value.strip().upper()
+        elif key == 'NODE_COORD_SECTION':
+            break
+        elif key == 'EOF':
+            return
+    if weight_type not in TSPLIB_TYPES:
+        raise ValueError('Unsupported TSPLIB edge weight type {}'.format(weight_type))
+    for chunk in _chunks(stream, chunk_size):
+        names, coordinates, done = [], [], False
+        for line in chunk:
+            fields = line.split()
+            if not fields:
+                continue
+            try:
+                coordinates.append((float(fields[1]), float(fields[2])))
+            except (IndexError, ValueError):
+                done = True     # EOF or the next section
+                break
+            names.append(fields[0] if fields[0].isascii() else 'Node')
+        coordinates = np.array(coordinates, dtype=float).reshape(-1, 2)
+        if weight_type == 'GEO':
+            latitude, longitude = _geo_degrees(coordinates).T
+            coordinates = np.column_stack((longitude, -latitude))
+        yield names, coordinates
+        if done:
+            return
+
+
+def read_csv(stream, chunk_size=CHUNK_SIZE):
+    """
+    Reads cities from text one chunk of lines at a time. The last two fields of each line, split by commas or
+    whitespace, are the x and y coordinate. If there are more fields the first one is the name. Lines that do not end in
+    two numbers, like headers, are skipped
+
+    Args:
+        stream: The text stream of the file
+        chunk_size: The number of lines parsed at a time
+
+    Yields:
+        (names, coordinates) pairs of a list of node names and an n x 2 array for each chunk
+    """
+    for chunk in _chunks(stream, chunk_size):
+        names, coordinates = [], []
+        for line in chunk:
+            fields = line.replace(',', ' ').split()
+            try:
+                coordinates.append((float(fields[-2]), float(fields[-1])))
+            except (IndexError, ValueError):
+                continue
+            names.append(fields[0] if len(fields) > 2 and fields[0].isascii() else 'Node')
+        yield names, np.array(coordinates, dtype=float).reshape(-1, 2)
+
+
+def load_instance(path, chunk_size=CHUNK_SIZE):
+    """
+    Loads the cities of a .tsp file or of a CSV or other text file of coordinates
+
+    Args:
+        path: The file to load
+        chunk_size: The number of lines parsed at a time
+
+    Returns:
+        A list of node names and an n x 2 array of coordinates
+    """
+    reader = read_tsplib if path.lower().endswith('.tsp') else read_csv
+    names, chunks = [], []
+    with open(path) as file:
+        for chunk_names, coordinates in reader(file, chunk_size):
+            names.extend(chunk_names)
+            chunks.append(coordinates)
+    if not chunks:
+        return [], np.zeros((0, 2))
+    return names, np.concatenate(chunks)
+
+
+def blank_background(coordinates, size=2048, margin=20):
+    """
+    Makes a white image with the aspect ratio of the bounding box of the coordinates
+
+    Args:
+        coordinates: An n x 2 array of coordinates
+        size: The length in pixels of the longer side
+        margin: The number of pixels kept free around the cities
+
+    Returns:
+        A PIL Image
+    """
+    width, height = np.ptp(coordinates, axis=0) if len(coordinates) else (1, 1)
+    inner = size - 2 * margin
+    if width >= height:
+        shape = size, int(inner * height / width) + 2 * margin if width else size
+    else:
+        shape = int(inner * width / height) + 2 * margin, size
+    from PIL import Image
+    return Image.new('RGB', shape, 'white')
+
+
+def _fit_scale(span, width, height, margin):
+    """
+    Gets the scale that fits a bounding box of the given span inside an image with a margin, and the room inside it
+    """
+    room = np.array([max(width - 2 * margin, 0), max(height - 2 * margin, 0)], dtype=float)
+    scales = [room[axis] / span[axis] for axis in range(2) if span[axis]]
+    return min(scales) if scales else 0, room
+
+
+def coordinate_step(coordinates):
+    """
+    Gets the precision of a set of coordinates, the smallest gap between two different values along either axis
+
+    Args:
+        coordinates: An n x 2 array of coordinates
+
+    Returns:
+        The smallest gap, or infinity if no axis has two different values
+    """
+    coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+    gaps = [np.diff(np.unique(coordinates[:, axis])) for axis in range(2)]
+    return min((gap.min() for gap in gaps if len(gap)), default=math.inf)
+
+
+def pixel_shift(coordinates, width, height, margin=20):
+    """
+    Gets how finely the integer grid of the nodes has to divide the pixels of an image so that coordinates fitted to it
+    keep their precision. Each pixel is split into 2**shift grid units, as many as are needed for the smallest gap
+    between the coordinates to be at least one unit, but no more than lets the image fit inside GRID_MAX
+
+    Args:
+        coordinates: An n x 2 array of coordinates
+        width: The width of the image
+        height: The height of the image
+        margin: The number of pixels kept free at each edge
+
+    Returns:
+        The shift, 0 if whole pixels are fine enough
+    """
+    coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+    if not len(coordinates):
+        return 0
+    scale, _ = _fit_scale(np.ptp(coordinates, axis=0), width, height, margin)
+    step = coordinate_step(coordinates)
+    if not scale or not math.isfinite(step):
+        return 0
+    needed = max(math.ceil(math.log2(1 / (step * scale))), 0)
+    return min(needed, max(int(math.log2((GRID_MAX + 1) / max(width, height, 1))), 0))
+
+
+def fit_to_image(coordinates, width, height, margin=20, shift=0):
+    """
+    Scales and moves coordinates to fit inside an image, keeping their aspect ratio, and rounds them to the integer
+    grid of a Node
+
+    Args:
+        coordinates: An n x 2 array of coordinates
+        width: The width of the image
+        height: The height of the image
+        margin: The number of pixels kept free at each edge
+        shift: The grid has 2**shift units along each side of a pixel, see pixel_shift
+
+    Returns:
+        An n x 2 array of integer coordinates
+    """
+    coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+    if not len(coordinates):
+        return np.zeros((0, 2), dtype=np.int64)
+    width, height, margin = width << shift, height << shift, margin << shift
+    low = coordinates.min(axis=0)
+    span = np.ptp(coordinates, axis=0)
+    scale, room = _fit_scale(span, width, height, margin)
+    offset = margin + (room - span * scale) / 2
+    grid = np.rint((coordinates - low) * scale + offset)
+    return np.clip(grid, 0, min(GRID_MAX, max(width, height))).astype(np.int64)
+
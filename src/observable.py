@@ -1,14 +1,66 @@
+import contextlib
+
+from src.constants import ChangeType
+
+
+class Batch:
+    """
+    The notifications an Observable buffered since its batch began. An ADD followed by a REMOVE of the same thing, or
+    the other way around for unordered observables, cancels out and neither is delivered
+
+    Attributes:
+        unordered: Whether a REMOVE followed by an ADD cancels out
+        depth: The number of batches begun and not ended yet
+        events: The buffered (args, kwargs) pairs in order, with None in place of ones that were cancelled
+        last: A dictionary from the key of an ADD or REMOVE to the index of its latest event
+    """
+    __slots__ = ('unordered', 'depth', 'events', 'last')
+
+    def __init__(self, unordered):
+        self.unordered = unordered
+        self.depth = 0
+        self.events = []
+        self.last = {}
+
+    def add(self, args, kwargs, key):
+        """
+        Buffers a notification. key is None for notifications that never cancel out
+        """
+        if key is not None:
+            index = self.last.pop(key, None)
+            if index is not None:
+                previous = self.events[index][0][0]
+                if previous != args[0] and (self.unordered or previous == ChangeType.ADD):
+                    self.events[index] = None
+                    return
+            self.last[key] = len(self.events)
+        self.events.append((args, kwargs))
+
+
 class Observable:
     """
     Observer class that allows a function to register with the class. The class can notify all observers with any
     arguments
+
+    Notifications can be batched with batch() or begin_batch() and end_batch(). They are buffered until the outermost
+    batch ends and are then delivered with pairs that cancel out dropped, see Batch. Observers registered with register
+    are still called once per notification, while observers registered with register_batch are called once with the
+    list of (args, kwargs) pairs
+
+    Attributes:
+        unordered: If true the observers only keep a set of what was added, so a REMOVE followed by an ADD cancels out
+            as well and the order of the arguments of ADD and REMOVE does not matter
     """
+    __slots__ = ()
+    unordered = False
 
     def __init__(self):
         """
         Sets up the set of all observer functions
         """
-        self.__dict__['observers'] = set()  # Use __dict__ as this was causing conflicts with Composite
+        self.observers = set()
+        self.batch_observers = set()
+        self.batching = None
 
     def register(self, observer):
         """
@@ -19,6 +71,16 @@ class Observable:
         """
         self.observers.add(observer)
 
+    def register_batch(self, observer):
+        """
+        Adds a callable object that is given a list of (args, kwargs) pairs instead of being called once per
+        notification. Notifications outside of a batch are given as a list of one
+
+        Args:
+            observer: The callable to add
+        """
+        self.batch_observers.add(observer)
+
     def unregister(self, observer):
         """
         Removes a callable object from the set of observers
@@ -26,22 +88,76 @@ class Observable:
         Args:
             observer: The callable to remove
         """
-        if observer in self.observers:
-            self.observers.remove(observer)
+        self.observers.discard(observer)
+        self.batch_observers.discard(observer)
 
     def unregister_all(self):
         """
         Removes all observers from the class
         """
         self.observers.clear()
+        self.batch_observers.clear()
+
+    def has_observers(self):
+        """
+        Checks if any observer is registered, so notifications that are expensive to build can be skipped
+
+        Returns:
+            True if there are observers registered with register or register_batch
+        """
+        return bool(self.observers or self.batch_observers)
 
     def notify_observers(self, *args, **kwargs):
         """
-        Notifies all observers with any amount of arguments
+        Notifies all observers with any amount of arguments, or buffers the notification while batching
 
         Args:
             args: Arbitrary positional arguments
             kwargs: Arbitrary keyword arguments
         """
+        if self.batching is not None:
+            key = None
+            if args and not kwargs and (args[0] == ChangeType.ADD or args[0] == ChangeType.REMOVE):
+                key = frozenset(args[1:]) if self.unordered else args[1:]
+            self.batching.add(args, kwargs, key)
+            return
         for observer in self.observers:
             observer(*args, **kwargs)
+        for observer in self.batch_observers:
+            observer([(args, kwargs)])
+
+    def begin_batch(self):
+        """
+        Starts buffering notifications. Batches may be nested, only the outermost one delivers
+        """
+        if self.batching is None:
+            self.batching = Batch(self.unordered)
+        self.batching.depth += 1
+
+    def end_batch(self):
+        """
+        Ends a batch. If it is the outermost one the buffered notifications are delivered
+        """
+        self.batching.depth -= 1
+        if self.batching.depth:
+            return
+        events = [event for event in self.batching.events if event is not None]
+        self.batching = None
+        if not events:
+            return
+        for observer in self.observers:
+            for args, kwargs in events:
+                observer(*args, **kwargs)
+        for observer in self.batch_observers:
+            observer(events)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Context manager that batches the notifications made inside of it
+        """
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.end_batch()
@@ -0,0 +1,243 @@
+import concurrent.futures
+import itertools
+import json
+import math
+import os
+import random
+import time
+
+import numpy as np
+
+from src.algorithms.simulatedAnnealing import simulated_annealing
+from src.algorithms.temperatureAlgorithms import linear_temperature, decrease_ratio
+from src.graphing.graph import Graph
+from src.graphing.subplot import SubPlot
+from src.resultCache import run_key
+from src.runtime_models.simulatedAnnealingModel import PathState, CoordinateWeights, SuccessorChooseType
+
+DEFAULTS = {'schedule': 'ratio', 'ratio': .9, 'steps': 1000, 'successor': SuccessorChooseType.BOTH_RANDOM.name,
+            'seed': 0}
+
+
+def sweep_grid(**axes):
+    """
+    Builds every combination of the given parameter values. Parameters that are not given take their value from
+    DEFAULTS. SuccessorChooseType values may be given directly and are stored by name
+
+    Ex.
+    sweep_grid(ratio=[.9, .95], seed=range(25)) gives 50 points that differ in ratio and seed
+
+    Args:
+        axes: A sequence of values for any of schedule, ratio, steps, successor and seed
+
+    Returns:
+        A list of dictionaries that each hold a value for every parameter
+    """
+    axes = {key: [value.name if isinstance(value, SuccessorChooseType) else value for value in values]
+            for key, values in axes.items()}
+    keys = sorted(axes)
+    return [dict(DEFAULTS, **dict(zip(keys, values))) for values in itertools.product(*(axes[key] for key in keys))]
+
+
+def point_key(point):
+    return json.dumps(point, sort_keys=True)
+
+
+def group_key(point):
+    """
+    Gets the key of the group a point is averaged into, which is every parameter except the seed
+    """
+    return point_key({key: value for key, value in point.items() if key != 'seed'})
+
+
+class RunningStats:
+    """
+    Streaming mean and variance of traces of the same length, updated one trace at a time with Welford's algorithm so
+    the traces themselves never have to be kept
+
+    Attributes:
+        count: The number of traces added
+        mean: The mean of each step
+        m2: The sum of squared differences from the mean of each step
+    """
+    def __init__(self, length=0):
+        self.count = 0
+        self.mean = np.zeros(length)
+        self.m2 = np.zeros(length)
+
+    def add(self, trace):
+        """
+        Adds a trace to the statistics
+
+        Args:
+            trace: A sequence of values with one value per step
+        """
+        trace = np.asarray(trace, dtype=float)
+        if self.count == 0:
+            self.mean, self.m2 = np.zeros(len(trace)), np.zeros(len(trace))
+        self.count += 1
+        delta = trace - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (trace - self.mean)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else self.m2
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean.tolist(), 'm2': self.m2.tolist()}
+
+    @classmethod
+    def from_dict(cls, values):
+        stats = cls()
+        stats.count = values['count']
+        stats.mean = np.array(values['mean'])
+        stats.m2 = np.array(values['m2'])
+        return stats
+
+
+def run_point(coordinates, start_temperature, point, cache=None):
+    """
+    Anneals the cities once with the parameters of a point. Runs in a worker process
+
+    Args:
+        coordinates: An n x 2 array of city coordinates
+        start_temperature: The temperature the schedule starts at
+        point: A dictionary of parameters from sweep_grid
+        cache: Optional ResultCache that is consulted before running and stored to after
+
+    Returns:
+        The tour length at every step
+    """
+    if point['schedule'] == 'linear':
+        temperatures = linear_temperature(start_temperature, point['steps'])
+    else:
+        temperatures = decrease_ratio(start_temperature, point['ratio'], point['steps'])
+    temperatures = np.asarray(temperatures, dtype=float)
+    successor_type = SuccessorChooseType[point['successor']]
+    order = list(range(len(coordinates)))
+    key = run_key(coordinates, order, temperatures, successor_type, point['seed'])
+    cached = cache.get(key, need_lengths=True) if cache else None
+    if cached:
+        return cached[2]
+    rng = random.Random(point['seed'])
+    state = PathState(CoordinateWeights(coordinates), successor_type, False, rng=rng)
+    state.nodes = order + [0]
+    state.generate_next_indices()
+    lengths = simulated_annealing(state, True, temperatures, rng=rng)
+    if cache:
+        cache.put(key, state.nodes[:-1], state.value(), lengths)
+    return lengths
+
+
+class Sweep:
+    """
+    Runs every point of a parameter grid across a pool of worker processes. The length traces of points that only
+    differ in their seed are folded into RunningStats as they finish. If a path is given the finished points and
+    statistics are saved to it as JSON while the sweep runs, and a sweep started again with the same path only runs the
+    points that are missing
+
+    Attributes:
+        coordinates: An n x 2 array of the coordinates of the cities
+        points: The parameter grid
+        start_temperature: The temperature every schedule starts at
+        path: Optional path of the file that partial results are saved to
+        save_interval: The minimum number of seconds between saves
+        cache: Optional ResultCache shared by the worker processes so points that were ever run before are not rerun
+        done: The keys of the points that have finished
+        stats: A dictionary from each group key to its RunningStats
+    """
+    def __init__(self, coordinates, points, *, start_temperature=None, path=None, save_interval=1, cache=None):
+        self.coordinates = np.asarray(coordinates, dtype=float)
+        self.points = points
+        if start_temperature is None:
+            width, height = self.coordinates.max(axis=0) - self.coordinates.min(axis=0)
+            start_temperature = math.hypot(width, height)
+        self.start_temperature = start_temperature
+        self.path = path
+        self.save_interval = save_interval
+        self.cache = cache
+        self.done = set()
+        self.stats = {}
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with open(self.path) as file:
+            saved = json.load(file)
+        self.done = set(saved['done'])
+        self.stats = {key: RunningStats.from_dict(values) for key, values in saved['stats'].items()}
+
+    def save(self):
+        """
+        Saves the finished points and statistics. Writes to a temporary file first so an interrupted save never leaves a
+        broken file behind
+        """
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({'done': sorted(self.done),
+                       'stats': {key: stats.to_dict() for key, stats in self.stats.items()}}, file)
+        os.replace(temporary, self.path)
+
+    def remaining(self):
+        return [point for point in self.points if point_key(point) not in self.done]
+
+    def run(self, *, max_workers=None, progress=None, cancel=None, mp_context=None):
+        """
+        Runs every point that has not finished yet. Points that were submitted but not started are dropped once cancel
+        is set, and the points that did finish are kept
+
+        Args:
+            max_workers: The number of worker processes, defaults to the number of CPUs
+            progress: Optional callable that is called as progress(finished, total) after every point
+            cancel: Optional threading.Event that stops the sweep early once it is set
+            mp_context: Optional multiprocessing context the worker processes are started with. A sweep run from a
+                process that has other threads, such as the GUI, should use a spawn context since forking a threaded
+                process can deadlock
+
+        Returns:
+            self.stats
+        """
+        remaining = self.remaining()
+        finished = len(self.points) - len(remaining)
+        last_save = time.perf_counter()
+        with concurrent.futures.ProcessPoolExecutor(max_workers, mp_context=mp_context) as executor:
+            jobs = {executor.submit(run_point, self.coordinates, self.start_temperature, point, self.cache):
+                    point for point in remaining}
+            for job in concurrent.futures.as_completed(jobs):
+                if cancel is not None and cancel.is_set():
+                    for other in jobs:
+                        other.cancel()
+                    break
+                point = jobs[job]
+                self.stats.setdefault(group_key(point), RunningStats()).add(job.result())
+                self.done.add(point_key(point))
+                finished += 1
+                if progress:
+                    progress(finished, len(self.points))
+                if self.path and time.perf_counter() - last_save > self.save_interval:
+                    self.save()
+                    last_save = time.perf_counter()
+        if self.path:
+            self.save()
+        return self.stats
+
+    def graphs(self, label=None):
+        """
+        Builds a SubPlot of the mean length trace of every group for graphing.draw
+
+        Args:
+            label: Optional callable that gets the legend label from the parameters of a group. Defaults to listing the
+                parameters that differ between the groups
+
+        Returns:
+            A 2d list holding the SubPlot
+        """
+        groups = {key: json.loads(key) for key in self.stats}
+        varying = sorted(name for name in DEFAULTS if len({str(params.get(name)) for params in groups.values()}) > 1)
+        if label is None:
+            label = lambda params: ', '.join('{}={}'.format(name, params[name]) for name in varying)
+        graphs = [Graph(list(range(len(stats.mean))), stats.mean.tolist(), plot_type='-',
+                        legend_label=label(groups[key]))
+                  for key, stats in sorted(self.stats.items())]
+        return [[SubPlot(*graphs, x_label='Step', y_label='Total Path Length')]]
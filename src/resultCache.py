@@ -0,0 +1,111 @@
+import hashlib
+import os
+
+import numpy as np
+
+
+def run_key(coordinates, order, temperatures, successor_type, seed):
+    """
+    Hashes everything that decides the outcome of an annealing run. Two runs with the same key give the same tour
+
+    Args:
+        coordinates: An n x 2 array of the node coordinates
+        order: The start order as indices into coordinates
+        temperatures: The temperature of each step
+        successor_type: The SuccessorChooseType of the run
+        seed: The seed of the random.Random of the run
+
+    Returns:
+        A hex string
+    """
+    digest = hashlib.sha256()
+    for array in (coordinates, order, temperatures):
+        array = np.ascontiguousarray(array, dtype=float)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    digest.update('{}:{}'.format(successor_type.name, seed).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    An on-disk cache of finished annealing runs addressed by run_key. Each entry is a .npz file holding the tour, its
+    length and optionally the length at every step. Reading an entry marks it as recently used and once the entries
+    take more than max_bytes the least recently used ones are removed. Entries are written to a temporary file first, so
+    several processes can share a directory
+
+    Attributes:
+        directory: The directory holding the entries
+        max_bytes: The total size the entries may take up
+    """
+    def __init__(self, directory, max_bytes=256 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def get(self, key, need_lengths=False):
+        """
+        Looks up a run
+
+        Args:
+            key: The run_key of the run
+            need_lengths: If true entries that were stored without lengths count as missing
+
+        Returns:
+            (tour, value, lengths) where lengths may be None, or None if the run is not cached
+        """
+        path = self.path(key)
+        try:
+            with np.load(path) as entry:
+                lengths = entry['lengths'] if 'lengths' in entry else None
+                if need_lengths and lengths is None:
+                    return None
+                result = entry['tour'].tolist(), float(entry['value']), lengths
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            return None
+        return result
+
+    def put(self, key, tour, value, lengths=None):
+        """
+        Stores a run and removes the least recently used entries if the cache is over its size
+
+        Args:
+            key: The run_key of the run
+            tour: The order of the nodes as indices
+            value: The length of the tour
+            lengths: Optional length at every step
+        """
+        arrays = {'tour': np.asarray(tour, dtype=np.int64), 'value': np.float64(value)}
+        if lengths is not None:
+            arrays['lengths'] = np.asarray(lengths, dtype=float)
+        temporary = self.path(key) + '.{}.tmp'.format(os.getpid())
+        with open(temporary, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary, self.path(key))
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                try:
+                    status = entry.stat()
+                except OSError:
+                    continue
+                entries.append((status.st_mtime, status.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
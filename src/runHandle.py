@@ -0,0 +1,104 @@
+import concurrent.futures
+import queue
+import random
+import threading
+
+from src.algorithms.simulatedAnnealing import simulated_annealing
+from src.runtime_models.simulatedAnnealingModel import PathState, CoordinateWeights
+
+
+class RunHandle:
+    """
+    A run submitted with Controller.submit_run. Every run anneals its own PathState over a copy of the node coordinates,
+    so runs never share state with each other or with the controller and any number of them can be in flight at once.
+    A handle can be waited on with result(), awaited from asyncio or read as a stream of progress updates
+
+    Attributes:
+        nodes: The nodes the run is solving, in the order their indices are used by the run
+        future: concurrent.futures.Future that resolves to (value, lengths, tour) where tour is a list of nodes and
+            lengths is None unless the run tracks them
+        cancel_event: Set to stop the run early. The tour found so far is still returned
+        updates: Queue of (step, length) progress updates. None is put once the run has finished
+        progress: Optional callable that is called as progress(step, length) on the worker thread
+    """
+    def __init__(self, nodes, progress=None):
+        self.nodes = nodes
+        self.future = concurrent.futures.Future()
+        self.cancel_event = threading.Event()
+        self.updates = queue.Queue()
+        self.progress = progress
+
+    def cancel(self):
+        """
+        Stops the run at its next progress check. A run that is still waiting on the executor returns its start tour as
+        soon as it is picked up
+        """
+        self.cancel_event.set()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """
+        Waits for the run to finish
+
+        Args:
+            timeout: The number of seconds to wait, forever if None
+
+        Returns:
+            (value, lengths, tour) of the finished run
+        """
+        return self.future.result(timeout)
+
+    def stream(self):
+        """
+        Yields every (step, length) progress update of the run until it finishes
+        """
+        while True:
+            update = self.updates.get()
+            if update is None:
+                return
+            yield update
+
+    def __await__(self):
+        import asyncio
+        return asyncio.wrap_future(self.future).__await__()
+
+    def report(self, step, state):
+        """
+        Progress callback given to simulated_annealing
+        """
+        update = (step, state.value())
+        self.updates.put(update)
+        if self.progress:
+            self.progress(*update)
+
+    def execute(self, coordinates, order, temperatures, successor_type, track_lengths, progress_interval, seed=None):
+        """
+        Runs on the executor. Anneals the order of node indices and resolves the future. The run draws from its own
+        random.Random, so runs in flight at the same time do not change each other's results
+
+        Args:
+            coordinates: An n x 2 array of the coordinates of self.nodes
+            order: The start order as indices into self.nodes
+            temperatures: The temperature of each step
+            successor_type: The SuccessorChooseType of the PathState
+            track_lengths: Whether the value of every step is returned
+            progress_interval: The number of steps between progress updates and cancel checks
+            seed: The seed of the random number generator of the run, or None for a random one
+        """
+        if not self.future.set_running_or_notify_cancel():
+            self.updates.put(None)
+            return
+        try:
+            rng = random.Random(seed)
+            state = PathState(CoordinateWeights(coordinates), successor_type, False, rng=rng)
+            state.nodes = list(order) + [order[0]]
+            state.generate_next_indices()
+            lengths = simulated_annealing(state, track_lengths, temperatures, progress=self.report,
+                                          progress_interval=progress_interval, cancel=self.cancel_event, rng=rng)
+            self.future.set_result((state.value(), lengths, [self.nodes[ind] for ind in state.nodes[:-1]]))
+        except Exception as error:
+            self.future.set_exception(error)
+        finally:
+            self.updates.put(None)
@@ -1 +1 @@
-from observable import Observable
+from src.observable import Observable
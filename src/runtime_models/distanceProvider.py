@@ -0,0 +1,86 @@
+import collections
+
+import numpy as np
+
+from src.algorithms.tours import pairwise_distances
+
+DEFAULT_MEMORY_BUDGET = 2**30  # Bytes a dense distance matrix may take before distances are computed on demand
+
+
+class OnDemandDistances:
+    """
+    Distances that are computed from the coordinates whenever they are looked up instead of being stored, so memory
+    stays O(n) for any number of nodes. It is indexed like a dense n x n array by the solvers: distances[i, j] with
+    integers or arrays, distances[i] for a row, distances[rows] for several rows and distances[start:stop] for a block
+    of rows. The most recently used single rows are kept in a small LRU cache
+
+    Attributes:
+        coordinates: The n x 2 array of coordinates
+        xs: Contiguous float32 x coordinates
+        ys: Contiguous float32 y coordinates
+        cache_rows: The number of rows the LRU cache holds
+        rows: The LRU cache from a row index to its distances
+    """
+    def __init__(self, coordinates, cache_rows=64):
+        self.coordinates = np.asarray(coordinates, dtype=float)
+        self.xs = np.ascontiguousarray(self.coordinates[:, 0], dtype=np.float32)
+        self.ys = np.ascontiguousarray(self.coordinates[:, 1], dtype=np.float32)
+        self.cache_rows = cache_rows
+        self.rows = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.xs)
+
+    @property
+    def shape(self):
+        return len(self.xs), len(self.xs)
+
+    def _pairs(self, rows, columns):
+        return np.hypot(self.xs[rows] - self.xs[columns], self.ys[rows] - self.ys[columns])
+
+    def row(self, index):
+        """
+        Gets the distances from one node to every node, using the LRU cache
+        """
+        if index in self.rows:
+            self.rows.move_to_end(index)
+            return self.rows[index]
+        row = self._pairs(index, slice(None))
+        self.rows[index] = row
+        if len(self.rows) > self.cache_rows:
+            self.rows.popitem(last=False)
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rows, columns = (np.asarray(index) for index in key)
+            return self._pairs(rows, columns)[()]
+        if isinstance(key, (int, np.integer)):
+            return self.row(int(key))
+        rows = np.arange(len(self.xs))[key]
+        return self._pairs(np.asarray(rows)[..., np.newaxis], np.arange(len(self.xs)))
+
+
+def dense_fits(num_nodes, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Checks if a dense float64 distance matrix of num_nodes nodes fits in the memory budget
+    """
+    return num_nodes * num_nodes * 8 <= memory_budget
+
+
+def distance_provider(coordinates, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Picks how the distances between the coordinates are provided to the solvers. A dense matrix is used if it fits in
+    the memory budget, otherwise distances are computed on demand
+
+    Args:
+        coordinates: An n x 2 array of coordinates
+        memory_budget: The number of bytes a dense matrix may take
+
+    Returns:
+        An n x n array or OnDemandDistances
+    """
+    coordinates = np.asarray(coordinates, dtype=float)
+    if dense_fits(len(coordinates), memory_budget):
+        return pairwise_distances(coordinates, coordinates)
+    return OnDemandDistances(coordinates)
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'TSPDIST1'
+HEADER = struct.Struct('<8s8sQ32s8x')  # magic, dtype, number of nodes, coordinate hash, padding to 64 bytes
+
+
+def coordinate_hash(coordinates):
+    """
+    Hashes the coordinates of the nodes in their order
+
+    Args:
+        coordinates: An n x 2 array of coordinates
+
+    Returns:
+        The 32 byte sha256 digest
+    """
+    return hashlib.sha256(np.ascontiguousarray(coordinates, dtype=np.float64).tobytes()).digest()
+
+
+class CondensedDistances:
+    """
+    A symmetric distance matrix stored as its condensed upper triangle, the n(n-1)/2 distances between every pair
+    without repeats. It is indexed like a dense n x n array by the solvers: distances[i, j] with integers or arrays,
+    distances[i] for a row, distances[rows] for several rows and distances[start:stop] for a block of rows
+
+    Attributes:
+        condensed: The one dimensional array, or np.memmap, of the upper triangle row by row
+        num_nodes: The number of nodes
+    """
+    def __init__(self, condensed, num_nodes):
+        self.condensed = condensed
+        self.num_nodes = num_nodes
+
+    def __len__(self):
+        return self.num_nodes
+
+    @property
+    def shape(self):
+        return self.num_nodes, self.num_nodes
+
+    def _pairs(self, rows, columns):
+        rows, columns = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64))
+        low, high = np.minimum(rows, columns), np.maximum(rows, columns)
+        index = self.num_nodes * low - low * (low + 1) // 2 + high - low - 1
+        return np.where(low == high, 0, self.condensed[np.where(low == high, 0, index)])[()]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self._pairs(*key)
+        rows = np.arange(self.num_nodes)[key]
+        return self._pairs(np.asarray(rows)[..., np.newaxis], np.arange(self.num_nodes))
+
+
+def compute_condensed(coordinates, out):
+    """
+    Fills a condensed array with the distances between the coordinates one row at a time, so no more than one row of
+    the full matrix is ever held in memory
+
+    Args:
+        coordinates: An n x 2 array of coordinates
+        out: An array of length n(n-1)/2
+    """
+    num_nodes = len(coordinates)
+    start = 0
+    for row in range(num_nodes - 1):
+        stop = start + num_nodes - row - 1
+        out[start:stop] = np.hypot(*(coordinates[row+1:] - coordinates[row]).T)
+        start = stop
+
+
+def open_sidecar(path, coordinates, dtype=np.float32):
+    """
+    Opens the memory mapped distance file of a configuration. The file is rebuilt if it is missing, holds another
+    dtype or was made for other coordinates. Every process that opens the same file shares its pages through the OS
+    page cache
+
+    Args:
+        path: The path of the sidecar file, usually the configuration path with '.dist' added
+        coordinates: An n x 2 array of the coordinates of the nodes in their order
+        dtype: np.float32 or np.float64
+
+    Returns:
+        CondensedDistances backed by a read only np.memmap
+    """
+    coordinates = np.asarray(coordinates, dtype=float)
+    num_nodes = len(coordinates)
+    digest = coordinate_hash(coordinates)
+    dtype = np.dtype(dtype)
+    header = HEADER.pack(MAGIC, dtype.str.encode(), num_nodes, digest)
+    size = num_nodes * (num_nodes - 1) // 2
+    if not _matches(path, header):
+        temporary = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary, 'wb') as file:
+            file.write(header)
+            file.truncate(HEADER.size + size * dtype.itemsize)
+        if size:
+            out = np.memmap(temporary, dtype=dtype, mode='r+', offset=HEADER.size, shape=(size,))
+            compute_condensed(coordinates, out)
+            out.flush()
+            del out
+        os.replace(temporary, path)
+    if not size:
+        return CondensedDistances(np.zeros(0, dtype=dtype), num_nodes)
+    return CondensedDistances(np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size, shape=(size,)), num_nodes)
+
+
+def _matches(path, header):
+    """
+    Checks if a sidecar file exists and starts with the given header
+    """
+    try:
+        with open(path, 'rb') as file:
+            return file.read(HEADER.size) == header
+    except OSError:
+        return False
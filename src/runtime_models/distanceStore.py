@@ -0,0 +1,196 @@
+import math
+
+import numpy as np
+
+from src.runtime_models.distanceProvider import DEFAULT_MEMORY_BUDGET, OnDemandDistances
+
+
+def largest_dense(memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Gets the largest number of nodes whose dense float64 distance matrix fits in the memory budget
+    """
+    return math.isqrt(memory_budget // 8)
+
+
+class DistanceStore:
+    """
+    Keeps the distances between every pair of nodes of a NodeTable up to date as nodes are added, removed or moved. Each
+    row owns a slot, which is a row and column of the matrix, so a change only recalculates that row and column. Slots
+    of removed nodes are reused by the next added node. Can be indexed like the weights dictionary of a PathState by a
+    frozenset of two nodes of the table
+
+    The store does not observe the table or its nodes. It catches up in sync, which the other methods call, whenever the
+    generation of the table moved on: rows are matched to slots by their ids and only the rows added or changed since
+    the last sync, found with changed_since, are recalculated. Loading or importing nodes in bulk therefore makes no
+    Node views and registers no callbacks
+
+    The matrix grows by doubling but never past the most nodes that fit in memory_budget. Once the nodes themselves do
+    not fit it is dropped and distances are computed from the coordinates on demand instead, so only the coordinates are
+    kept. It is built again once enough nodes were removed for the nodes to fit with room to grow
+
+    Attributes:
+        table: The NodeTable followed
+        memory_budget: The number of bytes the matrix may take
+        generation: The generation of the table at the last sync
+        ids: The id of the node in each row of the table at the last sync
+        slots: The slot of each row of the table at the last sync
+        slot_list: slots as a list, so finding the slot of a node is a single list lookup
+        coordinates: A capacity x 2 array of the coordinates held in each slot
+        matrix: A capacity x capacity array of the distances between the slots, None without a dense matrix
+        free: The slots that are not being used by any row
+    """
+    BLOCK_ROWS = 1024   # Rows calculated together when many slots change
+    REBUILD_FILL = .75  # Share of the most nodes that fit below which a dropped matrix is built again
+
+    def __init__(self, table, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Creates the store for the nodes of a table
+
+        Args:
+            table: The NodeTable to keep distances for
+            memory_budget: The number of bytes the matrix may take
+        """
+        self.table = table
+        self.memory_budget = memory_budget
+        self.generation = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.slots = np.zeros(0, dtype=np.int64)
+        self.slot_list = []
+        self.coordinates = np.zeros((0, 2))
+        self.matrix = np.zeros((0, 0))
+        self.free = []
+        self.sync()
+
+    def __contains__(self, node):
+        return node in self.table
+
+    def __len__(self):
+        return len(self.slot_list)
+
+    def __getitem__(self, pair):
+        if len(pair) == 1:
+            return 0
+        node1, node2 = pair
+        slot1, slot2 = self.slot_list[node1.row], self.slot_list[node2.row]
+        if self.matrix is None:
+            (x1, y1), (x2, y2) = self.coordinates[slot1], self.coordinates[slot2]
+            return math.hypot(x1 - x2, y1 - y2)
+        return self.matrix[slot1, slot2]
+
+    def sync(self):
+        """
+        Catches up with the changes made to the table since the last sync
+        """
+        table = self.table
+        if table.generation == self.generation:
+            return
+        ids = table.ids
+        if len(ids) >= len(self.ids) and np.array_equal(ids[:len(self.ids)], self.ids):
+            slots = self.slots
+        else:
+            kept = np.isin(self.ids, ids, assume_unique=True)
+            self.free.extend(self.slots[~kept].tolist())
+            slots = self.slots[kept]
+        changed = np.arange(len(ids)) if self.generation is None else table.changed_since(self.generation)
+        added = len(ids) - len(slots)
+        if added > len(self.free):
+            self._grow(len(ids))
+        new = self.free[len(self.free) - added:]
+        del self.free[len(self.free) - added:]
+        self.slots = np.concatenate((slots, np.array(new[::-1], dtype=np.int64)))
+        self.slot_list = self.slots.tolist()
+        self.ids = ids.copy()
+        self.generation = table.generation
+        if self.matrix is None and len(ids) <= self.REBUILD_FILL * largest_dense(self.memory_budget):
+            self._rebuild()
+        else:
+            self._update(changed)
+
+    def _grow(self, needed):
+        """
+        Grows the slots to hold needed nodes, doubling them but not past the most nodes whose matrix fits in the memory
+        budget. The matrix is dropped if needed nodes do not fit
+        """
+        old = len(self.coordinates)
+        new = max(2 * old, 16, needed)
+        if self.matrix is not None:
+            largest = largest_dense(self.memory_budget)
+            if needed <= largest:
+                new = max(min(new, largest), needed)
+            else:
+                self.matrix = None
+        coordinates = np.zeros((new, 2))
+        coordinates[:old] = self.coordinates
+        self.coordinates = coordinates
+        if self.matrix is not None:
+            matrix = np.zeros((new, new))
+            matrix[:old, :old] = self.matrix
+            self.matrix = matrix
+        self.free[:0] = range(new - 1, old - 1, -1)
+
+    def _rebuild(self):
+        """
+        Gives the rows the first slots in order and builds the matrix for them from scratch
+        """
+        size = len(self.ids)
+        capacity = max(size, min(max(2 * size, 16), largest_dense(self.memory_budget)))
+        self.coordinates = np.zeros((capacity, 2))
+        self.matrix = np.zeros((capacity, capacity))
+        self.free = list(range(capacity - 1, size - 1, -1))
+        self.slots = np.arange(size, dtype=np.int64)
+        self.slot_list = self.slots.tolist()
+        self._update(np.arange(size))
+
+    def _update(self, rows):
+        """
+        Recalculates the coordinates and the rows and columns of the slots of the given rows of the table, in blocks
+        """
+        if not len(rows):
+            return
+        slots = self.slots[rows]
+        self.coordinates[slots, 0] = self.table.xs[rows]
+        self.coordinates[slots, 1] = self.table.ys[rows]
+        if self.matrix is None:
+            return
+        for start in range(0, len(slots), self.BLOCK_ROWS):
+            block = slots[start:start + self.BLOCK_ROWS]
+            distances = np.hypot(*(self.coordinates[np.newaxis, :, :] - self.coordinates[block, np.newaxis, :]).T).T
+            self.matrix[block, :] = distances
+            self.matrix[:, block] = distances.T
+
+    def neighbourhood(self, node, k):
+        """
+        Gets the k nodes closest to a node
+
+        Args:
+            node: A node of the table to search around
+            k: The number of nodes to return. The node itself is included
+
+        Returns:
+            An array of rows of the table
+        """
+        self.sync()
+        slot = self.slot_list[node.row]
+        if self.matrix is None:
+            distances = np.hypot(*(self.coordinates[self.slots] - self.coordinates[slot]).T)
+        else:
+            distances = self.matrix[slot, self.slots]
+        k = min(k, len(self.slots))
+        return np.argpartition(distances, k - 1)[:k]
+
+    def distance_matrix(self):
+        """
+        Gets the distances between the nodes of the table in row order. Returns a view without copying when the rows are
+        already in slot order
+
+        Returns:
+            An n x n array where entry [i, j] is the distance between the nodes in rows i and j, or OnDemandDistances
+            that are indexed the same way if the store has no dense matrix
+        """
+        self.sync()
+        if self.matrix is None:
+            return OnDemandDistances(self.table.coordinates())
+        slots = self.slots
+        if np.array_equal(slots, np.arange(len(slots))):
+            return self.matrix[:len(slots), :len(slots)]
+        return self.matrix[np.ix_(slots, slots)]
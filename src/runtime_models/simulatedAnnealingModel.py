@@ -1,14 +1,39 @@
 import enum
+import math
 import numpy as np
 import random
 
+from src.algorithms.tours import cheapest_insertion
 from src.constants import ChangeType
 from src.observable import Observable
+from src.runtime_models.distanceProvider import DEFAULT_MEMORY_BUDGET, OnDemandDistances
+from src.runtime_models.distanceStore import DistanceStore
 
 
 class SuccessorChooseType(enum.Enum):
     BOTH_RANDOM = 0
     RANDOM_NEIGHBORS = 1
+    RANDOM_WINDOW = 2
+
+
+class CoordinateWeights:
+    """
+    Weights for a PathState that are calculated from coordinates when they are looked up instead of being stored for
+    every pair. Indexed like the weights dictionary by a frozenset of two node indices
+
+    Attributes:
+        xs: The x coordinate of every node
+        ys: The y coordinate of every node
+    """
+    def __init__(self, coordinates):
+        self.xs = [float(x) for x in coordinates[:, 0]]
+        self.ys = [float(y) for y in coordinates[:, 1]]
+
+    def __getitem__(self, pair):
+        if len(pair) == 1:
+            return 0
+        node1, node2 = pair
+        return math.hypot(self.xs[node1] - self.xs[node2], self.ys[node1] - self.ys[node2])
 
 
 class PathState(Observable):
@@ -22,8 +47,12 @@ class PathState(Observable):
         current_value: Stores the current value of the array so it can simply be looked up instead of recalculated
         self.next_start_ind: The start index of the next path range to flip
         self.next_end_ind: The end index of the next path range to flip
+        window: The furthest apart the two indices may be for SuccessorChooseType.RANDOM_WINDOW
+        rng: The random number generator the indices are drawn from, the random module or a random.Random of the run
     """
-    def __init__(self, weights, successor_choose_type, notify_canvas):
+    unordered = True  # Observers keep a set of edges
+
+    def __init__(self, weights, successor_choose_type, notify_canvas, window=50, rng=random):
         Observable.__init__(self)
         self.nodes = []
         self.weights = weights
@@ -32,11 +61,15 @@ class PathState(Observable):
         self.next_start_ind = 0
         self.next_end_ind = 0
         self.next_change = 0
+        self.window = window
+        self.rng = rng
 
         if successor_choose_type == SuccessorChooseType.BOTH_RANDOM:
             self.generate_next_indices = self.generate_two_random_indices
         elif successor_choose_type == SuccessorChooseType.RANDOM_NEIGHBORS:
             self.generate_next_indices = self.generate_random_neighboring_indices
+        elif successor_choose_type == SuccessorChooseType.RANDOM_WINDOW:
+            self.generate_next_indices = self.generate_random_window_indices
 
     def generate_two_random_indices(self):
         """
@@ -44,9 +77,9 @@ class PathState(Observable):
         index. Stores the results in self.next_start_ind, self.next_end_ind
         """
         # Ignore the edges of the graph
-        rand1 = int(random.random() * (len(self.nodes)-2)) + 1
+        rand1 = int(self.rng.random() * (len(self.nodes)-2)) + 1
         while True:
-            rand2 = int(random.random() * (len(self.nodes)-2)) + 1
+            rand2 = int(self.rng.random() * (len(self.nodes)-2)) + 1
             if rand2 != rand1:
                 self.next_start_ind = min(rand1, rand2)
                 self.next_end_ind = max(rand1, rand2)
@@ -58,11 +91,26 @@ class PathState(Observable):
         index. Stores the results in self.next_start_ind, self.next_end_ind
         """
         # Ignore the edges of the graph
-        rand1 = int(random.random() * (len(self.nodes)-2)) + 1
+        rand1 = int(self.rng.random() * (len(self.nodes)-2)) + 1
         rand2 = rand1 - 1 if rand1 != 1 else rand1 + 1
         self.next_start_ind = min(rand1, rand2)
         self.next_end_ind = max(rand1, rand2)
 
+    def generate_random_window_indices(self):
+        """
+        Generates the next indices to flip randomly so they are at most self.window apart. Ignores the first and last
+        indices and will not pick the same index. Keeps each flip short on very long paths. Stores the results in
+        self.next_start_ind, self.next_end_ind
+        """
+        last = len(self.nodes) - 2
+        rand1 = int(self.rng.random() * last) + 1
+        while True:
+            rand2 = rand1 + int(self.rng.random() * (2 * self.window + 1)) - self.window
+            if rand2 != rand1 and 1 <= rand2 <= last:
+                self.next_start_ind = min(rand1, rand2)
+                self.next_end_ind = max(rand1, rand2)
+                return
+
     def value(self):
         """
         Gets the current value of the path which is simply it's total weight. Caches the value
@@ -141,36 +189,95 @@ class SimulatedAnnealingModel(Observable):
     Simple class to generate and initial PathState. This class will can be observed and it will pass all observes on two
     the path state. notify_observers(ChangeType, node1, node2) will be called whenever an edge is added or deleted
     """
+    unordered = True  # Observers keep a set of edges
+
     def __init__(self):
         Observable.__init__(self)
         self.nodes = []
         self.weights = {}
+        self.distances = None
+
+    def track(self, nodes, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Keeps a DistanceStore following a NodeTable so the weights never need to be rebuilt from scratch before a run.
+        self.nodes must hold the nodes of the table in row order whenever the model is used
+
+        Args:
+            nodes: The NodeTable to follow
+            memory_budget: The number of bytes the store's dense matrix may take before it computes distances on demand
+        """
+        self.distances = DistanceStore(nodes, memory_budget)
 
     def init(self):
         """
-        Initializes the weights for the nodes. Called before generating a start state
+        Initializes the weights for the nodes. Called before generating a start state. Only calculates distances for
+        nodes that were added or moved since the DistanceStore last caught up with the table
+        """
+        self.distances.sync()
+        self.weights = self.distances
+
+    def coordinates(self):
+        """
+        Returns:
+            An n x 2 array holding the x and y coordinates of every node, read from the columns of the table
+        """
+        return self.distances.table.coordinates()
+
+    def distance_matrix(self):
+        """
+        Calculates the distances between every pair of nodes at once
+
+        Returns:
+            An n x n array where entry [i, j] is the distance between self.nodes[i] and self.nodes[j]
+        """
+        return self.distances.distance_matrix()
+
+    def show_tour(self, order):
+        """
+        Notifies all observers of every edge in a finished tour. Used by solvers that do not work on a PathState
+
+        Args:
+            order: A sequence of indices into self.nodes in the order they are visited
+        """
+        with self.batch():
+            for ind in range(len(order)):
+                self.notify_observers(ChangeType.ADD, self.nodes[order[ind-1]], self.nodes[order[ind]])
+
+    def warm_start_order(self, previous):
+        """
+        Builds a start order from a previous tour. Nodes that no longer exist are spliced out and nodes that were added
+        since are placed by cheapest insertion. The insertion costs are computed from the coordinates for the missing
+        nodes only, so no distance matrix is built or copied
+
+        Args:
+            previous: The previous tour as a sequence of nodes
+
+        Returns:
+            A list of the current nodes in the order they should be visited
         """
-        nodes = self.nodes
-        num_nodes = len(nodes)
-        for i, j in np.ndindex((num_nodes, num_nodes)):
-            point1 = np.array([nodes[i].x, nodes[i].y])
-            point2 = np.array([nodes[j].x, nodes[j].y])
-            self.weights[frozenset([nodes[i], nodes[j]])] = np.linalg.norm(point1-point2)
+        index = {node: ind for ind, node in enumerate(self.nodes)}
+        tour = [index[node] for node in previous if node in index]
+        kept = set(tour)
+        missing = [ind for ind in range(len(self.nodes)) if ind not in kept]
+        if missing:
+            tour = cheapest_insertion(OnDemandDistances(self.coordinates()), tour, missing)
+        return [self.nodes[ind] for ind in tour]
 
-    def start_state(self, successor_choose_type, notify_canvas=True):
+    def start_state(self, successor_choose_type, notify_canvas=True, order=None, rng=random):
         """
-        Gets a start PathState to run a simulation on
+        Gets a start PathState to run a simulation on. The path follows order if it is given, otherwise self.nodes.
+        The state draws its flips from rng
         """
         self.init()
-        state = PathState(self.weights, successor_choose_type, notify_canvas)
-        state.nodes.append(self.nodes[0])
-        for ind in range(1, len(self.nodes)):
-            state.nodes.append(self.nodes[ind])
-            if notify_canvas:
-                self.notify_observers(ChangeType.ADD, self.nodes[ind-1], self.nodes[ind])
-        state.nodes.append(self.nodes[0])
+        nodes = self.nodes if order is None else order
+        state = PathState(self.weights, successor_choose_type, notify_canvas, rng=rng)
+        state.nodes.extend(nodes)
+        state.nodes.append(nodes[0])
         state.observers.update(self.observers)
+        state.batch_observers.update(self.batch_observers)
         if notify_canvas:
-            self.notify_observers(ChangeType.ADD, self.nodes[len(self.nodes)-1], self.nodes[0])
+            with self.batch():
+                for ind in range(1, len(nodes) + 1):
+                    self.notify_observers(ChangeType.ADD, nodes[ind-1], nodes[ind % len(nodes)])
         state.generate_next_indices()
         return state
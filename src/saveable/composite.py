@@ -6,34 +6,72 @@ from src.observable import Observable
 from src.saveable.saveable import SaveableType
 
 
+class Field(property):
+    """
+    Data descriptor made by CompositeMeta for each SaveableType class attribute of a Composite. The SaveableType
+    instance lives in a slot of the composite. Getting the attribute returns its get() if it has one, otherwise the
+    instance itself. Setting calls its set() and notifies the observers of the composite with the attribute name
+
+    Attributes:
+        key: The name of the attribute
+        saveable_type: The SaveableType class of the attribute
+        slot: The member descriptor of the slot holding the instance
+    """
+    def __init__(self, key, saveable_type, slot):
+        if callable(getattr(saveable_type, 'get', None)):
+            fget = lambda obj: slot.__get__(obj).get()
+        else:
+            fget = slot.__get__
+
+        if callable(getattr(saveable_type, 'set', None)):
+            def fset(obj, value):
+                slot.__get__(obj).set(value)
+                obj.notify_observers(key)
+        else:
+            def fset(obj, value):
+                raise ValueError("Cannot assign directly to '{}' ({})".format(key, saveable_type))
+
+        property.__init__(self, fget, fset)
+        self.key = key
+        self.saveable_type = saveable_type
+        self.slot = slot
+
+
 class CompositeMeta(ABCMeta):
     """
     Meta class that keeps track of an ordered list of class attributes to later be used by the Composite class.
-    Adds all class attributes of type SaveableType to member __ordered__ of the class __dict__
+    Adds all class attributes of type SaveableType to member __ordered__ of the class __dict__, gives each one a slot
+    and replaces it with a Field descriptor. __fields__ maps each name, including those of base classes, to its Field
     """
     @classmethod
     def __prepare__(self, name, bases):
         return collections.OrderedDict()
 
     def __new__(self, name, bases, classdict):
+        fields = collections.OrderedDict()
         for base in bases:
-            if hasattr(base, '__ordered__'):
-                for key in base.__ordered__:
-                    classdict[key] = base.__dict__[key]
-        classdict['__ordered__'] = [key for key in classdict.keys() if
-                                    inspect.isclass(classdict[key]) and
-                                    issubclass(classdict[key], SaveableType)]
-
-        return type.__new__(self, name, bases, dict(classdict))
+            fields.update(getattr(base, '__fields__', {}))
+        own = collections.OrderedDict((key, value) for key, value in classdict.items()
+                                      if inspect.isclass(value) and issubclass(value, SaveableType))
+        for key in own:
+            del classdict[key]
+        classdict['__slots__'] = tuple(classdict.get('__slots__', ())) + tuple('_' + key for key in own)
+        cls = type.__new__(self, name, bases, dict(classdict))
+        for key, saveable_type in own.items():
+            fields[key] = Field(key, saveable_type, cls.__dict__['_' + key])
+            setattr(cls, key, fields[key])
+        cls.__fields__ = fields
+        cls.__ordered__ = list(fields)
+        return cls
 
 
 class Composite(SaveableType, Observable, metaclass=CompositeMeta):
     """
     A Saveable Composite type. This class is meant to be subclassed to easily create new SaveableType's made up of
     other SaveableTypes. For each type the object should hold, simply add a class attribute that is equal to that type.
-    Every instance created will have a value of that type. No new instances attributes can be directly added. If the
-    SaveableType has a 'get' method, then accessing that attribute will return its get method. If it has a 'set' method
-    then setting that attribute will call its set method. Otherwise setting is disallowed
+    Every instance created will have a value of that type. No new instances attributes can be added, as every composite
+    only has slots. If the SaveableType has a 'get' method, then accessing that attribute will return its get method.
+    If it has a 'set' method then setting that attribute will call its set method. Otherwise setting is disallowed
 
     The bytearray representation of a composite is each bytearray representation of the composite in the order they were
     declared, one after another
@@ -46,57 +84,57 @@ class Composite(SaveableType, Observable, metaclass=CompositeMeta):
         Every Composite1 that is created will have a val1 and val2 attributes of the specified types. val1 = 5 will call
         val1.set(5) but val2 does not have a set so val2 = [4] will cause an Exception
 
-
+    Attributes named in __optional__ must be declared last. They may be missing from the end of the data being loaded,
+    which lets new attributes be added without breaking files saved before they existed. Missing ones are reset
     """
+    __slots__ = ('observers', 'batch_observers', 'batching')
+    __optional__ = ()
+
     def __init__(self):
         """
         Creates an instance attribute for each type in the class attribute '__ordered__'.
         """
         SaveableType.__init__(self)
         Observable.__init__(self)
-        for key in self.__ordered__:
-            self.__dict__[key] = type(self).__dict__[key]()
+        for field in self.__fields__.values():
+            field.slot.__set__(self, field.saveable_type())
 
     def __setattr__(self, key, value):
         """
-        Catches all attribute setting. Only allows the setting if the attribute being set has a 'set' method. If it does
-        calls attribute.set(value). Otherwise setting is disallowed
+        Only allows setting the Saveable attributes of the class and the attributes it declares in __slots__
         """
-        if key not in self.__dict__:
+        if not hasattr(type(self), key):
             raise ValueError("{} has no Saveable attribute named {}".format(type(self), key))
-        saveable_type = self.__dict__[key]
-        if not callable(getattr(saveable_type, 'set', None)):
-            raise ValueError("Cannot assign directly to '{}' ({})".format(key, type(saveable_type)))
-        saveable_type.set(value)
-        self.notify_observers(key)
+        object.__setattr__(self, key, value)
 
-    def __getattribute__(self, item):
+    def saveable(self, key):
         """
-        Catches all attribute getting. If the attribute defines a 'get' method returns that instead, otherwise just
-        returns the attribute
+        Gets the SaveableType instance of an attribute instead of the value its get method returns
+
+        Args:
+            key: The name of the attribute
+
+        Returns:
+            The SaveableType instance
         """
-        get_attribute = lambda item: SaveableType.__getattribute__(self, item)
-        _dict = get_attribute('__dict__')
-        if item not in _dict:
-            return get_attribute(item)
-        saveable_type = _dict[item]
-        return saveable_type.get() if callable(getattr(saveable_type, 'get', None)) else saveable_type
-
-    def load_in_place(self, byte_array):
-        for key in self.__ordered__:
-            self.__dict__[key].load_in_place(byte_array)
+        return self.__fields__[key].slot.__get__(self)
+
+    def read(self, reader):
+        for key, field in self.__fields__.items():
+            if key in self.__optional__ and not len(reader):
+                field.slot.__set__(self, field.saveable_type())
+            else:
+                field.slot.__get__(self).read(reader)
             self.notify_observers(key)
 
-    def to_byte_array(self):
-        array = bytearray()
+    def write(self, stream):
         for key in self.__ordered__:
-            array += self.__dict__[key].to_byte_array()
-        return array
+            self.saveable(key).write(stream)
 
     def __str__(self):
         string = '{'
         for key in self.__ordered__:
-            string += '{}: {}, '.format(key, self.__dict__[key])
+            string += '{}: {}, '.format(key, self.saveable(key))
         string = string[:-1]
         string += '}'
         return string
@@ -0,0 +1,193 @@
+import os
+import struct
+import zlib
+
+from src.constants import ChangeType
+from src.saveable.node import Node
+
+HEADER = struct.Struct('<8sQQ')  # Magic, size and modification time in nanoseconds of the base file
+MAGIC = b'TSJRNL01'
+FRAME = struct.Struct('<II')     # Length and crc32 of a record
+RECORD = struct.Struct('<BI')    # Operation and node index
+POSITION = struct.Struct('<HH')
+
+ADD, REMOVE, SET_X, SET_Y, SET_NAME = range(5)
+
+
+def journal_path(path):
+    return path + '.journal'
+
+
+def _base_header(path):
+    status = os.stat(path)
+    return HEADER.pack(MAGIC, status.st_size, status.st_mtime_ns)
+
+
+def _apply(config, payload):
+    """
+    Applies one journal record to a SalesmanConfig
+    """
+    operation, index = RECORD.unpack_from(payload)
+    value = payload[RECORD.size:]
+    if operation == ADD:
+        config.nodes.append(Node(*POSITION.unpack_from(value), value[POSITION.size:].decode('ascii')))
+    elif operation == REMOVE:
+        config.nodes.remove(config.nodes[index])
+    elif operation == SET_NAME:
+        config.nodes[index].name = value.decode('ascii')
+    else:
+        setattr(config.nodes[index], 'x' if operation == SET_X else 'y', struct.unpack('<H', value)[0])
+
+
+def replay(config, path):
+    """
+    Applies the journal of a configuration file to a SalesmanConfig that was just loaded from it. The node notifications
+    are batched so nodes that were added and removed again are never reported. A journal that was written for another
+    version of the base file is ignored. A record that was only partly written, such as by a crash, ends the replay and
+    is cut off the journal
+
+    Args:
+        config: The SalesmanConfig loaded from path
+        path: The path of the base configuration file
+
+    Returns:
+        The number of records applied
+    """
+    try:
+        with open(journal_path(path), 'rb') as file:
+            data = file.read()
+    except OSError:
+        return 0
+    if data[:HEADER.size] != _base_header(path):
+        return 0
+    position, applied = HEADER.size, 0
+    with config.nodes.batch():
+        while position + FRAME.size <= len(data):
+            length, checksum = FRAME.unpack_from(data, position)
+            payload = data[position + FRAME.size:position + FRAME.size + length]
+            if len(payload) != length or zlib.crc32(payload) != checksum:
+                break
+            _apply(config, payload)
+            position += FRAME.size + length
+            applied += 1
+    if position != len(data):
+        with open(journal_path(path), 'r+b') as file:
+            file.truncate(position)
+    return applied
+
+
+class Journal:
+    """
+    Autosaves edits to the nodes of a SalesmanConfig by appending a small record to a journal file next to the base
+    configuration file for every node that is added, removed, moved or renamed. The edits are followed through the
+    notifications of the node table alone, which carry the row of each node. Once the journal grows past compact_size
+    the configuration is saved to the base file and the journal starts over. replay applies a journal after a crash
+
+    Attributes:
+        config: The SalesmanConfig being followed
+        path: The path of the base configuration file
+        compact_size: The size in bytes the journal may grow to before it is compacted into the base file
+        sync: If true every record is flushed to disk before returning
+        before_compact: Optional function run before the config is saved by a compaction
+        file: The open journal file
+    """
+    def __init__(self, config, path, *, compact_size=2**20, sync=False, before_compact=None):
+        """
+        Starts journaling a configuration that was loaded from or saved to path. If path already has a journal for the
+        same base file it is appended to, so it should have been replayed into config first
+        """
+        self.config = config
+        self.path = path
+        self.compact_size = compact_size
+        self.sync = sync
+        self.before_compact = before_compact
+        self.file = None
+        self.open()
+        config.nodes.register_batch(self.on_node_change)
+
+    def open(self, restart=False):
+        """
+        Opens the journal for appending. A journal written for another version of the base file is started over
+        """
+        header = _base_header(self.path)
+        try:
+            with open(journal_path(self.path), 'rb') as file:
+                restart = restart or file.read(HEADER.size) != header
+        except OSError:
+            restart = True
+        self.file = open(journal_path(self.path), 'wb' if restart else 'ab')
+        if restart:
+            self.file.write(header)
+            self.flush()
+
+    def close(self):
+        """
+        Stops journaling and closes the journal file. The journal is kept so it can be replayed
+        """
+        self.config.nodes.unregister(self.on_node_change)
+        self.file.close()
+
+    def flush(self):
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+
+    def append(self, operation, index, value=b''):
+        """
+        Appends a record to the journal
+
+        Args:
+            operation: One of ADD, REMOVE, SET_X, SET_Y and SET_NAME
+            index: The index of the node in the config
+            value: The encoded value of the operation
+        """
+        payload = RECORD.pack(operation, index) + value
+        self.file.write(FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+
+    def compact(self):
+        """
+        Saves the config to the base file and starts the journal over. The base file is replaced in one step so a crash
+        leaves either the old base file with its journal or the new one
+        """
+        if self.before_compact is not None:
+            self.before_compact()
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as file:
+            self.config.save_to(file)
+        os.replace(temporary, self.path)
+        self.file.close()
+        self.open(restart=True)
+
+    def on_node_change(self, events):
+        """
+        Run with the notifications of the node table, a batch at a time. Nodes added or removed in bulk are saved by
+        compacting instead of being journaled one by one, and a batch holding any bulk change is compacted only once
+        since the saved config already holds every other change of the batch. Otherwise the records of the batch are
+        flushed together and the journal is compacted afterwards if it grew too large
+
+        Args:
+            events: The (args, kwargs) pairs of the notifications
+        """
+        if any(args[0] in (ChangeType.EXTEND, ChangeType.REMOVE_MANY) for args, _ in events):
+            self.compact()
+            return
+        for args, _ in events:
+            change_type, node = args[:2]
+            if change_type == ChangeType.ADD:
+                self.append(ADD, node.row, POSITION.pack(node.x, node.y) + node.name.encode('ascii'))
+            elif change_type == ChangeType.REMOVE:
+                self.append(REMOVE, node.row)
+            elif change_type == ChangeType.VALUE_CHANGE:
+                self.on_value_change(*args[1:])
+        self.flush()
+        if self.file.tell() > self.compact_size:
+            self.compact()
+
+    def on_value_change(self, row, key, value):
+        """
+        Run when the position or name of the node in a row is set
+        """
+        if key == 'name':
+            self.append(SET_NAME, row, value.encode('ascii'))
+        else:
+            self.append(SET_X if key == 'x' else SET_Y, row, struct.pack('<H', value))
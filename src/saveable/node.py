@@ -1,12 +1,85 @@
-from src.saveable.composite import Composite
-from src.saveable.saveableInt import saveable_int
-from src.saveable.saveableString import SaveableString
+from src.observable import Observable
+from src.saveable.saveable import SaveableType
+from src.saveable.saveableInt import INT_CODECS
+from src.saveable.saveableString import LENGTH
 
+COORDINATE = INT_CODECS['u16']
+FIELDS = ('x', 'y', 'name')
 
-class Node(Composite):
+
+def _field(index):
+    """
+    Makes the property of one field of a Node. Setting it notifies the observers of the node with the field name
+    """
+    key = FIELDS[index]
+
+    def get(self):
+        if self.table is None:
+            return self.detached[index]
+        return self.table.get_value(self.row, index)
+
+    def set(self, value):
+        if self.table is None:
+            self.detached[index] = value
+        else:
+            self.table.set_value(self.row, index, value)
+        self.notify_observers(key)
+
+    return property(get, set)
+
+
+class Node(SaveableType, Observable):
     """
     Node type for travelling salesman problem. Holds integer x and y coordinates and the name of the node
+
+    A node in a NodeTable is a view of one of its rows and reads and writes the table's arrays. A node that is not in a
+    table, because it was not added yet or was removed, holds its own values. Either way setting x, y or name notifies
+    observers with the name of the attribute
+
+    Attributes:
+        table: The NodeTable the node is a view into, or None
+        row: The row of the node in table, or the row it was last in once it was removed
+        detached: A list of the x, y and name of the node while it is not in a table
     """
-    x = saveable_int('u16')
-    y = saveable_int('u16')
-    name = SaveableString
+    __slots__ = ('table', 'row', 'detached', 'observers', 'batch_observers', 'batching')
+
+    x = _field(0)
+    y = _field(1)
+    name = _field(2)
+
+    def __init__(self, x=0, y=0, name=''):
+        Observable.__init__(self)
+        self.table = None
+        self.row = None
+        self.detached = [x, y, name]
+
+    def bind(self, table, row):
+        """
+        Makes the node a view of a row of a table. The table must already hold its values
+        """
+        self.table, self.row, self.detached = table, row, None
+
+    def unbind(self):
+        """
+        Copies the values of the node out of its table so it stays readable after its row is gone. row is kept as the
+        row the node was removed from
+        """
+        self.detached = [self.x, self.y, self.name]
+        self.table = None
+
+    def read(self, reader):
+        x, = reader.unpack(COORDINATE)
+        y, = reader.unpack(COORDINATE)
+        length, = reader.unpack(LENGTH)
+        for key, value in zip(FIELDS, (x, y, str(reader.read(length), 'ascii'))):
+            setattr(self, key, value)
+
+    def write(self, stream):
+        encoded = self.name.encode('ascii')
+        stream.write(COORDINATE.pack(self.x) + COORDINATE.pack(self.y) + LENGTH.pack(len(encoded)) + encoded)
+
+    def __str__(self):
+        return '{{x: {}, y: {}, name: {}}}'.format(self.x, self.y, self.name)
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,349 @@
+import numpy as np
+
+from src.constants import ChangeType
+from src.observable import Observable
+from src.saveable.node import COORDINATE, FIELDS, Node
+from src.saveable.saveable import SaveableType
+from src.saveable.saveableString import LENGTH
+
+SIZE = LENGTH
+
+
+class NodeTable(SaveableType, Observable):
+    """
+    The nodes of a configuration stored as a struct of arrays: one NumPy array each for the x and y coordinates and a
+    list of names. Node objects are only views of a row and are made the first time a row is asked for, so bulk loads
+    and solvers that read the coordinates as arrays never create one. A view keeps its identity while it is in the
+    table and its row is updated when rows before it are removed
+
+    It can be used like a SaveableArray of Nodes. ADD and REMOVE are sent for single nodes. EXTEND is sent once with the
+    range of new rows when nodes are added in bulk, so observers that read the columns never make a view, and
+    REMOVE_MANY is sent once with the list of removed nodes. VALUE_CHANGE is sent with
+    the row, the name of the field and the new value whenever x, y or name of a node is set, so one observer of the
+    table can follow every node
+
+    Attributes:
+        size: The number of nodes
+        x_column: The x coordinates, with spare capacity past size
+        y_column: The y coordinates, with spare capacity past size
+        names: The name of each node
+        views: The Node view of each row, or None if it was not made yet
+        id_column: A unique id of the node in each row that is never reused, with spare capacity past size
+        next_id: The id the next added node gets
+        generation: A counter that goes up on every change to the table
+        modified: The generation at which each row was last changed, with spare capacity past size
+    """
+    def __init__(self):
+        SaveableType.__init__(self)
+        Observable.__init__(self)
+        self.size = 0
+        self.x_column = np.zeros(16, dtype=np.uint16)
+        self.y_column = np.zeros(16, dtype=np.uint16)
+        self.id_column = np.zeros(16, dtype=np.int64)
+        self.modified = np.zeros(16, dtype=np.uint64)
+        self.names = []
+        self.views = []
+        self.next_id = 0
+        self.generation = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return (self[row] for row in range(self.size))
+
+    def __getitem__(self, row):
+        """
+        Gets the Node view of a row, making it if needed
+        """
+        if isinstance(row, slice):
+            return [self[ind] for ind in range(self.size)[row]]
+        if row < 0:
+            row += self.size
+        if not 0 <= row < self.size:
+            raise IndexError('Row {} is out of range for {} nodes'.format(row, self.size))
+        view = self.views[row]
+        if view is None:
+            view = Node.__new__(Node)
+            Observable.__init__(view)
+            view.bind(self, row)
+            self.views[row] = view
+        return view
+
+    def __contains__(self, node):
+        return isinstance(node, Node) and node.table is self
+
+    @property
+    def values(self):
+        """
+        Returns:
+            A list of the Node view of every row
+        """
+        return self[:]
+
+    @property
+    def xs(self):
+        return self.x_column[:self.size]
+
+    @property
+    def ys(self):
+        return self.y_column[:self.size]
+
+    @property
+    def ids(self):
+        return self.id_column[:self.size]
+
+    def coordinates(self):
+        """
+        Returns:
+            An n x 2 float array of the coordinates of every node, read without making any views
+        """
+        return np.column_stack((self.xs, self.ys)).astype(float)
+
+    def index(self, node):
+        if node not in self:
+            raise ValueError('{} is not in the table'.format(node))
+        return node.row
+
+    def changed_since(self, generation):
+        """
+        Gets the rows that were added or changed after a generation of the table. Rows of removed nodes are not
+        included. Together with ids this lets a consumer catch up with the table without observing it
+
+        Args:
+            generation: A value of self.generation read earlier
+
+        Returns:
+            An array of rows
+        """
+        return np.flatnonzero(self.modified[:self.size] > generation)
+
+    def get_value(self, row, index):
+        if index == 0:
+            return self.x_column.item(row)
+        if index == 1:
+            return self.y_column.item(row)
+        return self.names[row]
+
+    def set_value(self, row, index, value):
+        if index == 0:
+            self.x_column[row] = value
+        elif index == 1:
+            self.y_column[row] = value
+        else:
+            self.names[row] = value
+        self._touch(row)
+        self.notify_observers(ChangeType.VALUE_CHANGE, row, FIELDS[index], value)
+
+    def _touch(self, rows):
+        self.generation += 1
+        self.modified[rows] = self.generation
+
+    def _reserve(self, count):
+        """
+        Makes sure there is room for count more rows, at least doubling the capacity when it grows
+        """
+        needed = self.size + count
+        if needed <= len(self.x_column):
+            return
+        capacity = max(2 * len(self.x_column), needed)
+        for key in ('x_column', 'y_column', 'id_column', 'modified'):
+            column = getattr(self, key)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, key, grown)
+
+    def _check(self, node):
+        if not isinstance(node, Node):
+            raise ValueError('{} is not of type {}'.format(node, Node))
+        if node.table is not None:
+            raise ValueError('{} is already in a table'.format(node))
+
+    def append(self, node):
+        """
+        Adds a node to the end of the table, which makes it a view of its row, and notifies all observers
+
+        Args:
+            node: The Node to add
+        """
+        self._check(node)
+        self._reserve(1)
+        row = self.size
+        self.x_column[row], self.y_column[row], name = node.detached
+        self.id_column[row] = self.next_id
+        self.next_id += 1
+        self.names.append(name)
+        self.views.append(node)
+        self.size += 1
+        node.bind(self, row)
+        self._touch(row)
+        self.notify_observers(ChangeType.ADD, node)
+
+    def extend(self, nodes):
+        """
+        Adds many nodes to the end of the table and notifies all observers once with the range of their rows
+
+        Args:
+            nodes: The Nodes to add
+        """
+        nodes = list(nodes)
+        for node in nodes:
+            self._check(node)
+        if len(set(map(id, nodes))) != len(nodes):
+            raise ValueError('A node cannot be added twice')
+        start = self.size
+        self._append_columns([node.detached[0] for node in nodes], [node.detached[1] for node in nodes],
+                             [node.detached[2] for node in nodes])
+        for row, node in enumerate(nodes, start):
+            node.bind(self, row)
+            self.views[row] = node
+        if nodes:
+            self.notify_observers(ChangeType.EXTEND, range(start, self.size))
+
+    def extend_columns(self, xs, ys, names):
+        """
+        Adds many nodes from arrays of their values without making a Node for any of them. Notifies all observers once
+        with the range of new rows
+
+        Args:
+            xs: The x coordinates
+            ys: The y coordinates
+            names: The names
+        """
+        start = self._append_columns(xs, ys, names)
+        if self.size > start:
+            self.notify_observers(ChangeType.EXTEND, range(start, self.size))
+
+    def _append_columns(self, xs, ys, names):
+        """
+        Appends rows without notifying
+
+        Returns:
+            The first new row
+        """
+        xs, ys, names = np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64), list(names)
+        if not len(xs) == len(ys) == len(names):
+            raise ValueError('Columns have different lengths')
+        if len(xs) and (min(xs.min(), ys.min()) < 0 or max(xs.max(), ys.max()) > np.iinfo(np.uint16).max):
+            raise ValueError('Coordinates must fit in a u16')
+        start = self.size
+        self._reserve(len(names))
+        self.x_column[start:start + len(names)] = xs
+        self.y_column[start:start + len(names)] = ys
+        self.id_column[start:start + len(names)] = np.arange(self.next_id, self.next_id + len(names))
+        self.next_id += len(names)
+        self.names.extend(names)
+        self.views.extend([None] * len(names))
+        self.size += len(names)
+        self._touch(slice(start, self.size))
+        return start
+
+    def remove(self, node):
+        """
+        Removes a node from the table and notifies all observers. The node keeps its values but is no longer a view
+
+        Args:
+            node: The Node to remove
+        """
+        self._delete([self.index(node)])
+        self.notify_observers(ChangeType.REMOVE, node)
+
+    def remove_many(self, nodes):
+        """
+        Removes many nodes from the table at once and notifies all observers once with the list of them
+
+        Args:
+            nodes: The Nodes to remove
+        """
+        nodes = list(dict.fromkeys(nodes))
+        self._delete([self.index(node) for node in nodes])
+        if nodes:
+            self.notify_observers(ChangeType.REMOVE_MANY, nodes)
+
+    def clear(self):
+        """
+        Removes every node and notifies all observers once with the views that were made. Rows that never had a view
+        were never handed to an observer as a node
+        """
+        if not self.size:
+            return
+        nodes = [view for view in self.views if view is not None]
+        self._delete(range(self.size))
+        self.notify_observers(ChangeType.REMOVE_MANY, nodes)
+
+    def _delete(self, rows):
+        """
+        Removes rows without notifying. Their views are unbound and the views after them are moved up. Every column is
+        shifted to keep the rows in order, so removing even a single node takes O(n) time. That is cheap next to the
+        O(n) of repairing the tour, and swapping the last row in would reorder the nodes the journal and saved files
+        refer to by row
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if not len(rows):
+            return
+        for row in rows.tolist():
+            if self.views[row] is not None:
+                self.views[row].unbind()
+        keep = np.ones(self.size, dtype=bool)
+        keep[rows] = False
+        remaining = int(keep.sum())
+        for key in ('x_column', 'y_column', 'id_column', 'modified'):
+            column = getattr(self, key)
+            column[:remaining] = column[:self.size][keep]
+        keep = keep.tolist()
+        self.names = [name for name, kept in zip(self.names, keep) if kept]
+        self.views = [view for view, kept in zip(self.views, keep) if kept]
+        self.size = remaining
+        for row in range(int(rows[0]), self.size):
+            if self.views[row] is not None:
+                self.views[row].row = row
+        self.generation += 1
+
+    def read(self, reader):
+        """
+        Loads nodes saved one record per node, as by version 1 configurations
+        """
+        self.clear()
+        size, = reader.unpack(SIZE)
+        xs, ys, names = [], [], []
+        for _ in range(size):
+            xs.append(reader.unpack(COORDINATE)[0])
+            ys.append(reader.unpack(COORDINATE)[0])
+            length, = reader.unpack(LENGTH)
+            names.append(str(reader.read(length), 'ascii'))
+        self.extend_columns(xs, ys, names)
+
+    def write(self, stream):
+        stream.write(SIZE.pack(self.size))
+        for x, y, name in zip(self.xs.tolist(), self.ys.tolist(), self.names):
+            encoded = name.encode('ascii')
+            stream.write(COORDINATE.pack(x) + COORDINATE.pack(y) + LENGTH.pack(len(encoded)) + encoded)
+
+    def read_columns(self, reader):
+        """
+        Loads nodes saved by write_columns
+        """
+        self.clear()
+        size, = reader.unpack(SIZE)
+        xs = np.frombuffer(reader.read(2 * size), dtype='<u2')
+        ys = np.frombuffer(reader.read(2 * size), dtype='<u2')
+        offsets = np.frombuffer(reader.read(4 * (size + 1)), dtype='<u4').tolist()
+        blob = str(reader.read(offsets[-1]), 'ascii')
+        self.extend_columns(xs, ys, [blob[start:stop] for start, stop in zip(offsets, offsets[1:])])
+
+    def write_columns(self, stream):
+        """
+        Writes the nodes as columns instead of one record per node: the number of nodes, the x coordinates and the y
+        coordinates as packed u16 arrays, then size + 1 offsets followed by all of the names joined together
+        """
+        stream.write(SIZE.pack(self.size))
+        stream.write(self.xs.astype('<u2'))
+        stream.write(self.ys.astype('<u2'))
+        encoded = [name.encode('ascii') for name in self.names]
+        offsets = np.zeros(self.size + 1, dtype='<u4')
+        offsets[1:] = np.cumsum([len(name) for name in encoded])
+        stream.write(offsets)
+        stream.write(b''.join(encoded))
+
+    def __str__(self):
+        return str(self.values)
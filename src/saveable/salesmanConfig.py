@@ -1,12 +1,54 @@
+import struct
+
 from src.saveable.composite import Composite
 from src.saveable.saveableImage import SaveableImage
-from src.saveable.saveableArray import array
-from src.saveable.node import Node
+from src.saveable.saveableArray import int_array
+from src.saveable.saveableInt import saveable_int
+from src.saveable.nodeTable import NodeTable
+
+HEADER = struct.Struct('<6sH')  # Magic bytes and format version
+MAGIC = b'TSCFG\x00'
+VERSION = 2
 
 
 class SalesmanConfig(Composite):
     """
-    Represents the configuration of the salesman. Consists of a single background image and a list of nodes
+    Represents the configuration of the salesman. Consists of a single background image, a list of nodes, the best
+    tour found so far as indices into the list of nodes and the pixel shift. The coordinates of the nodes are in units
+    of 1 / 2**pixel_shift pixels of the background, so imported instances can be finer than the background
+
+    Version 2 files start with MAGIC and the version and store the nodes as columns, see NodeTable.write_columns.
+    Version 1 files have no header and store each node as a record. Both can be loaded but only version 2 is saved
     """
     background = SaveableImage
-    nodes = array(Node)
+    nodes = NodeTable
+    tour = int_array('u32')
+    pixel_shift = saveable_int('u8')
+
+    __optional__ = ('tour', 'pixel_shift')
+
+    def read(self, reader):
+        if bytes(reader.view[reader.position:reader.position + len(MAGIC)]) != MAGIC:
+            Composite.read(self, reader)
+            return
+        _, version = reader.unpack(HEADER)
+        if version != VERSION:
+            raise ValueError('Unsupported configuration version {}'.format(version))
+        self.saveable('background').read(reader)
+        self.notify_observers('background')
+        self.saveable('nodes').read_columns(reader)
+        self.notify_observers('nodes')
+        self.saveable('tour').read(reader)
+        self.notify_observers('tour')
+        if len(reader):
+            self.saveable('pixel_shift').read(reader)
+        else:
+            self.saveable('pixel_shift').set(0)
+        self.notify_observers('pixel_shift')
+
+    def write(self, stream):
+        stream.write(HEADER.pack(MAGIC, VERSION))
+        self.saveable('background').write(stream)
+        self.saveable('nodes').write_columns(stream)
+        self.saveable('tour').write(stream)
+        self.saveable('pixel_shift').write(stream)
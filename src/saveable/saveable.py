@@ -1,10 +1,64 @@
 from abc import abstractmethod, ABCMeta
+import io
+import mmap
+
+
+class ByteReader:
+    """
+    A read cursor over a memoryview of saved data. Reading moves the cursor forward instead of removing data from the
+    front of a buffer, so decoding is linear in the size of the data and slices are views that are not copied
+
+    Attributes:
+        view: The memoryview being read
+        position: The index of the next byte to read
+    """
+    def __init__(self, data):
+        self.view = memoryview(data).cast('B')
+        self.position = 0
+
+    def __len__(self):
+        """
+        Returns:
+            The number of bytes left to read
+        """
+        return len(self.view) - self.position
+
+    def read(self, size):
+        """
+        Reads a number of bytes
+
+        Args:
+            size: The number of bytes to read
+
+        Returns:
+            A memoryview of the bytes
+        """
+        if size > len(self):
+            raise ValueError('Cannot read {} bytes, only {} are left'.format(size, len(self)))
+        self.position += size
+        return self.view[self.position - size:self.position]
+
+    def unpack(self, codec):
+        """
+        Reads the values of a struct.Struct
+
+        Args:
+            codec: The struct.Struct to unpack
+
+        Returns:
+            The tuple of unpacked values
+        """
+        values = codec.unpack_from(self.view, self.position)
+        self.position += codec.size
+        return values
 
 
 class SaveableType(metaclass=ABCMeta):
     """
-    Type used to specify a type of object that can be converted to a bytearray and pops the data off the bytearray
+    Type used to specify a type of object that can be converted to a bytearray and loaded back from one. Subclasses
+    implement read, which decodes from a ByteReader, and write, which writes to a binary file-like object
     """
+    __slots__ = ()
 
     @classmethod
     def from_byte_array(cls, byte_array):
@@ -12,7 +66,7 @@ class SaveableType(metaclass=ABCMeta):
         Makes a new Component object from a bytearray
 
         Args:
-            byte_array:   The bytearray representing the object
+            byte_array:   The bytearray representing the object, or a ByteReader positioned at it
 
         Returns:
             A Component object
@@ -21,7 +75,6 @@ class SaveableType(metaclass=ABCMeta):
         obj.load_in_place(byte_array)
         return obj
 
-    @abstractmethod
     def to_byte_array(self):
         """
         Return a bytearray representation of the Component
@@ -29,15 +82,73 @@ class SaveableType(metaclass=ABCMeta):
         Returns:
             The bytearray
         """
-        return bytearray()
+        stream = io.BytesIO()
+        self.write(stream)
+        return bytearray(stream.getbuffer())
+
+    def save_to(self, stream):
+        """
+        Writes the object to a binary file-like object piece by piece, without building the whole representation in
+        memory first
+
+        Args:
+            stream: The binary stream to write to, such as a file opened with 'wb'
+        """
+        self.write(stream)
+
+    def load_from(self, stream):
+        """
+        Loads the object from a binary file-like object. Real files are memory mapped so their data is read straight
+        from the OS page cache instead of being copied into a buffer first
+
+        Args:
+            stream: The binary stream to read from, such as a file opened with 'rb'
+        """
+        try:
+            data = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            data = stream.read()
+        reader = ByteReader(data)
+        try:
+            self.read(reader)
+        finally:
+            reader.view.release()
+            if isinstance(data, mmap.mmap):
+                data.close()
 
-    @abstractmethod
     def load_in_place(self, byte_array):
         """
-        Given a byte array, loads all values of the saveable object and pops the data off the bytearray
+        Given a byte array, loads all values of the saveable object. If byte_array is a bytearray the loaded data is
+        removed from its front once loading is done. Anything else that supports the buffer protocol is left unchanged
 
         Args:
-            byte_array: The bytearray to load
+            byte_array: The bytearray to load, or a ByteReader positioned at the data
+        """
+        if isinstance(byte_array, ByteReader):
+            self.read(byte_array)
+            return
+        reader = ByteReader(byte_array)
+        self.read(reader)
+        reader.view.release()
+        if isinstance(byte_array, bytearray):
+            del byte_array[:reader.position]
+
+    @abstractmethod
+    def write(self, stream):
+        """
+        Writes the bytearray representation of the Component
+
+        Args:
+            stream: The binary file-like object to write to
         """
         pass
 
+    @abstractmethod
+    def read(self, reader):
+        """
+        Loads all values of the saveable object from a ByteReader and moves it past them
+
+        Args:
+            reader: The ByteReader to load from
+        """
+        pass
@@ -1,12 +1,19 @@
+import functools
+import struct
+
 from src.constants import ChangeType
 from src.observable import Observable
 from src.saveable.saveable import SaveableType
-from src.saveable.saveableInt import saveable_int
+from src.saveable.saveableInt import INT_CODES, INT_CODECS
+
+SIZE = INT_CODECS['u32']
 
 
+@functools.lru_cache(maxsize=None)
 def array(array_type):
     """
-    A saveable array type that can hold any number of a single type. Type is observable on adds and removes
+    A saveable array type that can hold any number of a single type. Type is observable on adds and removes. The class
+    for each type is only made once
 
     Args:
         array_type: The Saveable object type to store in the array
@@ -39,6 +46,20 @@ def array(array_type):
                 self.values.append(val)
                 self.notify_observers(ChangeType.ADD, val)
 
+        def extend(self, values):
+            """
+            Adds many values to the array and notifies all observers once with the list of them
+
+            Args:
+                values: The array_type values to add
+            """
+            values = list(values)
+            for val in values:
+                if not isinstance(val, array_type):
+                    raise ValueError('{} is not of type {}'.format(val, array_type))
+            self.values.extend(values)
+            self.notify_observers(ChangeType.EXTEND, values)
+
         def remove(self, val):
             """
             Removes a value from the internal list and notifies all observers
@@ -51,27 +72,64 @@ def array(array_type):
 
         def clear(self):
             """
-            Removes all values from the internal list and notifies all observers
-            :return:
+            Removes all values from the internal list and notifies all observers in one batch
             """
-            for value in self.values:
-                self.notify_observers(ChangeType.REMOVE, value)
+            with self.batch():
+                for value in self.values:
+                    self.notify_observers(ChangeType.REMOVE, value)
             self.values.clear()
 
-        def load_in_place(self, byte_array):
+        def read(self, reader):
             self.clear()
-            size = saveable_int('u32').from_byte_array(byte_array)
-            for _ in range(size.value):
-                obj = array_type.from_byte_array(byte_array)
-                self.notify_observers(ChangeType.ADD, obj)
-                self.values.append(obj)
-
-        def to_byte_array(self):
-            size = saveable_int('u32')()
-            size.set(len(self.values))
-            _array = size.to_byte_array()
+            size, = reader.unpack(SIZE)
+            values = []
+            for _ in range(size):
+                obj = array_type()
+                obj.read(reader)
+                values.append(obj)
+            self.extend(values)
+
+        def write(self, stream):
+            stream.write(SIZE.pack(len(self.values)))
             for val in self.values:
-                _array += val.to_byte_array()
-            return _array
+                val.write(stream)
 
     return SaveableArray
+
+
+@functools.lru_cache(maxsize=None)
+def int_array(int_type):
+    """
+    A saveable list of integers of a single c-type. Unlike array it is got and set as a plain list of ints. Saved the
+    same way as array(saveable_int(int_type)) but the whole list is packed and unpacked by a single struct call
+
+    Args:
+        int_type: The type of integer. Can be u8, s8, u16, s16, u32, s32
+
+    Returns:
+        A Saveable int array type
+    """
+    code = INT_CODES[int_type]
+
+    class SaveableIntArray(SaveableType):
+        def __init__(self, values=()):
+            self.values = list(values)
+
+        def get(self):
+            return self.values
+
+        def set(self, values):
+            self.values = list(values)
+
+        def read(self, reader):
+            size, = reader.unpack(SIZE)
+            self.values = list(reader.unpack(struct.Struct('<{}{}'.format(size, code))))
+
+        def write(self, stream):
+            stream.write(SIZE.pack(len(self.values)))
+            stream.write(struct.pack('<{}{}'.format(len(self.values), code), *self.values))
+
+        def __str__(self):
+            return str(self.values)
+
+    return SaveableIntArray
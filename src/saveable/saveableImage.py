@@ -1,37 +1,52 @@
 import io
-from PIL import Image
 
 from src.saveable.saveable import SaveableType
-from src.saveable.saveableInt import saveable_int
+from src.saveable.saveableInt import INT_CODECS
+
+SIZE = INT_CODECS['u32']
 
 
 class SaveableImage(SaveableType):
     """
-    A Saveable image type that can hold PIL images
+    A Saveable image type that can hold PIL images. Loading only keeps the compressed bytes of the image, which are
+    decoded the first time the image is got. Saving writes those bytes back as they are, so an image is only encoded
+    after a new one is set. Changes made to the got image in place are not saved unless it is set again. PIL is only
+    imported once an image is set or decoded
+
+    Attributes:
+        image: The decoded PIL image, None until it is needed
+        data: The compressed bytes of the image, None until it is loaded or saved
     """
     def __init__(self, image=None):
         self.image = image
+        self.data = None
 
     def set(self, value):
+        from PIL import Image
         if not isinstance(value, Image.Image):
             raise ValueError('{} is not an image type'.format(value))
         self.image = value
+        self.data = None
 
     def get(self):
+        if self.image is None and self.data is not None:
+            from PIL import Image
+            stream = io.BytesIO(self.data)
+            self.image = Image.open(stream)
+            self.image.load()
+            stream.close()
         return self.image
 
-    def load_in_place(self, byte_array):
-        size = saveable_int('u32').from_byte_array(byte_array)
-        stream = io.BytesIO(byte_array)
-        self.image = Image.open(stream)
-        self.image.load()
-        stream.close()
-        del byte_array[:size.value]
-
-    def to_byte_array(self):
-        _bytes = io.BytesIO()
-        self.image.save(_bytes, format=self.image.format)
-        size = saveable_int('u32')()
-        size.set(len(_bytes.getvalue()))
-        return size.to_byte_array() + bytearray(_bytes.getvalue())
+    def read(self, reader):
+        size, = reader.unpack(SIZE)
+        self.data = bytes(reader.read(size))
+        self.image = None
+
+    def write(self, stream):
+        if self.data is None:
+            _bytes = io.BytesIO()
+            self.image.save(_bytes, format=self.image.format or 'PNG')
+            self.data = _bytes.getvalue()
+        stream.write(SIZE.pack(len(self.data)))
+        stream.write(self.data)
 
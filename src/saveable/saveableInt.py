@@ -1,10 +1,17 @@
-from src.saveable.saveable import SaveableType
+import functools
 import struct
 
+from src.saveable.saveable import SaveableType
+
+INT_CODES = {'u8': 'B', 's8': 'b', 'u16': 'H', 's16': 'h', 'u32': 'I', 's32': 'i'}
+INT_CODECS = {int_type: struct.Struct('<' + code) for int_type, code in INT_CODES.items()}
 
+
+@functools.lru_cache(maxsize=None)
 def saveable_int(int_type):
     """
-    Returns a class type for a saveable object of an integer of a specific c-type
+    Returns a class type for a saveable object of an integer of a specific c-type. The class for each c-type is only
+    made once
 
     Args:
         int_type: The type of integer. Can be u8, s8, u16, s16, u32, s32
@@ -12,17 +19,14 @@ def saveable_int(int_type):
     Returns:
         A Saveable class type
     """
-    str_to_type = {'u8': (8, False), 's8': (8, True),
-                   'u16': (16, False), 's16': (16, True),
-                   'u32': (32, False), 's32': (32, True)}
-    if int_type not in str_to_type.keys():
+    if int_type not in INT_CODECS:
         raise ValueError('Not a valid string type: ' + str(int_type))
+    codec = INT_CODECS[int_type]
 
     class SaveableInt(SaveableType):
         """
         A saveable int type that can be saved as a c-type specified in struct
         """
-
         def __init__(self, value=0):
             self.value = value
 
@@ -32,69 +36,16 @@ def saveable_int(int_type):
         def set(self, value):
             self.value = value
 
-        def load_in_place(self, byte_array):
-            self.value = unpack_integer(byte_array, *str_to_type[int_type])
+        def read(self, reader):
+            self.value = reader.unpack(codec)[0]
 
-        def to_byte_array(self):
-            array = bytearray()
-            pack_integer(array, self.value, *str_to_type[int_type])
-            return array
+        def write(self, stream):
+            stream.write(codec.pack(self.value))
 
         def __str__(self):
             return str(self.value)
 
+    SaveableInt.codec = codec
+    SaveableInt.int_type = int_type
     return SaveableInt
 
-
-def unpack_integer(data, size, signed):
-    """
-    Purpose: Returns a int of size 'size' from front of packed data. Will strip
-             off the int from the data
-    Inputs:
-        data:   (bytearray) Packed binary data with a u32 type in front
-        size:   (int)    Integer size in bits
-        signed: (bool)   True if signed, False if unsigned
-    Output:
-        (int)   The integer
-        (bytes) New data with integer stripped off
-    """
-    if size == 32:
-        fmt = 'I'
-    elif size == 16:
-        fmt = 'H'
-    elif size == 8:
-        fmt = 'B'
-    else:
-        raise ValueError('Size Invalid')
-    if signed:
-        fmt = fmt.lower()
-    b_int = data[:(size//8)]
-    for x in range(size//8):
-        data.pop(0)
-    _int = struct.unpack('<'+fmt, b_int)[0]
-    return _int
-
-
-def pack_integer(data, _int, size, signed):
-    """
-    Purpose: Packs an integer as binary data
-    Inputs:
-        data:   (bytearray) Bytearray that may or may not already have data
-                            packed
-        _int:   (int)       The integer to be packed
-        size:   (int)       Integer size in bits
-        signed: (bool)      True if signed, False if unsigned
-    """
-    if size == 32:
-        fmt = 'I'
-    elif size == 16:
-        fmt = 'H'
-    elif size == 8:
-        fmt = 'B'
-    else:
-        raise ValueError('Size Invalid')
-    if signed:
-        fmt = fmt.lower()
-    p_int = bytearray(struct.pack('<'+fmt, _int))
-    for byte in p_int:
-        data.append(byte)
\ No newline at end of file
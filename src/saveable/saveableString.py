@@ -1,6 +1,7 @@
-import struct
 from src.saveable.saveable import SaveableType
-from src.saveable.saveableInt import saveable_int
+from src.saveable.saveableInt import INT_CODECS
+
+LENGTH = INT_CODECS['u32']
 
 
 class SaveableString(SaveableType):
@@ -13,22 +14,14 @@ class SaveableString(SaveableType):
     def get(self):
         return self.value
 
-    def load_in_place(self, byte_array):
-        self.value = ''
-        length = saveable_int('u32').from_byte_array(byte_array)
-        for _ in range(length.value):
-            char = struct.unpack('c', bytes((byte_array[0],)))
-            self.value += char[0].decode('ascii')
-            byte_array.pop(0)
-
-    def to_byte_array(self):
-        length = saveable_int('u32')()
-        length.set(len(self.value))
-        array = length.to_byte_array()
-        for char in list(self.value):
-            p_char = int.from_bytes(struct.pack('c', char.encode('ascii')), byteorder='big')
-            array.append(p_char)
-        return array
+    def read(self, reader):
+        length, = reader.unpack(LENGTH)
+        self.value = str(reader.read(length), 'ascii')
+
+    def write(self, stream):
+        encoded = self.value.encode('ascii')
+        stream.write(LENGTH.pack(len(encoded)))
+        stream.write(encoded)
 
     def __str__(self):
         return self.value
\ No newline at end of file
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src.algorithms.tours import coordinate_tour_length, pairwise_distances, tour_length
+
+
+@pytest.fixture
+def make_coordinates():
+    """
+    Makes num_cities random cities in a 1000 x 1000 square
+    """
+    def make(num_cities, seed=0):
+        return np.random.default_rng(seed).random((num_cities, 2)) * 1000
+    return make
+
+
+@pytest.fixture
+def make_distances(make_coordinates):
+    """
+    Makes the distance matrix of num_cities random cities
+    """
+    def make(num_cities, seed=0):
+        coordinates = make_coordinates(num_cities, seed)
+        return pairwise_distances(coordinates, coordinates)
+    return make
+
+
+@pytest.fixture
+def check_tour():
+    """
+    Checks that a tour visits each of num_cities cities once and, if a length is given, that it is the length of the
+    tour under distances or coordinates
+    """
+    def check(tour, num_cities, length=None, *, distances=None, coordinates=None):
+        tour = np.asarray(tour)
+        assert sorted(tour.tolist()) == list(range(num_cities))
+        if length is not None:
+            if coordinates is None:
+                assert np.isclose(length, tour_length(distances, tour))
+            else:
+                assert np.isclose(length, coordinate_tour_length(coordinates, tour))
+    return check
+
+
+def pytest_addoption(parser):
+    parser.addoption('--benchmark', action='store_true', help='Also run the tests that assert on wall-clock time')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'benchmark: asserts on wall-clock time, so only run with --benchmark')
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Skips the benchmarks unless --benchmark is given, since their timings are not reliable on loaded machines
+    """
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='needs --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from src.algorithms.antColony import ant_colony
+
+
+def test_returns_permutation(make_distances, check_tour):
+    best_tour, best_lengths = ant_colony(make_distances(80), 20, seed=1)
+    check_tour(best_tour, 80)
+    assert len(best_lengths) == 20
+
+
+def test_best_length_matches_tour_and_never_increases(make_distances, check_tour):
+    distances = make_distances(80)
+    best_tour, best_lengths = ant_colony(distances, 20, seed=1)
+    check_tour(best_tour, 80, best_lengths[-1], distances=distances)
+    assert np.all(np.diff(best_lengths) <= 1e-9)
+
+
+@pytest.mark.parametrize('num_cities', [0, 1, 2])
+def test_fewer_than_three_cities_give_trivial_tour(num_cities, make_distances):
+    best_tour, best_lengths = ant_colony(make_distances(num_cities), 5)
+    assert best_tour.tolist() == list(range(num_cities))
+    assert len(best_lengths) == 1
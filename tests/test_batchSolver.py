@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from PIL import Image
+
+from src.batchSolver import load_coordinates, main, parse_args, solve
+from src.saveable.node import Node
+from src.saveable.salesmanConfig import SalesmanConfig
+
+
+def _points(tmp_path, make_coordinates, num_cities=30):
+    path = str(tmp_path / 'points.txt')
+    with open(path, 'w') as file:
+        file.write('x y\n')
+        file.writelines('{} {}\n'.format(x, y) for x, y in make_coordinates(num_cities).round(2).tolist())
+    return path
+
+
+def test_load_coordinates_skips_headers(tmp_path):
+    path = str(tmp_path / 'points.csv')
+    with open(path, 'w') as file:
+        file.write('name,x,y\na,1,2\nb,3.5,4\n')
+    assert load_coordinates(path).tolist() == [[1, 2], [3.5, 4]]
+
+
+def test_load_coordinates_of_a_config(tmp_path):
+    config = SalesmanConfig()
+    config.background = Image.new('RGB', (10, 10), 'white')
+    config.nodes.extend([Node(1, 2, 'a'), Node(3, 4, 'b')])
+    path = str(tmp_path / 'config.tscfg')
+    with open(path, 'wb') as file:
+        config.save_to(file)
+    assert load_coordinates(path).tolist() == [[1, 2], [3, 4]]
+
+
+@pytest.mark.parametrize('solver', ['anneal', 'genetic', 'ant', 'tabu', 'multilevel'])
+def test_solve_returns_a_tour_and_its_length(tmp_path, make_coordinates, check_tour, solver):
+    path = _points(tmp_path, make_coordinates)
+    options = parse_args([path, '--solver', solver, '--steps', '200', '--time', '.2', '--seed', '1'])
+    result = solve(path, options)
+    assert result['cities'] == 30
+    check_tour(result['tour'], 30, result['length'], coordinates=load_coordinates(path))
+
+
+def test_main_writes_tours_and_metrics(tmp_path, make_coordinates, capsys):
+    path = _points(tmp_path, make_coordinates)
+    output = tmp_path / 'results'
+    assert main([path, '--steps', '500', '--seed', '1', '--output', str(output), '--json']) == 0
+    metrics = json.loads(capsys.readouterr().out)
+    assert metrics['file'] == path and 'tour' not in metrics
+    with open(output / 'points.txt.tour') as file:
+        assert sorted(int(line) for line in file) == list(range(30))
+    with open(output / 'points.txt.json') as file:
+        assert json.load(file) == metrics
+
+
+def test_main_reports_failed_jobs(tmp_path, capsys):
+    assert main([str(tmp_path / 'missing.txt')]) == 1
+    assert 'missing.txt' in capsys.readouterr().err
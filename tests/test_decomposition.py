@@ -0,0 +1,38 @@
+import time
+
+import pytest
+
+from src.algorithms.decomposition import decomposition_solve, grid_partition, kmeans_partition
+
+
+def test_kmeans_partition_labels_every_city(make_coordinates):
+    labels = kmeans_partition(make_coordinates(300), 4, seed=1)
+    assert labels.shape == (300,)
+    assert set(labels.tolist()) <= set(range(4))
+
+
+def test_returns_permutation(make_coordinates, check_tour):
+    tour = decomposition_solve(make_coordinates(400), num_cells=4, cell_time=.1, polish_time=.1, max_workers=2,
+                               seed=1)
+    check_tour(tour, 400)
+
+
+def test_grid_cells_return_permutation(make_coordinates, check_tour):
+    coordinates = make_coordinates(300)
+    labels = grid_partition(coordinates, 250)
+    assert labels.shape == (300,)
+    tour = decomposition_solve(coordinates, scale=250, cell_time=.1, polish_time=.1, max_workers=2)
+    check_tour(tour, 300)
+
+
+def test_time_budget_returns_permutation(make_coordinates, check_tour):
+    tour = decomposition_solve(make_coordinates(500), time_budget=.3, max_workers=2, seed=1)
+    check_tour(tour, 500)
+
+
+@pytest.mark.benchmark
+def test_time_budget_covers_cells_and_polish(make_coordinates, check_tour):
+    start = time.perf_counter()
+    tour = decomposition_solve(make_coordinates(2000), time_budget=1, max_workers=2, seed=1)
+    assert time.perf_counter() - start < 2.5
+    check_tour(tour, 2000)
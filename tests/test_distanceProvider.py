@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from src.algorithms.tours import pairwise_distances
+from src.runtime_models.distanceProvider import OnDemandDistances, dense_fits, distance_provider
+from src.runtime_models.distanceStore import DistanceStore, largest_dense
+from src.saveable.nodeTable import NodeTable
+
+
+def _table(coordinates):
+    table = NodeTable()
+    table.extend_columns(coordinates[:, 0], coordinates[:, 1], [''] * len(coordinates))
+    return table
+
+
+def _dense(table):
+    coordinates = table.coordinates()
+    return pairwise_distances(coordinates, coordinates)
+
+
+def test_on_demand_indexing_forms_match_the_dense_matrix(make_coordinates):
+    coordinates = make_coordinates(15)
+    dense = pairwise_distances(coordinates, coordinates)
+    distances = OnDemandDistances(coordinates)
+    rows, columns = np.array([0, 4, 14]), np.array([9, 4, 1])
+    assert distances.shape == (15, 15) and len(distances) == 15
+    assert distances[3, 8] == pytest.approx(dense[3, 8], abs=1e-3)
+    assert np.allclose(distances[rows, columns], dense[rows, columns], atol=1e-3)
+    assert np.allclose(distances[np.int64(6)], dense[6], atol=1e-3)
+    assert np.allclose(distances[[2, 7]], dense[[2, 7]], atol=1e-3)
+    assert np.allclose(distances[5:9], dense[5:9], atol=1e-3)
+
+
+def test_on_demand_rows_are_kept_in_an_lru_cache(make_coordinates):
+    distances = OnDemandDistances(make_coordinates(10), cache_rows=2)
+    first = distances[0]
+    distances[1]
+    assert distances[0] is first
+    distances[2]
+    assert list(distances.rows) == [0, 2]
+
+
+def test_provider_is_dense_only_within_the_budget(make_coordinates):
+    coordinates = make_coordinates(20)
+    assert dense_fits(20, 20 * 20 * 8) and not dense_fits(21, 20 * 20 * 8)
+    assert isinstance(distance_provider(coordinates, 20 * 20 * 8), np.ndarray)
+    assert isinstance(distance_provider(coordinates, 20 * 20 * 8 - 1), OnDemandDistances)
+
+
+def test_store_follows_adds_moves_and_removes(make_coordinates):
+    table = _table(make_coordinates(30).astype(int))
+    store = DistanceStore(table)
+    table.extend_columns([5, 6], [7, 8], ['', ''])
+    table[3].x = 999
+    table.remove(table[0])
+    table.remove_many([table[10], table[20]])
+    assert np.allclose(store.distance_matrix(), _dense(table))
+    node1, node2 = table[4], table[17]
+    assert store[frozenset((node1, node2))] == pytest.approx(_dense(table)[4, 17])
+    assert store[frozenset((node1,))] == 0
+
+
+def test_store_grows_no_further_than_the_budget(make_coordinates):
+    budget = 8 * 40 * 40
+    table = _table(make_coordinates(25).astype(int))
+    store = DistanceStore(table, budget)
+    table.extend_columns(*make_coordinates(12, seed=1).astype(int).T, [''] * 12)
+    store.sync()
+    assert store.matrix is not None and len(store.matrix) == largest_dense(budget) == 40
+    assert np.allclose(store.distance_matrix(), _dense(table))
+
+
+def test_store_falls_back_to_on_demand_distances_and_rebuilds(make_coordinates):
+    budget = 8 * 40 * 40
+    table = _table(make_coordinates(35).astype(int))
+    store = DistanceStore(table, budget)
+    table.extend_columns(*make_coordinates(10, seed=1).astype(int).T, [''] * 10)
+    distances = store.distance_matrix()
+    assert store.matrix is None and isinstance(distances, OnDemandDistances)
+    assert np.allclose(distances[0:45], _dense(table), atol=1e-3)
+    assert len(store.neighbourhood(table[0], 5)) == 5
+
+    table.remove_many(table[:20])
+    distances = store.distance_matrix()
+    assert store.matrix is not None and isinstance(distances, np.ndarray)
+    assert np.allclose(distances, _dense(table))
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.algorithms.tours import pairwise_distances
+from src.runtime_models.distanceSidecar import CondensedDistances, compute_condensed, open_sidecar
+
+
+def _condensed(coordinates):
+    out = np.zeros(len(coordinates) * (len(coordinates) - 1) // 2)
+    compute_condensed(coordinates, out)
+    return CondensedDistances(out, len(coordinates))
+
+
+def test_indexing_forms_match_the_dense_matrix(make_coordinates):
+    coordinates = make_coordinates(12)
+    dense = pairwise_distances(coordinates, coordinates)
+    distances = _condensed(coordinates)
+    rows, columns = np.array([0, 3, 11, 5]), np.array([7, 3, 0, 11])
+    assert distances.shape == (12, 12) and len(distances) == 12
+    assert distances[2, 9] == pytest.approx(dense[2, 9]) and distances[9, 2] == pytest.approx(dense[2, 9])
+    assert distances[4, 4] == 0
+    assert np.allclose(distances[rows, columns], dense[rows, columns])
+    assert np.allclose(distances[rows[:, np.newaxis], columns], dense[rows[:, np.newaxis], columns])
+    assert np.allclose(distances[5], dense[5])
+    assert np.allclose(distances[[1, 6]], dense[[1, 6]])
+    assert np.allclose(distances[3:8], dense[3:8])
+
+
+def test_sidecar_is_reused_while_the_coordinates_match(tmp_path, make_coordinates):
+    path = str(tmp_path / 'config.dist')
+    coordinates = make_coordinates(30)
+    distances = open_sidecar(path, coordinates)
+    assert isinstance(distances.condensed, np.memmap) and distances.condensed.dtype == np.float32
+    assert np.allclose(distances[0:30], pairwise_distances(coordinates, coordinates), atol=1e-3)
+    modified = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(modified - 10**9, modified - 10**9))
+    open_sidecar(path, coordinates)
+    assert os.stat(path).st_mtime_ns == modified - 10**9
+
+
+@pytest.mark.parametrize('num_cities, dtype', [(31, np.float32), (30, np.float64)])
+def test_header_mismatch_rebuilds_the_sidecar(tmp_path, make_coordinates, num_cities, dtype):
+    path = str(tmp_path / 'config.dist')
+    open_sidecar(path, make_coordinates(30))
+    coordinates = make_coordinates(num_cities)
+    distances = open_sidecar(path, coordinates, dtype)
+    assert distances.condensed.dtype == dtype and len(distances) == num_cities
+    assert np.allclose(distances[0:num_cities], pairwise_distances(coordinates, coordinates), atol=1e-3)
+
+
+def test_moved_coordinates_rebuild_the_sidecar(tmp_path, make_coordinates):
+    path = str(tmp_path / 'config.dist')
+    coordinates = make_coordinates(20)
+    open_sidecar(path, coordinates)
+    coordinates[4] = [0, 0]
+    assert open_sidecar(path, coordinates)[4, 0] == pytest.approx(np.hypot(*coordinates[0]))
+
+
+@pytest.mark.parametrize('num_cities', [0, 1])
+def test_tiny_sidecars(tmp_path, make_coordinates, num_cities):
+    distances = open_sidecar(str(tmp_path / 'config.dist'), make_coordinates(num_cities))
+    assert len(distances) == num_cities
@@ -0,0 +1,23 @@
+import numpy as np
+
+from src.algorithms.geneticAlgorithm import genetic_algorithm
+
+
+def test_returns_permutation(make_distances, check_tour):
+    best_tour, best_lengths, mean_lengths = genetic_algorithm(make_distances(60), 30, seed=1)
+    check_tour(best_tour, 60)
+    assert len(best_lengths) == len(mean_lengths) == 30
+
+
+def test_best_length_matches_tour_and_never_increases(make_distances, check_tour):
+    distances = make_distances(60)
+    best_tour, best_lengths, _ = genetic_algorithm(distances, 30, seed=1)
+    check_tour(best_tour, 60, best_lengths[-1], distances=distances)
+    assert np.all(np.diff(best_lengths) <= 1e-9)
+
+
+def test_seed_is_reproducible(make_distances):
+    distances = make_distances(40)
+    first = genetic_algorithm(distances, 10, seed=3)[0]
+    second = genetic_algorithm(distances, 10, seed=3)[0]
+    assert np.array_equal(first, second)
@@ -0,0 +1,55 @@
+import io
+
+import numpy as np
+
+from src.controller import Controller
+from src.instanceImporter import GRID_MAX, fit_to_image, pixel_shift, read_csv, read_tsplib
+
+TSPLIB = """NAME: tiny
+TYPE: TSP
+EDGE_WEIGHT_TYPE: EUC_2D
+NODE_COORD_SECTION
+1 0 0
+2 10.5 0
+3 10.5 20
+EOF
+"""
+
+
+def test_read_tsplib():
+    (names, coordinates), = read_tsplib(io.StringIO(TSPLIB))
+    assert names == ['1', '2', '3']
+    assert coordinates.tolist() == [[0, 0], [10.5, 0], [10.5, 20]]
+
+
+def test_read_csv_skips_headers():
+    (names, coordinates), = read_csv(io.StringIO('name,x,y\na,1,2\nb,3.5,4\n'))
+    assert names == ['a', 'b']
+    assert coordinates.tolist() == [[1, 2], [3.5, 4]]
+
+
+def test_integer_coordinates_that_fit_need_no_shift():
+    coordinates = np.random.default_rng(0).integers(0, 500, (300, 2))
+    assert pixel_shift(coordinates, 2048, 2048) == 0
+
+
+def test_dense_instances_keep_cities_apart():
+    coordinates = np.random.default_rng(0).random((20000, 2)) * 1000
+    shift = pixel_shift(coordinates, 2048, 2048)
+    assert shift > 0 and 2048 << shift <= GRID_MAX + 1
+    grid = fit_to_image(coordinates, 2048, 2048, shift=shift)
+    assert grid.max() <= GRID_MAX
+    assert len(np.unique(grid, axis=0)) > .999 * len(coordinates)
+    assert len(np.unique(fit_to_image(coordinates, 2048, 2048), axis=0)) < len(np.unique(grid, axis=0))
+
+
+def test_controller_import_sets_pixel_shift(tmp_path):
+    path = tmp_path / 'cities.csv'
+    np.savetxt(path, np.random.default_rng(1).random((5000, 2)), fmt='%.6f')
+    controller = Controller()
+    assert controller.import_instance(str(path)) == 5000
+    assert controller.model.pixel_shift > 0
+    width, height = controller.model.background.size
+    xs, ys = controller.model.nodes.xs, controller.model.nodes.ys
+    assert xs.max() < width << controller.model.pixel_shift
+    assert ys.max() < height << controller.model.pixel_shift
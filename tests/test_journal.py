@@ -0,0 +1,128 @@
+import os
+
+from PIL import Image
+
+from src.constants import ChangeType
+from src.saveable.journal import Journal, journal_path, replay
+from src.saveable.node import Node
+from src.saveable.salesmanConfig import SalesmanConfig
+
+
+def _save(tmp_path):
+    config = SalesmanConfig()
+    config.background = Image.new('RGB', (20, 20), 'white')
+    config.nodes.extend([Node(1, 1, 'a'), Node(2, 2, 'b'), Node(3, 3, 'c')])
+    path = str(tmp_path / 'config.tscfg')
+    with open(path, 'wb') as file:
+        config.save_to(file)
+    return config, path
+
+
+def _load(path):
+    config = SalesmanConfig()
+    with open(path, 'rb') as file:
+        config.load_from(file)
+    return config
+
+
+def _nodes(config):
+    return [(node.x, node.y, node.name) for node in config.nodes]
+
+
+def _edit(config):
+    config.nodes.append(Node(9, 9, 'added'))
+    config.nodes[0].x = 100
+    config.nodes[1].name = 'renamed'
+    config.nodes.remove(config.nodes[2])
+
+
+def test_replay_restores_edits(tmp_path):
+    config, path = _save(tmp_path)
+    journal = Journal(config, path)
+    _edit(config)
+    journal.close()
+
+    loaded = _load(path)
+    assert replay(loaded, path) == 4
+    assert _nodes(loaded) == _nodes(config) == [(100, 1, 'a'), (2, 2, 'renamed'), (9, 9, 'added')]
+
+
+def test_torn_record_is_cut_off(tmp_path):
+    config, path = _save(tmp_path)
+    journal = Journal(config, path)
+    config.nodes.append(Node(5, 6, 'kept'))
+    journal.close()
+    with open(journal_path(path), 'ab') as file:
+        file.write(b'\x10\x00\x00\x00\x01\x02')
+    size = os.path.getsize(journal_path(path))
+
+    loaded = _load(path)
+    assert replay(loaded, path) == 1
+    assert _nodes(loaded)[-1] == (5, 6, 'kept')
+    assert os.path.getsize(journal_path(path)) == size - 6
+
+
+def test_journal_of_another_base_file_is_ignored(tmp_path):
+    config, path = _save(tmp_path)
+    journal = Journal(config, path)
+    config.nodes.append(Node(5, 6, 'lost'))
+    journal.close()
+    with open(path, 'ab') as file:
+        file.write(b'\x00')
+
+    assert replay(_load(path), path) == 0
+
+
+def test_replay_batches_notifications(tmp_path):
+    config, path = _save(tmp_path)
+    journal = Journal(config, path)
+    config.nodes.append(Node(7, 7, 'short lived'))
+    config.nodes.remove(config.nodes[3])
+    config.nodes.append(Node(8, 8, 'kept'))
+    journal.close()
+
+    loaded = _load(path)
+    changes = []
+    loaded.nodes.register(lambda change_type, node: changes.append((change_type, node.name)))
+    assert replay(loaded, path) == 3
+    assert changes == [(ChangeType.ADD, 'kept')]
+
+
+def test_compaction_saves_to_base_file(tmp_path):
+    config, path = _save(tmp_path)
+    journal = Journal(config, path, compact_size=64)
+    for ind in range(10):
+        config.nodes.append(Node(ind, ind, 'node {}'.format(ind)))
+    journal.close()
+
+    loaded = _load(path)
+    replay(loaded, path)
+    assert _nodes(loaded) == _nodes(config)
+    assert os.path.getsize(journal_path(path)) <= 64
+
+
+def test_batched_edits_replay_by_row(tmp_path):
+    config, path = _save(tmp_path)
+    journal = Journal(config, path)
+    with config.nodes.batch():
+        config.nodes[2].x = 30
+        config.nodes.remove(config.nodes[0])
+        config.nodes[1].name = 'moved up'
+    journal.close()
+
+    loaded = _load(path)
+    assert replay(loaded, path) == 3
+    assert _nodes(loaded) == _nodes(config) == [(2, 2, 'b'), (30, 3, 'moved up')]
+
+
+def test_bulk_changes_in_a_batch_compact_once(tmp_path):
+    config, path = _save(tmp_path)
+    compactions = []
+    journal = Journal(config, path, before_compact=lambda: compactions.append(len(config.nodes)))
+    with config.nodes.batch():
+        config.nodes.clear()
+        config.nodes.extend_columns([4, 5], [6, 7], ['d', 'e'])
+    journal.close()
+
+    assert compactions == [2]
+    assert _nodes(_load(path)) == [(4, 6, 'd'), (5, 7, 'e')]
@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+
+import pytest
+
+from src.constants import ChangeType
+from src.controller import Controller, tour_edges
+
+
+def _controller(num_nodes, seed=0):
+    rng = random.Random(seed)
+    controller = Controller()
+    for _ in range(num_nodes):
+        controller.create_node(rng.randint(0, 4000), rng.randint(0, 4000))
+    controller.set_live_repair(True)
+    return controller, rng
+
+
+def _assert_valid(controller):
+    assert len(controller.best_tour) == len(controller.model.nodes)
+    assert set(controller.best_tour) == set(controller.model.nodes)
+
+
+def test_edits_keep_a_valid_tour():
+    controller, _ = _controller(50)
+    _assert_valid(controller)
+    added = controller.create_node(10, 10)
+    assert added in controller.best_tour
+    controller.delete_node(controller.model.nodes[3])
+    _assert_valid(controller)
+    added.x, added.y = 3000, 3000
+    controller.repair(added)
+    _assert_valid(controller)
+
+
+def test_observers_are_told_only_about_changed_edges():
+    controller, _ = _controller(40)
+    edges = tour_edges(controller.best_tour)
+    changes = []
+
+    def on_edge_change(change_type, node1, node2):
+        changes.append(change_type)
+        edge = frozenset((node1, node2))
+        if change_type == ChangeType.ADD:
+            edges.add(edge)
+        else:
+            edges.discard(edge)
+
+    controller.annealing.register(on_edge_change)
+    controller.create_node(2000, 2000)
+    controller.delete_node(controller.model.nodes[0])
+    assert edges == tour_edges(controller.best_tour)
+    assert len(changes) < 4 * 40
+
+
+def test_repair_keeps_large_instances_valid():
+    controller, rng = _controller(3000)
+    for _ in range(3):
+        controller.delete_node(controller.model.nodes[rng.randrange(len(controller.model.nodes))])
+        controller.create_node(rng.randint(0, 4000), rng.randint(0, 4000))
+    _assert_valid(controller)
+
+
+@pytest.mark.benchmark
+def test_repair_stays_within_budget_on_large_instances():
+    controller, rng = _controller(3000)
+    controller.delete_node(controller.model.nodes[0])
+    controller.create_node(1, 1)
+    deletes, adds = [], []
+    for _ in range(5):
+        start = time.perf_counter()
+        controller.delete_node(controller.model.nodes[rng.randrange(len(controller.model.nodes))])
+        deletes.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        controller.create_node(rng.randint(0, 4000), rng.randint(0, 4000))
+        adds.append(time.perf_counter() - start)
+    _assert_valid(controller)
+    assert statistics.median(deletes) < .03
+    assert statistics.median(adds) < .03
@@ -0,0 +1,17 @@
+import numpy as np
+
+from src.algorithms.multilevel import coarsen, multilevel_anneal
+
+
+def test_coarsen_maps_every_city_to_a_super_node(make_coordinates):
+    coordinates = make_coordinates(200)
+    coarse, sizes, parent = coarsen(coordinates, np.ones(len(coordinates)))
+    assert len(coarse) < len(coordinates)
+    assert sizes.sum() == len(coordinates)
+    assert parent.shape == (200,) and parent.max() == len(coarse) - 1
+
+
+def test_returns_permutation(make_coordinates, check_tour):
+    coordinates = make_coordinates(600)
+    tour, level_lengths = multilevel_anneal(coordinates, coarse_size=100, coarse_steps=2000, refine_steps=2)
+    check_tour(tour, 600, level_lengths[-1], coordinates=coordinates)
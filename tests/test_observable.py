@@ -0,0 +1,112 @@
+import pytest
+
+from src.constants import ChangeType
+from src.observable import Observable
+from src.saveable.nodeTable import NodeTable
+
+
+class Subject(Observable):
+    __slots__ = ('observers', 'batch_observers', 'batching')
+
+
+class UnorderedSubject(Subject):
+    __slots__ = ()
+    unordered = True
+
+
+def _recorded(subject):
+    calls, batches = [], []
+    subject.register(lambda *args: calls.append(args))
+    subject.register_batch(batches.append)
+    return calls, batches
+
+
+def test_notifications_outside_a_batch_are_delivered_at_once():
+    subject = Subject()
+    calls, batches = _recorded(subject)
+    subject.notify_observers(ChangeType.ADD, 1)
+    assert calls == [(ChangeType.ADD, 1)]
+    assert batches == [[((ChangeType.ADD, 1), {})]]
+
+
+def test_batch_delivers_once_in_order_when_it_ends():
+    subject = Subject()
+    calls, batches = _recorded(subject)
+    with subject.batch():
+        subject.notify_observers(ChangeType.ADD, 1)
+        subject.notify_observers('name')
+        assert not calls and not batches
+    assert calls == [(ChangeType.ADD, 1), ('name',)]
+    assert batches == [[((ChangeType.ADD, 1), {}), (('name',), {})]]
+
+
+def test_add_then_remove_cancels_out():
+    subject = Subject()
+    calls, batches = _recorded(subject)
+    with subject.batch():
+        subject.notify_observers(ChangeType.ADD, 1, 2)
+        subject.notify_observers(ChangeType.REMOVE, 1, 2)
+    assert calls == [] and batches == []
+
+
+def test_remove_then_add_only_cancels_when_unordered():
+    ordered, unordered = Subject(), UnorderedSubject()
+    ordered_calls, _ = _recorded(ordered)
+    unordered_calls, _ = _recorded(unordered)
+    for subject in ordered, unordered:
+        with subject.batch():
+            subject.notify_observers(ChangeType.REMOVE, 1, 2)
+            subject.notify_observers(ChangeType.ADD, 2, 1)
+    assert ordered_calls == [(ChangeType.REMOVE, 1, 2), (ChangeType.ADD, 2, 1)]
+    assert unordered_calls == []
+
+
+def test_nested_batches_deliver_when_outermost_ends():
+    subject = Subject()
+    calls, _ = _recorded(subject)
+    with subject.batch():
+        with subject.batch():
+            subject.notify_observers(ChangeType.ADD, 1)
+        assert not calls
+    assert calls == [(ChangeType.ADD, 1)]
+
+
+def test_batch_ends_when_an_exception_is_raised():
+    subject = Subject()
+    calls, _ = _recorded(subject)
+    with pytest.raises(RuntimeError):
+        with subject.batch():
+            subject.notify_observers(ChangeType.ADD, 1)
+            raise RuntimeError
+    assert subject.batching is None
+    assert calls == [(ChangeType.ADD, 1)]
+
+
+def test_has_observers_counts_batch_observers():
+    subject = Subject()
+    assert not subject.has_observers()
+    subject.register_batch(print)
+    assert subject.has_observers()
+    subject.unregister(print)
+    assert not subject.has_observers()
+
+
+def test_node_table_bulk_changes_reach_batch_observers():
+    table = NodeTable()
+    batches = []
+    table.register_batch(batches.append)
+    table.extend_columns([1, 2], [3, 4], ['a', 'b'])
+    table.clear()
+    assert [[args[0] for args, _ in batch] for batch in batches] == [[ChangeType.EXTEND], [ChangeType.REMOVE_MANY]]
+
+
+def test_node_table_bulk_changes_make_no_views():
+    table = NodeTable()
+    changes = []
+    table.register(lambda change_type, payload, *_: changes.append((change_type, list(payload))))
+    table.extend_columns([1, 2, 3], [4, 5, 6], ['a', 'b', 'c'])
+    assert changes == [(ChangeType.EXTEND, [0, 1, 2])]
+    assert table.views == [None] * 3
+    node = table[1]
+    table.clear()
+    assert changes[-1] == (ChangeType.REMOVE_MANY, [node])
@@ -0,0 +1,86 @@
+import os
+import random
+import threading
+
+import src.controller
+from src.algorithms.temperatureAlgorithms import decrease_ratio
+from src.controller import Controller
+from src.resultCache import ResultCache, run_key
+from src.runtime_models.simulatedAnnealingModel import SuccessorChooseType
+
+TEMPERATURES = decrease_ratio(100, .99, 300)
+
+
+def _controller(cache_directory, num_nodes=20):
+    rng = random.Random(0)
+    controller = Controller()
+    controller.cache = ResultCache(str(cache_directory))
+    controller.get_successor_type = lambda: SuccessorChooseType.RANDOM_WINDOW
+    for _ in range(num_nodes):
+        controller.create_node(rng.randint(0, 1000), rng.randint(0, 1000))
+    return controller
+
+
+def _count_runs(monkeypatch):
+    runs = []
+    anneal = src.controller.simulated_annealing
+
+    def counted(*args, **kwargs):
+        runs.append(args)
+        return anneal(*args, **kwargs)
+    monkeypatch.setattr(src.controller, 'simulated_annealing', counted)
+    return runs
+
+
+def test_run_key_depends_on_everything_that_decides_the_run(make_coordinates):
+    coordinates, order = make_coordinates(10), list(range(10))
+    key = run_key(coordinates, order, TEMPERATURES, SuccessorChooseType.RANDOM_WINDOW, 1)
+    assert key == run_key(coordinates.copy(), order, list(TEMPERATURES), SuccessorChooseType.RANDOM_WINDOW, 1)
+    assert key != run_key(coordinates, order, TEMPERATURES, SuccessorChooseType.RANDOM_WINDOW, 2)
+    assert key != run_key(coordinates, order, TEMPERATURES, SuccessorChooseType.BOTH_RANDOM, 1)
+    assert key != run_key(coordinates, order[::-1], TEMPERATURES, SuccessorChooseType.RANDOM_WINDOW, 1)
+
+
+def test_entries_without_lengths_miss_when_lengths_are_needed(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put('short', [2, 0, 1], 12.5)
+    assert cache.get('short') == ([2, 0, 1], 12.5, None)
+    assert cache.get('short', need_lengths=True) is None
+    assert cache.get('missing') is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for age, key in enumerate(('old', 'used', 'new')):
+        cache.put(key, list(range(100)), age)
+        os.utime(cache.path(key), (age, age))
+    cache.get('used')
+    cache.max_bytes = 2 * os.path.getsize(cache.path('new'))
+    cache.evict()
+    assert cache.get('old') is None
+    assert cache.get('used') is not None and cache.get('new') is not None
+
+
+def test_seeded_runs_are_served_from_the_cache(tmp_path, monkeypatch):
+    controller = _controller(tmp_path)
+    runs = _count_runs(monkeypatch)
+    value, _ = controller.run(TEMPERATURES, notify_canvas=False, seed=3)
+    tour = controller.best_tour
+    assert controller.run(TEMPERATURES, notify_canvas=False, seed=3)[0] == value
+    assert controller.best_tour == tour and len(runs) == 1
+
+    controller.run(TEMPERATURES, notify_canvas=False, seed=3, bypass_cache=True)
+    controller.run(TEMPERATURES, notify_canvas=False, seed=4)
+    controller.run(TEMPERATURES, notify_canvas=False)
+    assert len(runs) == 4
+
+
+def test_cancelled_runs_are_not_stored(tmp_path, monkeypatch):
+    controller = _controller(tmp_path)
+    runs = _count_runs(monkeypatch)
+    cancel = threading.Event()
+    cancel.set()
+    controller.run(TEMPERATURES, notify_canvas=False, seed=3, cancel=cancel)
+    assert not os.listdir(tmp_path)
+    controller.run(TEMPERATURES, notify_canvas=False, seed=3)
+    assert len(runs) == 2 and os.listdir(tmp_path)
@@ -0,0 +1,88 @@
+import io
+
+import pytest
+from PIL import Image
+
+from src.saveable.composite import Composite
+from src.saveable.node import Node
+from src.saveable.salesmanConfig import HEADER, MAGIC, VERSION, SalesmanConfig
+
+
+def _config():
+    config = SalesmanConfig()
+    config.background = Image.new('RGB', (40, 30), 'white')
+    config.nodes.extend([Node(1, 2, 'a'), Node(65535, 0, ''), Node(7, 8, 'city 3')])
+    config.tour = [2, 0, 1]
+    config.pixel_shift = 3
+    return config
+
+
+def _nodes(config):
+    return [(node.x, node.y, node.name) for node in config.nodes]
+
+
+def _round_trip(config):
+    stream = io.BytesIO()
+    config.save_to(stream)
+    loaded = SalesmanConfig()
+    loaded.load_from(io.BytesIO(stream.getvalue()))
+    return stream.getvalue(), loaded
+
+
+def test_version_2_round_trip():
+    config = _config()
+    data, loaded = _round_trip(config)
+    assert HEADER.unpack_from(data) == (MAGIC, VERSION)
+    assert _nodes(loaded) == _nodes(config)
+    assert loaded.tour == [2, 0, 1]
+    assert loaded.pixel_shift == 3
+    assert loaded.background.size == (40, 30)
+
+
+def test_background_bytes_are_saved_unchanged():
+    data, loaded = _round_trip(_config())
+    stream = io.BytesIO()
+    loaded.save_to(stream)
+    assert stream.getvalue() == data
+
+
+def test_file_round_trip_through_mmap(tmp_path):
+    path = tmp_path / 'config.tscfg'
+    with open(path, 'wb') as file:
+        _config().save_to(file)
+    loaded = SalesmanConfig()
+    with open(path, 'rb') as file:
+        loaded.load_from(file)
+    assert _nodes(loaded) == _nodes(_config())
+
+
+def test_version_1_files_still_load():
+    config = _config()
+    stream = io.BytesIO()
+    Composite.write(config, stream)
+    version_1 = stream.getvalue()[:-1]  # Written before the pixel shift existed
+    loaded = SalesmanConfig()
+    loaded.load_from(io.BytesIO(version_1))
+    assert _nodes(loaded) == _nodes(config)
+    assert loaded.tour == [2, 0, 1]
+    assert loaded.pixel_shift == 0
+
+
+def test_files_without_pixel_shift_load_with_zero():
+    data, _ = _round_trip(_config())
+    loaded = SalesmanConfig()
+    loaded.load_from(io.BytesIO(data[:-1]))
+    assert loaded.pixel_shift == 0
+    assert _nodes(loaded) == _nodes(_config())
+
+
+def test_unknown_version_is_rejected():
+    data, _ = _round_trip(_config())
+    data = HEADER.pack(MAGIC, VERSION + 1) + data[HEADER.size:]
+    with pytest.raises(ValueError):
+        SalesmanConfig().load_from(io.BytesIO(data))
+
+
+def test_unknown_attribute_raises_value_error():
+    with pytest.raises(ValueError):
+        SalesmanConfig().colour = 'red'
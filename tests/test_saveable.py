@@ -0,0 +1,87 @@
+import io
+import struct
+
+import pytest
+from PIL import Image
+
+from src.saveable.node import Node
+from src.saveable.saveable import ByteReader
+from src.saveable.salesmanConfig import SalesmanConfig
+
+
+class RecordingStream(io.BytesIO):
+    """
+    A stream that remembers the size of every write
+    """
+    def __init__(self):
+        super().__init__()
+        self.sizes = []
+
+    def write(self, data):
+        self.sizes.append(len(data))
+        return super().write(data)
+
+
+class UnreadableFile(io.FileIO):
+    """
+    A real file that fails if it is read instead of memory mapped
+    """
+    def read(self, *args):
+        raise AssertionError('The file was read instead of memory mapped')
+
+
+def _config(num_nodes=50):
+    config = SalesmanConfig()
+    config.background = Image.new('RGB', (20, 20), 'white')
+    config.nodes.extend_columns(range(num_nodes), range(num_nodes), ['node {}'.format(ind) for ind in range(num_nodes)])
+    return config
+
+
+def _nodes(config):
+    return [(node.x, node.y, node.name) for node in config.nodes]
+
+
+def test_byte_reader_moves_a_cursor_over_views():
+    reader = ByteReader(b'\x01\x00abcdef')
+    assert reader.unpack(struct.Struct('<H')) == (1,)
+    chunk = reader.read(3)
+    assert isinstance(chunk, memoryview) and bytes(chunk) == b'abc'
+    assert len(reader) == 3 and reader.position == 5
+    with pytest.raises(ValueError):
+        reader.read(4)
+
+
+def test_save_to_writes_piece_by_piece():
+    config = _config()
+    stream = RecordingStream()
+    config.save_to(stream)
+    assert len(stream.sizes) > 1
+    assert max(stream.sizes) < len(stream.getvalue())
+    assert stream.getvalue() == bytes(config.to_byte_array())
+
+
+def test_load_from_memory_maps_real_files(tmp_path):
+    path = str(tmp_path / 'config.tscfg')
+    with open(path, 'wb') as file:
+        _config().save_to(file)
+    loaded = SalesmanConfig()
+    with UnreadableFile(path, 'rb') as file:
+        loaded.load_from(file)
+    assert _nodes(loaded) == _nodes(_config())
+    assert loaded.background.size == (20, 20)
+
+
+def test_load_from_reads_streams_without_a_file():
+    stream = io.BytesIO()
+    _config().save_to(stream)
+    loaded = SalesmanConfig()
+    loaded.load_from(io.BytesIO(stream.getvalue()))
+    assert _nodes(loaded) == _nodes(_config())
+
+
+def test_load_in_place_only_consumes_bytearrays():
+    data = Node(3, 4, 'a').to_byte_array()
+    extra = bytearray(data + b'rest')
+    assert (Node.from_byte_array(extra).x, extra) == (3, bytearray(b'rest'))
+    frozen = bytes(data)
+    assert Node.from_byte_array(frozen).name == 'a' and frozen == bytes(data)
@@ -0,0 +1,57 @@
+import io
+
+import pytest
+from PIL import Image
+
+from src.saveable.saveableImage import SIZE, SaveableImage
+
+
+def _jpeg():
+    stream = io.BytesIO()
+    Image.new('RGB', (16, 8), 'red').save(stream, format='JPEG', quality=50)
+    return stream.getvalue()
+
+
+def _saved(image):
+    stream = io.BytesIO()
+    image.save_to(stream)
+    return stream.getvalue()
+
+
+def test_loaded_image_stays_undecoded_and_resaves_its_bytes():
+    original = _jpeg()
+    image = SaveableImage()
+    image.load_from(io.BytesIO(SIZE.pack(len(original)) + original))
+    assert image.image is None and image.data == original
+    assert _saved(image) == SIZE.pack(len(original)) + original
+    assert image.image is None
+
+
+def test_image_is_decoded_once_when_got():
+    image = SaveableImage.from_byte_array(bytes(SaveableImage(Image.new('RGB', (5, 4))).to_byte_array()))
+    decoded = image.get()
+    assert decoded.size == (5, 4)
+    assert image.get() is decoded
+
+
+def test_setting_an_image_drops_the_old_bytes():
+    image = SaveableImage.from_byte_array(SIZE.pack(len(_jpeg())) + _jpeg())
+    image.set(Image.new('RGB', (3, 3), 'blue'))
+    assert image.data is None
+    loaded = SaveableImage.from_byte_array(_saved(image))
+    assert loaded.get().format == 'PNG' and loaded.get().size == (3, 3)
+
+
+def test_loaded_bytes_outlive_a_memory_mapped_file(tmp_path):
+    path = tmp_path / 'image.bin'
+    with open(path, 'wb') as file:
+        SaveableImage(Image.new('RGB', (6, 6))).save_to(file)
+    image = SaveableImage()
+    with open(path, 'rb') as file:
+        image.load_from(file)
+    assert image.get().size == (6, 6)
+
+
+def test_only_images_can_be_set():
+    with pytest.raises(ValueError):
+        SaveableImage().set(b'not an image')
@@ -0,0 +1,39 @@
+import concurrent.futures
+import random
+
+from src.algorithms.temperatureAlgorithms import decrease_ratio
+from src.controller import Controller
+from src.runtime_models.simulatedAnnealingModel import SuccessorChooseType
+
+
+def _controller(num_nodes, seed=0):
+    rng = random.Random(seed)
+    controller = Controller()
+    for _ in range(num_nodes):
+        controller.create_node(rng.randint(0, 1000), rng.randint(0, 1000))
+    return controller
+
+
+def _tours(handles):
+    return [[node.name for node in handle.result()[2]] for handle in handles]
+
+
+def test_concurrent_seeded_runs_match_sequential_runs():
+    controller = _controller(40)
+    for ind, node in enumerate(controller.model.nodes):
+        node.name = str(ind)
+    temperatures = decrease_ratio(100, .9995, 20000)
+    kwargs = dict(successor_type=SuccessorChooseType.RANDOM_WINDOW, progress_interval=10)
+
+    sequential = []
+    for seed in (1, 2):
+        handle = controller.submit_run(temperatures, seed=seed, **kwargs)
+        handle.result()
+        sequential.append(handle)
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        concurrent_handles = [controller.submit_run(temperatures, seed=seed, executor=executor, **kwargs)
+                              for seed in (1, 2)]
+        tours = _tours(concurrent_handles)
+    assert tours == _tours(sequential)
+    assert tours[0] != tours[1]
@@ -0,0 +1,34 @@
+import numpy as np
+
+from src.algorithms.tabuSearch import TabuTable, tabu_search
+from src.algorithms.tours import nearest_neighbours, nearest_neighbour_tour, tour_length
+
+
+def test_returns_permutation_no_longer_than_start(make_distances, check_tour):
+    distances = make_distances(150)
+    best_tour, best_lengths, cpu_times = tabu_search(distances, 10, iterations=100)
+    check_tour(best_tour, 150, best_lengths[-1], distances=distances)
+    assert len(best_lengths) == len(cpu_times) == 100
+    assert best_lengths[-1] <= tour_length(distances, nearest_neighbour_tour(distances)) + 1e-6
+
+
+def test_table_is_indexed_by_candidate_slot(make_distances):
+    distances = make_distances(50)
+    candidates = nearest_neighbours(distances, 5)
+    table = TabuTable(candidates, 3)
+    assert table.until.shape == (50, 5)
+
+    city, other = 0, candidates[0, 2]
+    table.forbid(10, city, other)
+    assert table.is_tabu(12, city)[2]
+    assert not table.is_tabu(13, city)[2]
+    assert table.is_tabu(12, city).sum() == 1
+
+
+def test_edges_between_non_candidates_are_not_tracked(make_distances):
+    distances = make_distances(50)
+    candidates = nearest_neighbours(distances, 3)
+    table = TabuTable(candidates, 5)
+    far = int(np.argmax(distances[0]))
+    table.forbid(0, 0, far)
+    assert not table.until.any()
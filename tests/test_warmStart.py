@@ -0,0 +1,54 @@
+import random
+
+import pytest
+from PIL import Image
+
+from src.controller import Controller
+from src.runtime_models.simulatedAnnealingModel import SuccessorChooseType
+from src.saveable.node import Node
+
+
+def _controller(num_nodes, seed=0):
+    rng = random.Random(seed)
+    controller = Controller()
+    controller.get_successor_type = lambda: SuccessorChooseType.RANDOM_WINDOW
+    for _ in range(num_nodes):
+        controller.create_node(rng.randint(0, 1000), rng.randint(0, 1000))
+    return controller
+
+
+@pytest.mark.parametrize('num_nodes', [0, 1, 2])
+def test_refine_keeps_tiny_tours(num_nodes):
+    controller = _controller(num_nodes)
+    controller.refine(100, notify_canvas=False)
+    assert controller.best_tour == list(controller.model.nodes)
+
+
+def test_warm_start_splices_out_removed_and_inserts_new_nodes():
+    controller = _controller(30)
+    controller.refine(500, notify_canvas=False)
+    previous = controller.best_tour[:]
+    removed = previous[5]
+    controller.delete_node(removed)
+    added = controller.create_node(500, 500)
+    controller.annealing.nodes = controller.model.nodes.values[:]
+    order = controller.annealing.warm_start_order(previous)
+    assert removed not in order
+    assert sorted(order, key=controller.model.nodes.index) == list(controller.model.nodes)
+    assert [node for node in order if node is not added] == [node for node in previous if node is not removed]
+
+
+def test_tour_round_trips_through_a_saved_config(tmp_path):
+    controller = _controller(20)
+    controller.refine(500, notify_canvas=False)
+    path = str(tmp_path / 'config.tscfg')
+    controller.model.background = Image.new('RGB', (10, 10), 'white')
+    controller.save(path)
+
+    loaded = _controller(0)
+    loaded.load(path)
+    positions = [(node.x, node.y) for node in controller.best_tour]
+    assert [(node.x, node.y) for node in loaded.best_tour] == positions
+    loaded.model.nodes.append(Node(1, 1, 'new'))
+    loaded.refine(100, notify_canvas=False)
+    assert len(loaded.best_tour) == 21